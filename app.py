@@ -3,10 +3,51 @@
 モダンなマテリアルデザインUIで音声ファイルを文字起こし
 """
 
+# 起動時間の計測は他のモジュールより先に始める
+from startup_profiler import get_startup_profiler
+startup_profiler = get_startup_profiler()
+startup_profiler.mark("interpreter")
+
 import flet as ft
+startup_profiler.mark("flet_import")
+
 import os
+import datetime
 import threading
 from transcribe_core import TranscribeEngine
+from audio_processor import AUDIO_EXTENSIONS
+from batch_queue import BatchQueue, TranscribeJob, find_audio_files
+from log_buffer import LogBuffer, FrameScheduler
+from transcript_viewer import TranscriptIndex, PAGE_SIZE
+from transcript_search import get_search_index, format_ms
+
+
+# 結果欄に表示する最大文字数
+RESULT_PREVIEW_CHARS = 5000
+
+# ジョブの状態の表示名
+JOB_STATUS_LABELS = {
+    TranscribeJob.QUEUED: "待機中",
+    TranscribeJob.RUNNING: "処理中",
+    TranscribeJob.DONE: "完了",
+    TranscribeJob.FAILED: "失敗",
+    TranscribeJob.CANCELLED: "取消",
+}
+
+
+def seconds_until(clock_text):
+    """
+    「HH:MM」の時刻までの秒数（過ぎている場合は翌日のその時刻まで）
+
+    Raises:
+        ValueError: 時刻の形式が正しくない場合
+    """
+    target = datetime.datetime.strptime(clock_text.strip(), "%H:%M").time()
+    now = datetime.datetime.now()
+    deadline = datetime.datetime.combine(now.date(), target)
+    if deadline <= now:
+        deadline += datetime.timedelta(days=1)
+    return (deadline - now).total_seconds()
 
 
 class TranscribeApp:
@@ -21,11 +62,27 @@ class TranscribeApp:
 
         # 状態
         self.selected_file = None
+        self.selected_files = []
         self.engine = None
+        self.batch_queue = None
+        self.result = None
+        self.preview_chars = 0
+        self.transcript_index = None
+        self.viewer_page = 0
         self.is_processing = False
 
+        # ログは行数に上限を設け、画面の更新は一定間隔にまとめる
+        self.log_buffer = LogBuffer()
+        self.rendered_log_total = 0
+        self.frame_scheduler = FrameScheduler(self.render_frame)
+
         # UIコンポーネント
         self.build_ui()
+        startup_profiler.mark("first_paint")
+        self.frame_scheduler.start()
+
+        # whisper/torchの読み込みは時間がかかるため、画面を表示してから行う
+        threading.Thread(target=self.load_heavy_modules, daemon=True).start()
 
     def build_ui(self):
         """UIを構築"""
@@ -58,11 +115,15 @@ class TranscribeApp:
         file_picker = ft.FilePicker(on_result=self.on_file_picked)
         self.page.overlay.append(file_picker)
 
+        folder_picker = ft.FilePicker(on_result=self.on_folder_picked)
+        self.page.overlay.append(folder_picker)
+
         select_button = ft.ElevatedButton(
             "ファイルを選択",
-            icon=ft.icons.FOLDER_OPEN,
+            icon=ft.icons.AUDIO_FILE,
             on_click=lambda _: file_picker.pick_files(
-                allowed_extensions=["mp3", "wav", "m4a", "flac", "ogg", "mp4"],
+                allowed_extensions=list(AUDIO_EXTENSIONS),
+                allow_multiple=True,
                 dialog_title="音声ファイルを選択",
             ),
             style=ft.ButtonStyle(
@@ -71,13 +132,24 @@ class TranscribeApp:
             ),
         )
 
+        select_folder_button = ft.OutlinedButton(
+            "フォルダを選択",
+            icon=ft.icons.FOLDER_OPEN,
+            on_click=lambda _: folder_picker.get_directory_path(
+                dialog_title="音声ファイルのフォルダを選択",
+            ),
+        )
+
         file_card = ft.Card(
             content=ft.Container(
                 content=ft.Column(
                     [
                         ft.Icon(ft.icons.AUDIO_FILE, size=64, color=ft.colors.BLUE_400),
                         self.file_text,
-                        select_button,
+                        ft.Row(
+                            [select_button, select_folder_button],
+                            alignment=ft.MainAxisAlignment.CENTER,
+                        ),
                     ],
                     horizontal_alignment=ft.CrossAxisAlignment.CENTER,
                     spacing=15,
@@ -99,18 +171,53 @@ class TranscribeApp:
             ],
             value="medium",
             width=400,
+            on_change=self.on_model_changed,
+        )
+
+        self.model_status_text = ft.Text("", size=12, color=ft.colors.GREY_700)
+
+        self.vad_checkbox = ft.Checkbox(
+            label="無音区間をスキップ（会議・通話録音向け）",
+            value=False,
+        )
+
+        self.int8_checkbox = ft.Checkbox(
+            label="int8量子化で高速化（CPU向け、精度はわずかに低下）",
+            value=False,
+            on_change=self.on_model_changed,
+        )
+
+        # auto は音声の一部から一度だけ判定し、すべてのチャンクで使う
+        self.language_dropdown = ft.Dropdown(
+            label="言語",
+            options=[
+                ft.dropdown.Option("ja", "日本語"),
+                ft.dropdown.Option("en", "英語"),
+                ft.dropdown.Option("auto", "自動判定"),
+                ft.dropdown.Option("auto-chunk", "自動判定（チャンクごと、複数言語の録音向け）"),
+            ],
+            value="ja",
+            width=400,
         )
 
+        # 指定すると期限までに終わる最も精度の高いモデルを自動で選ぶ
+        self.deadline_field = ft.TextField(
+            label="完了期限（HH:MM、空欄=モデルを自動選択しない）",
+            width=400,
+        )
+        self.deadline_seconds = None
+
         # 進捗表示
         self.progress_ring = ft.ProgressRing(visible=False)
         self.progress_text = ft.Text("", size=14, color=ft.colors.GREY_700)
 
+        self.log_column = ft.Column([], scroll=ft.ScrollMode.AUTO, auto_scroll=True)
         self.log_container = ft.Container(
             content=ft.Column(
                 [
                     ft.Text("処理ログ:", weight=ft.FontWeight.BOLD),
                     ft.Container(
-                        content=ft.Column([], scroll=ft.ScrollMode.AUTO),
+                        content=self.log_column,
                         height=200,
                         border=ft.border.all(1, ft.colors.GREY_400),
                         border_radius=5,
@@ -122,6 +229,25 @@ class TranscribeApp:
             visible=False,
         )
 
+        # バッチ処理のキュー
+        self.queue_column = ft.Column([], spacing=2, scroll=ft.ScrollMode.AUTO)
+        self.queue_container = ft.Container(
+            content=ft.Column(
+                [
+                    ft.Text("処理キュー:", weight=ft.FontWeight.BOLD),
+                    ft.Container(
+                        content=self.queue_column,
+                        height=160,
+                        border=ft.border.all(1, ft.colors.GREY_400),
+                        border_radius=5,
+                        padding=10,
+                    ),
+                ],
+                spacing=10,
+            ),
+            visible=False,
+        )
+
         # 実行ボタン
         self.start_button = ft.ElevatedButton(
             "文字起こしを開始",
@@ -143,6 +269,58 @@ class TranscribeApp:
             selectable=True,
         )
 
+        # セグメント一覧（表示中のページの行だけを読み込む）
+        self.viewer_list = ft.ListView(spacing=0, item_extent=22, height=300)
+        self.viewer_page_text = ft.Text("", size=12, color=ft.colors.GREY_700)
+        self.viewer_time_field = ft.TextField(
+            hint_text="mm:ss",
+            width=100,
+            dense=True,
+            on_submit=self.jump_to_time,
+        )
+        self.viewer_container = ft.Container(
+            content=ft.Column(
+                [
+                    ft.Row(
+                        [
+                            ft.IconButton(
+                                icon=ft.icons.FIRST_PAGE,
+                                tooltip="最初のページ",
+                                on_click=lambda _: self.show_viewer_page(0),
+                            ),
+                            ft.IconButton(
+                                icon=ft.icons.CHEVRON_LEFT,
+                                tooltip="前のページ",
+                                on_click=lambda _: self.show_viewer_page(self.viewer_page - 1),
+                            ),
+                            self.viewer_page_text,
+                            ft.IconButton(
+                                icon=ft.icons.CHEVRON_RIGHT,
+                                tooltip="次のページ",
+                                on_click=lambda _: self.show_viewer_page(self.viewer_page + 1),
+                            ),
+                            ft.IconButton(
+                                icon=ft.icons.LAST_PAGE,
+                                tooltip="最後のページ",
+                                on_click=lambda _: self.show_last_viewer_page(),
+                            ),
+                            ft.Text("時刻へ移動:", size=12),
+                            self.viewer_time_field,
+                        ],
+                        spacing=2,
+                    ),
+                    ft.Container(
+                        content=self.viewer_list,
+                        border=ft.border.all(1, ft.colors.GREY_400),
+                        border_radius=5,
+                        padding=10,
+                    ),
+                ],
+                spacing=5,
+            ),
+            visible=False,
+        )
+
         self.result_container = ft.Container(
             content=ft.Column(
                 [
@@ -163,6 +341,11 @@ class TranscribeApp:
                                 tooltip="ファイルを開く",
                                 on_click=self.open_result_file,
                             ),
+                            ft.IconButton(
+                                icon=ft.icons.LIST,
+                                tooltip="セグメント一覧",
+                                on_click=self.toggle_viewer,
+                            ),
                         ],
                     ),
                     ft.Container(
@@ -176,12 +359,47 @@ class TranscribeApp:
                         padding=15,
                         bgcolor=ft.colors.GREY_50,
                     ),
+                    self.viewer_container,
                 ],
                 spacing=10,
             ),
             visible=False,
         )
 
+        # 過去の文字起こし結果の検索
+        import_picker = ft.FilePicker(on_result=self.on_import_folder_picked)
+        self.page.overlay.append(import_picker)
+
+        self.search_field = ft.TextField(
+            label="過去の文字起こし結果を検索",
+            prefix_icon=ft.icons.SEARCH,
+            on_submit=self.run_search,
+            expand=True,
+        )
+        self.search_status_text = ft.Text("", size=12, color=ft.colors.GREY_700)
+        self.search_results = ft.ListView(spacing=0, height=200)
+        search_container = ft.Container(
+            content=ft.Column(
+                [
+                    ft.Row(
+                        [
+                            self.search_field,
+                            ft.IconButton(
+                                icon=ft.icons.DRIVE_FOLDER_UPLOAD,
+                                tooltip="既存の結果ファイルを取り込む",
+                                on_click=lambda _: import_picker.get_directory_path(
+                                    dialog_title="文字起こし結果のフォルダを選択",
+                                ),
+                            ),
+                        ],
+                    ),
+                    self.search_status_text,
+                    self.search_results,
+                ],
+                spacing=5,
+            ),
+        )
+
         # メインコンテンツ
         content = ft.Container(
             content=ft.Column(
@@ -189,9 +407,16 @@ class TranscribeApp:
                     file_card,
                     ft.Divider(height=20),
                     ft.Container(
-                        content=ft.Row(
-                            [self.model_dropdown],
-                            alignment=ft.MainAxisAlignment.CENTER,
+                        content=ft.Column(
+                            [
+                                self.model_dropdown,
+                                self.model_status_text,
+                                self.vad_checkbox,
+                                self.int8_checkbox,
+                                self.language_dropdown,
+                                self.deadline_field,
+                            ],
+                            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
                         ),
                         padding=ft.padding.symmetric(vertical=10),
                     ),
@@ -207,9 +432,12 @@ class TranscribeApp:
                         padding=ft.padding.symmetric(vertical=10),
                     ),
                     self.progress_text,
+                    self.queue_container,
                     self.log_container,
                     ft.Divider(height=20),
                     self.result_container,
+                    ft.Divider(height=20),
+                    search_container,
                 ],
                 horizontal_alignment=ft.CrossAxisAlignment.CENTER,
                 scroll=ft.ScrollMode.AUTO,
@@ -218,6 +446,8 @@ class TranscribeApp:
             expand=True,
         )
 
+        startup_profiler.mark("ui_build")
+
         # ページに追加
         self.page.add(
             ft.Column(
@@ -233,76 +463,324 @@ class TranscribeApp:
     def on_file_picked(self, e: ft.FilePickerResultEvent):
         """ファイルが選択されたときの処理"""
         if e.files:
-            self.selected_file = e.files[0].path
-            file_name = os.path.basename(self.selected_file)
-            file_size = os.path.getsize(self.selected_file) / 1024 / 1024
+            self.set_selected_files([f.path for f in e.files])
+
+    def on_folder_picked(self, e: ft.FilePickerResultEvent):
+        """フォルダが選択されたときの処理"""
+        if e.path:
+            files = find_audio_files(e.path)
+            if not files:
+                self.file_text.value = "選択したフォルダに音声ファイルがありません"
+                self.page.update()
+                return
+            self.set_selected_files(files)
+
+    def set_selected_files(self, files):
+        """選択されたファイルを設定（バッチ処理中ならキューに追加）"""
+        if self.batch_queue is not None and self.batch_queue.is_busy():
+            self.batch_queue.add_files(
+                files,
+                vad=self.vad_checkbox.value,
+                **self.language_options()
+            )
+            self.add_log(f"{len(files)}個のファイルをキューに追加しました")
+            return
 
-            self.file_text.value = f"✓ {file_name}\nサイズ: {file_size:.2f} MB"
+        self.selected_files = files
+        self.selected_file = files[0]
+        total_size = sum(os.path.getsize(path) for path in files) / 1024 / 1024
+
+        if len(files) == 1:
+            file_name = os.path.basename(self.selected_file)
+            self.file_text.value = f"✓ {file_name}\nサイズ: {total_size:.2f} MB"
+        else:
+            self.file_text.value = f"✓ {len(files)}個のファイル\n合計サイズ: {total_size:.2f} MB"
+        if not self.is_processing:
             self.start_button.disabled = False
-            self.page.update()
+        self.page.update()
 
-    def add_log(self, message):
-        """ログを追加"""
-        log_col = self.log_container.content.controls[1].content
-        log_col.controls.append(
-            ft.Text(message, size=12, color=ft.colors.GREY_800)
+    def load_heavy_modules(self):
+        """重いライブラリをバックグラウンドで読み込み、選択中のモデルを準備する"""
+        try:
+            import torch  # noqa: F401
+            import whisper  # noqa: F401
+        except ImportError:
+            # 未インストールの場合はモデルの読み込み時にエラーを表示する
+            pass
+        try:
+            import pydub  # noqa: F401
+        except ImportError:
+            pass
+        startup_profiler.mark("heavy_imports")
+
+        # 読み込み中に処理が始まっていればそちらでモデルを準備する
+        if self.engine is None:
+            self.preload_model()
+            self.frame_scheduler.request()
+
+    def preload_model(self):
+        """選択中のモデルをバックグラウンドで読み込み、ウォームアップする"""
+        model_name = self.model_dropdown.value
+        if self.engine_matches_selection():
+            return
+
+        engine = TranscribeEngine(model_name, quantize=self.int8_checkbox.value)
+        self.replace_engine(engine)
+        self.model_status_text.value = f"モデル「{engine.model_label}」を準備中..."
+        self.model_status_text.color = ft.colors.GREY_700
+
+        def on_ready(success, message):
+            # 準備中に別のモデルが選ばれた場合は表示を更新しない
+            if self.engine is not engine:
+                return
+            if success:
+                self.model_status_text.value = f"✓ モデル「{engine.model_label}」準備完了"
+                self.model_status_text.color = ft.colors.GREEN_700
+                self.finish_startup_profile()
+            else:
+                self.model_status_text.value = f"❌ {message}"
+                self.model_status_text.color = ft.colors.RED_700
+            self.frame_scheduler.request()
+
+        engine.preload(on_ready=on_ready)
+
+    def replace_engine(self, engine):
+        """エンジンを入れ替え、以前のエンジンのワーカープロセスを終了する"""
+        previous = self.engine
+        self.engine = engine
+        if previous is not None:
+            # 準備中の読み込みの完了を待つため画面の操作を止めないよう別スレッドで閉じる
+            threading.Thread(target=previous.close, daemon=True).start()
+
+    def engine_matches_selection(self):
+        """準備済みのエンジンが選択中のモデル・精度と一致するか"""
+        return (
+            self.engine is not None
+            and self.engine.model_name == self.model_dropdown.value
+            and self.engine.quantize == self.int8_checkbox.value
         )
+
+    def finish_startup_profile(self):
+        """起動時間を記録し、前回までより遅くなっていればログに表示"""
+        if startup_profiler.elapsed("engine_ready") is not None:
+            return
+        startup_profiler.mark("engine_ready")
+        regressions = startup_profiler.finish()
+        print(startup_profiler.format_report(regressions))
+        if regressions:
+            self.add_log(startup_profiler.format_report(regressions))
+
+    def on_model_changed(self, e):
+        """モデルの選択が変わったときの処理"""
+        if self.is_processing:
+            return
+        self.preload_model()
+        self.page.update()
+
+    def add_log(self, message):
+        """ログを追加（画面には次のフレームで反映される）"""
+        self.log_buffer.append(message)
+        self.frame_scheduler.request()
+
+    def render_frame(self):
+        """前回の描画以降の変更を画面に反映（描画スレッドから呼ばれる）"""
+        total, lines, reset = self.log_buffer.read_since(self.rendered_log_total)
+        self.rendered_log_total = total
+
+        new_controls = [ft.Text(line, size=12, color=ft.colors.GREY_800) for line in lines]
+        if reset:
+            self.log_column.controls = new_controls
+        elif new_controls:
+            self.log_column.controls.extend(new_controls)
+            excess = len(self.log_column.controls) - self.log_buffer.max_lines
+            if excess > 0:
+                del self.log_column.controls[:excess]
+
         self.page.update()
 
     def start_transcription(self, e):
         """文字起こしを開始"""
-        if self.is_processing or not self.selected_file:
+        if self.is_processing or not self.selected_files:
             return
 
+        self.deadline_seconds = None
+        if self.deadline_field.value and self.deadline_field.value.strip():
+            try:
+                self.deadline_seconds = seconds_until(self.deadline_field.value)
+            except ValueError:
+                self.progress_text.value = "完了期限は「17:30」のように HH:MM 形式で入力してください"
+                self.page.update()
+                return
+
         self.is_processing = True
         self.start_button.disabled = True
         self.progress_ring.visible = True
         self.log_container.visible = True
         self.result_container.visible = False
+        self.queue_container.visible = False
         self.result_text.value = ""
+        self.result = None
+        self.close_viewer()
 
         # ログをクリア
-        log_col = self.log_container.content.controls[1].content
-        log_col.controls.clear()
+        self.log_buffer.clear()
+        self.frame_scheduler.flush()
+
+        # バックグラウンドで実行（複数ファイルはキューで順に処理）
+        if len(self.selected_files) > 1:
+            thread = threading.Thread(target=self.run_batch)
+        else:
+            thread = threading.Thread(target=self.run_transcription)
+        thread.start()
 
-        self.page.update()
+    def run_batch(self):
+        """選択された複数のファイルを1つのモデルで順に文字起こし"""
+        try:
+            if not self.engine_matches_selection():
+                self.replace_engine(TranscribeEngine(
+                    self.model_dropdown.value,
+                    quantize=self.int8_checkbox.value
+                ))
+
+            def progress_callback(job, message):
+                self.progress_text.value = f"[{os.path.basename(job.audio_file)}] {message}"
+                self.add_log(message)
 
-        # バックグラウンドで実行
-        thread = threading.Thread(target=self.run_transcription)
-        thread.start()
+            self.batch_queue = BatchQueue(
+                self.engine,
+                progress_callback=progress_callback,
+                on_job_update=lambda job: self.refresh_queue(),
+            )
+            self.queue_container.visible = True
+            if self.deadline_seconds is not None:
+                self.add_log("⚠ 完了期限によるモデルの自動選択は1ファイルの文字起こしでのみ使用できます")
+            self.batch_queue.add_files(
+                self.selected_files,
+                vad=self.vad_checkbox.value,
+                **self.language_options()
+            )
+            self.batch_queue.start()
+            self.batch_queue.wait()
+            self.batch_queue.stop()
+
+            stats = self.batch_queue.stats()
+            message = f"✓ {stats['completed']}件の文字起こしが完了しました"
+            if stats["failed"]:
+                message += f"（失敗 {stats['failed']}件）"
+            if stats["throughput"]:
+                message += f" / 処理速度: 1時間あたり音声{stats['throughput']:.1f}時間分"
+            self.progress_text.value = message
+            self.add_log(message)
+
+            # 最後に完了したファイルの結果を表示
+            done = [job for job in self.batch_queue.jobs() if job.status == TranscribeJob.DONE]
+            if done:
+                self.show_result(done[-1].result, done[-1].output_file)
+
+        except Exception as e:
+            error_msg = f"エラー: {e}"
+            self.progress_text.value = error_msg
+            self.add_log(error_msg)
+
+        finally:
+            self.is_processing = False
+            self.start_button.disabled = False
+            self.progress_ring.visible = False
+            self.frame_scheduler.flush()
+
+    def refresh_queue(self):
+        """キューの表示を更新"""
+        rows = []
+        for job in self.batch_queue.jobs():
+            speed = f"{job.realtime_factor:.1f}倍速" if job.realtime_factor else ""
+            controls = [
+                ft.Text(JOB_STATUS_LABELS[job.status], size=12, width=50),
+                ft.Text(os.path.basename(job.audio_file), size=12, expand=True),
+                ft.Text(speed, size=12, width=70),
+            ]
+            if job.status == TranscribeJob.QUEUED:
+                controls.append(ft.IconButton(
+                    icon=ft.icons.VERTICAL_ALIGN_TOP,
+                    tooltip="次に処理",
+                    icon_size=16,
+                    on_click=lambda _, job_id=job.job_id: self.batch_queue.move_to_front(job_id),
+                ))
+                controls.append(ft.IconButton(
+                    icon=ft.icons.CLOSE,
+                    tooltip="取り消し",
+                    icon_size=16,
+                    on_click=lambda _, job_id=job.job_id: self.batch_queue.cancel(job_id),
+                ))
+            rows.append(ft.Row(controls, spacing=5))
+        self.queue_column.controls = rows
+        self.frame_scheduler.request()
+
+    def show_result(self, result, output_file):
+        """文字起こし結果を表示（保存したファイルは読み直さない）"""
+        text = result["text"]
+        total_chars = len(text)
+
+        self.result_text.value = text[:RESULT_PREVIEW_CHARS]
+        if total_chars > RESULT_PREVIEW_CHARS:
+            self.result_text.value += f"\n\n[長いテキストのため、最初の{RESULT_PREVIEW_CHARS}文字のみ表示]"
+            self.result_text.value += f"\n総文字数: {total_chars}文字"
+            self.result_text.value += f"\n\n全文は以下のファイルに保存されています:\n{output_file}"
+
+        self.result_container.visible = True
+        self.result = result
+        self.output_file = output_file
+
+    def append_segments(self, segments):
+        """確定したセグメントを結果欄に追記（ワーカースレッドから呼ばれる）"""
+        if self.preview_chars >= RESULT_PREVIEW_CHARS:
+            return
+
+        text = "".join(segment["text"] for segment in segments)
+        if self.preview_chars == 0:
+            text = text.lstrip()
+        text = text[:RESULT_PREVIEW_CHARS - self.preview_chars]
+        self.preview_chars += len(text)
+
+        self.result_text.value = (self.result_text.value or "") + text
+        if self.preview_chars >= RESULT_PREVIEW_CHARS:
+            self.result_text.value += "\n\n[続きは完了後に保存されるファイルで確認できます]"
+        self.result_container.visible = True
+        self.frame_scheduler.request()
+
+    def language_options(self):
+        """選択された言語を transcribe の引数にする"""
+        if self.language_dropdown.value == "auto-chunk":
+            return {"language": "auto", "language_policy": "chunk"}
+        return {"language": self.language_dropdown.value, "language_policy": "file"}
 
     def run_transcription(self):
         """文字起こしを実行"""
         try:
-            # エンジンを初期化
-            model_name = self.model_dropdown.value
-            self.engine = TranscribeEngine(model_name)
+            # エンジンを初期化（準備済みのエンジンがあれば再利用）
+            if not self.engine_matches_selection():
+                self.replace_engine(TranscribeEngine(
+                    self.model_dropdown.value,
+                    quantize=self.int8_checkbox.value
+                ))
 
             def progress_callback(message):
                 self.progress_text.value = message
                 self.add_log(message)
 
-            # 文字起こし実行
+            # 文字起こし実行（完了したチャンクの結果から順に表示する）
+            self.preview_chars = 0
             success, message, output_file = self.engine.transcribe(
                 self.selected_file,
-                progress_callback=progress_callback
+                progress_callback=progress_callback,
+                vad=self.vad_checkbox.value,
+                segment_callback=self.append_segments,
+                deadline_seconds=self.deadline_seconds,
+                **self.language_options()
             )
 
             if success:
                 # 結果を表示
-                text, truncated, total_chars = self.engine.get_transcribed_text(
-                    output_file,
-                    max_chars=5000
-                )
-
-                self.result_text.value = text
-                if truncated:
-                    self.result_text.value += f"\n\n[長いテキストのため、最初の5000文字のみ表示]"
-                    self.result_text.value += f"\n総文字数: {total_chars}文字"
-                    self.result_text.value += f"\n\n全文は以下のファイルに保存されています:\n{output_file}"
-
-                self.result_container.visible = True
-                self.output_file = output_file
+                self.show_result(self.engine.last_result, output_file)
 
             self.progress_text.value = message
             self.add_log(message)
@@ -316,12 +794,147 @@ class TranscribeApp:
             self.is_processing = False
             self.start_button.disabled = False
             self.progress_ring.visible = False
+            self.frame_scheduler.flush()
+
+    def toggle_viewer(self, e):
+        """セグメント一覧の表示を切り替える"""
+        if self.viewer_container.visible:
+            self.viewer_container.visible = False
+            self.page.update()
+            return
+
+        output_file = getattr(self, "output_file", None)
+        if not output_file or not os.path.exists(output_file):
+            return
+        if self.transcript_index is None or self.transcript_index.path != output_file:
+            self.close_viewer()
+            self.transcript_index = TranscriptIndex(output_file)
+        else:
+            self.transcript_index.refresh()
+
+        self.viewer_container.visible = True
+        self.show_viewer_page(0)
+
+    def show_viewer_page(self, number):
+        """セグメント一覧の指定ページを表示"""
+        if self.transcript_index is None:
+            return
+        number, rows = self.transcript_index.page(number)
+        self.viewer_page = number
+        self.viewer_list.controls = [
+            ft.Text(row, size=12, selectable=True, no_wrap=True) for row in rows
+        ]
+        self.viewer_page_text.value = (
+            f"{number + 1} / {self.transcript_index.page_count()} ページ"
+            f"（{len(self.transcript_index)}件）"
+        )
+        self.page.update()
+
+    def show_last_viewer_page(self):
+        """セグメント一覧の最後のページを表示"""
+        if self.transcript_index is not None:
+            self.show_viewer_page(self.transcript_index.page_count() - 1)
+
+    def jump_to_time(self, e):
+        """入力した時刻（mm:ss / h:mm:ss / 秒）のセグメントがあるページを表示"""
+        if self.transcript_index is None:
+            return
+        try:
+            seconds = 0
+            for part in self.viewer_time_field.value.strip().split(":"):
+                seconds = seconds * 60 + int(part)
+        except ValueError:
+            self.viewer_time_field.error_text = "mm:ss の形式で入力"
             self.page.update()
+            return
+        self.viewer_time_field.error_text = None
+        row = self.transcript_index.find_time(seconds)
+        self.show_viewer_page(row // PAGE_SIZE)
+
+    def close_viewer(self):
+        """セグメント一覧を閉じる（同じファイルへ書き出す前に mmap を解放する）"""
+        if self.transcript_index is not None:
+            self.transcript_index.close()
+            self.transcript_index = None
+        self.viewer_container.visible = False
+        self.viewer_list.controls = []
+
+    def run_search(self, e):
+        """検索語を含むセグメントを一覧表示"""
+        query = self.search_field.value or ""
+        try:
+            hits = get_search_index().search(query)
+        except Exception as ex:
+            self.search_status_text.value = f"❌ 検索に失敗: {ex}"
+            self.page.update()
+            return
+
+        self.search_results.controls = [
+            ft.Container(
+                content=ft.Row(
+                    [
+                        ft.Text(format_ms(hit.start_ms), size=12, width=90,
+                                color=ft.colors.BLUE_700),
+                        ft.Text(os.path.basename(hit.output_file), size=12, width=200,
+                                no_wrap=True, tooltip=hit.output_file),
+                        ft.Text(hit.text, size=12, expand=True),
+                    ],
+                    spacing=5,
+                ),
+                on_click=lambda _, hit=hit: self.open_search_hit(hit),
+                padding=ft.padding.symmetric(vertical=2),
+            )
+            for hit in hits
+        ]
+        if query.strip():
+            self.search_status_text.value = f"{len(hits)}件" + (
+                "（上位のみ表示）" if len(hits) >= 100 else ""
+            )
+        else:
+            self.search_status_text.value = ""
+        self.page.update()
+
+    def open_search_hit(self, hit):
+        """検索結果のファイルをセグメント一覧で開き、該当する時刻のページを表示"""
+        if self.is_processing:
+            return
+        if not os.path.exists(hit.output_file):
+            self.search_status_text.value = f"ファイルが見つかりません: {hit.output_file}"
+            self.page.update()
+            return
+
+        self.close_viewer()
+        self.result = None
+        self.output_file = hit.output_file
+        self.result_text.value = (
+            f"{os.path.basename(hit.output_file)}\n"
+            f"[{format_ms(hit.start_ms)}] {hit.text}"
+        )
+        self.result_container.visible = True
+        self.toggle_viewer(None)
+        row = self.transcript_index.find_time(hit.start_ms // 1000)
+        self.show_viewer_page(row // PAGE_SIZE)
+
+    def on_import_folder_picked(self, e: ft.FilePickerResultEvent):
+        """選択したフォルダの既存の結果ファイルを検索対象に取り込む"""
+        if not e.path:
+            return
+        self.log_container.visible = True
+        self.add_log(f"文字起こし結果を取り込んでいます: {e.path}")
+
+        def run():
+            try:
+                get_search_index().import_folder(e.path, recursive=True,
+                                                 progress_callback=self.add_log)
+            except Exception as ex:
+                self.add_log(f"❌ 取り込みに失敗: {ex}")
+
+        threading.Thread(target=run, daemon=True).start()
 
     def copy_result(self, e):
         """結果をクリップボードにコピー"""
-        if self.result_text.value:
-            self.page.set_clipboard(self.result_text.value)
+        if self.result:
+            self.page.set_clipboard(self.result["text"])
             self.page.show_snack_bar(
                 ft.SnackBar(content=ft.Text("クリップボードにコピーしました"))
             )
@@ -338,4 +951,7 @@ def main(page: ft.Page):
 
 
 if __name__ == "__main__":
+    # PyInstallerでビルドした場合に並列処理のワーカーを起動できるようにする
+    import multiprocessing
+    multiprocessing.freeze_support()
     ft.app(target=main)
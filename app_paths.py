@@ -0,0 +1,27 @@
+"""
+アプリのデータ保存先モジュール
+キャッシュや設定ファイルを置くユーザーごとのディレクトリを提供
+"""
+
+import os
+import sys
+
+
+def get_app_data_dir(*parts):
+    """
+    アプリのデータディレクトリ内のパスを取得（ディレクトリは作成する）
+
+    Windowsでは %LOCALAPPDATA%\\TranscribeApp、
+    それ以外では ~/.transcribe_app を使う。
+    環境変数 TRANSCRIBE_APP_HOME で変更できる。
+    """
+    base = os.environ.get("TRANSCRIBE_APP_HOME")
+    if not base:
+        if sys.platform == "win32" and os.environ.get("LOCALAPPDATA"):
+            base = os.path.join(os.environ["LOCALAPPDATA"], "TranscribeApp")
+        else:
+            base = os.path.join(os.path.expanduser("~"), ".transcribe_app")
+
+    path = os.path.join(base, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -5,8 +5,51 @@
 
 import os
 import sys
+import json
+import math
+import bisect
+import struct
+import tempfile
+import subprocess
+from collections import namedtuple
 from datetime import timedelta
 
+from metrics import stage
+
+
+# 音声ファイルのメタ情報（probe_audioの戻り値）
+AudioInfo = namedtuple(
+    "AudioInfo",
+    ["duration", "sample_rate", "channels", "codec", "source"]
+)
+
+# 分割されたチャンク
+# audio: 配列またはWAVパス / start, end: 元の音声での位置（秒）
+# timeline: 無音を除いて連結した場合の [(チャンク内の秒, 元の秒), ...]
+AudioChunk = namedtuple(
+    "AudioChunk",
+    ["audio", "start", "end", "timeline"],
+    defaults=(None,)
+)
+
+# 対応している音声ファイルの拡張子
+AUDIO_EXTENSIONS = ("mp3", "wav", "m4a", "flac", "ogg", "mp4")
+
+# Whisperが内部で使用するサンプルレート（16kHzモノラル）
+SAMPLE_RATE = 16000
+
+# 無音検出のフレーム長（秒）
+VAD_FRAME_SECONDS = 0.03
+# これより小さい音量(dBFS)は常に無音とみなす
+SILENCE_FLOOR_DB = -55.0
+# この長さ以上の無音は文字起こしの対象から外す
+MIN_SILENCE_SECONDS = 2.0
+# 分割位置を探すために遡る最大の長さ（秒）
+PAUSE_SEARCH_SECONDS = 30.0
+
+# probe結果のキャッシュ {(絶対パス, サイズ, 更新時刻): AudioInfo}
+_audio_info_cache = {}
+
 
 def get_ffmpeg_path():
     """実行環境に応じたffmpegのパスを取得"""
@@ -43,82 +86,757 @@ def setup_pydub_ffmpeg():
         pass
 
 
+def get_ffprobe_path():
+    """ffmpegと同じ場所にあるffprobeのパスを取得"""
+    ffmpeg_path = get_ffmpeg_path()
+    if ffmpeg_path == "ffmpeg":
+        return "ffprobe"
+    ffprobe_path = ffmpeg_path.replace("ffmpeg.exe", "ffprobe.exe")
+    if os.path.exists(ffprobe_path):
+        return ffprobe_path
+    return "ffprobe"
+
+
+def _subprocess_kwargs():
+    """ウィンドウアプリからの起動時にコンソールを表示しないための引数"""
+    if sys.platform == "win32":
+        return {"creationflags": subprocess.CREATE_NO_WINDOW}
+    return {}
+
+
+def _probe_wav_header(audio_file):
+    """RIFF/WAVヘッダーを直接読んでメタ情報を取得"""
+    with open(audio_file, "rb") as f:
+        riff = f.read(12)
+        if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+            return None
+
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                return None
+            chunk_id, chunk_size = struct.unpack("<4sI", header)
+
+            if chunk_id == b"fmt ":
+                data = f.read(chunk_size)
+                if len(data) < 16:
+                    return None
+                fmt = struct.unpack("<HHIIHH", data[:16])
+                # チャンクは偶数バイト境界に揃えられる
+                if chunk_size & 1:
+                    f.seek(1, os.SEEK_CUR)
+            elif chunk_id == b"data":
+                if fmt is None:
+                    return None
+                audio_format, channels, sample_rate, byte_rate, _, bits = fmt
+                if byte_rate == 0:
+                    return None
+                # ストリーミング書き出しでサイズ未確定の場合はファイル末尾まで
+                data_size = chunk_size
+                if data_size in (0, 0xFFFFFFFF):
+                    data_size = os.path.getsize(audio_file) - f.tell()
+                codec = {1: "pcm", 3: "pcm_float", 0xFFFE: "pcm"}.get(
+                    audio_format, f"wav_0x{audio_format:04x}"
+                )
+                if codec.startswith("pcm"):
+                    codec = f"{codec}_{bits}bit"
+                return AudioInfo(
+                    data_size / byte_rate, sample_rate, channels, codec, "wav_header"
+                )
+            else:
+                f.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+
+
+def _probe_ffprobe(audio_file):
+    """ffprobeのJSON出力からコンテナのメタ情報を取得"""
+    command = [
+        get_ffprobe_path(),
+        "-v", "error",
+        "-print_format", "json",
+        "-show_format",
+        "-show_streams",
+        "-select_streams", "a:0",
+        audio_file,
+    ]
+    try:
+        completed = subprocess.run(
+            command, capture_output=True, timeout=30, **_subprocess_kwargs()
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if completed.returncode != 0:
+        return None
+
+    try:
+        probe = json.loads(completed.stdout.decode("utf-8", errors="replace"))
+    except ValueError:
+        return None
+
+    streams = probe.get("streams") or [{}]
+    stream = streams[0]
+    fmt = probe.get("format") or {}
+
+    duration = None
+    for value in (stream.get("duration"), fmt.get("duration")):
+        try:
+            duration = float(value)
+            break
+        except (TypeError, ValueError):
+            continue
+    if not duration:
+        return None
+
+    try:
+        sample_rate = int(stream.get("sample_rate"))
+    except (TypeError, ValueError):
+        sample_rate = None
+
+    return AudioInfo(
+        duration,
+        sample_rate,
+        stream.get("channels"),
+        stream.get("codec_name"),
+        "ffprobe",
+    )
+
+
+def _probe_decode(audio_file):
+    """メタ情報が得られない場合のフォールバック（全体をデコード）"""
+    setup_pydub_ffmpeg()  # ffmpegパスを設定
+    from pydub import AudioSegment
+    audio = AudioSegment.from_file(audio_file)
+    return AudioInfo(
+        len(audio) / 1000,  # ミリ秒を秒に変換
+        audio.frame_rate,
+        audio.channels,
+        None,
+        "decode",
+    )
+
+
+def probe_audio(audio_file):
+    """
+    音声ファイルのメタ情報を取得
+
+    WAVはヘッダーを直接読み、それ以外はffprobeでコンテナ情報を読む。
+    どちらでも取得できない場合のみ全体をデコードする。
+    結果はファイルのサイズと更新時刻をキーにキャッシュされる。
+
+    Args:
+        audio_file: 音声ファイルパス
+
+    Returns:
+        AudioInfo、取得できない場合は None
+    """
+    try:
+        stat = os.stat(audio_file)
+    except OSError as e:
+        print(f"⚠ 音声ファイル情報の取得に失敗: {e}")
+        return None
+
+    cache_key = (os.path.abspath(audio_file), stat.st_size, stat.st_mtime_ns)
+    if cache_key in _audio_info_cache:
+        return _audio_info_cache[cache_key]
+
+    info = None
+    try:
+        info = _probe_wav_header(audio_file)
+    except (OSError, struct.error):
+        info = None
+
+    if info is None:
+        info = _probe_ffprobe(audio_file)
+
+    if info is None:
+        try:
+            info = _probe_decode(audio_file)
+        except ImportError:
+            print("⚠ pydubがインストールされていないため、音声長さを自動検出できません")
+        except Exception as e:
+            print(f"⚠ 音声長さの取得に失敗: {e}")
+
+    if info is not None:
+        _audio_info_cache[cache_key] = info
+    return info
+
+
 def get_audio_duration(audio_file):
     """音声ファイルの長さを取得（秒）"""
+    info = probe_audio(audio_file)
+    if info is None:
+        return None
+    return info.duration
+
+
+def decode_audio(audio_file, progress_callback=None):
+    """
+    音声ファイルを16kHzモノラルのfloat32配列にデコード
+
+    Whisperが内部で行う変換と同じ形式に一度だけ変換し、
+    長さの取得・チャンク分割・文字起こしで使い回す。
+
+    Args:
+        audio_file: 音声ファイルパス
+        progress_callback: 進捗コールバック関数
+
+    Returns:
+        numpy.ndarray (float32, -1.0〜1.0)、失敗時は None
+    """
     try:
-        setup_pydub_ffmpeg()  # ffmpegパスを設定
-        from pydub import AudioSegment
-        audio = AudioSegment.from_file(audio_file)
-        return len(audio) / 1000  # ミリ秒を秒に変換
+        import numpy as np
+
+        with stage(progress_callback, "decode") as info:
+            command = [
+                get_ffmpeg_path(),
+                "-nostdin",
+                "-threads", "0",
+                "-i", audio_file,
+                "-f", "s16le",
+                "-ac", "1",
+                "-acodec", "pcm_s16le",
+                "-ar", str(SAMPLE_RATE),
+                "-",
+            ]
+            completed = subprocess.run(
+                command, capture_output=True, **_subprocess_kwargs()
+            )
+            if completed.returncode != 0:
+                stderr = completed.stderr.decode("utf-8", errors="replace").strip()
+                raise RuntimeError(stderr.splitlines()[-1] if stderr else "ffmpeg error")
+
+            audio = np.frombuffer(completed.stdout, np.int16).astype(np.float32)
+            audio *= 1.0 / 32768.0
+            info["audio_seconds"] = len(audio) / SAMPLE_RATE
+        return audio
+
     except ImportError:
-        print("⚠ pydubがインストールされていないため、音声長さを自動検出できません")
+        error_msg = "音声のデコードにはnumpyが必要です"
+        if progress_callback:
+            progress_callback(f"❌ {error_msg}")
         return None
     except Exception as e:
-        print(f"⚠ 音声長さの取得に失敗: {e}")
+        error_msg = f"音声のデコードに失敗: {e}"
+        if progress_callback:
+            progress_callback(f"❌ {error_msg}")
         return None
 
 
-def split_audio_file(audio_file, chunk_length_minutes=30, progress_callback=None):
+def decode_audio_head(audio_file, seconds):
+    """
+    音声ファイルの先頭だけを16kHzモノラルのfloat32配列にデコード
+
+    逐次読み込みなどで全体をデコードしない場合に、言語の判定用の区間を得るために使う。
+
+    Returns:
+        numpy.ndarray (float32, -1.0〜1.0)
+    """
+    import numpy as np
+
+    command = [
+        get_ffmpeg_path(),
+        "-nostdin",
+        "-threads", "0",
+        "-i", audio_file,
+        "-t", str(seconds),
+        "-f", "s16le",
+        "-ac", "1",
+        "-acodec", "pcm_s16le",
+        "-ar", str(SAMPLE_RATE),
+        "-",
+    ]
+    completed = subprocess.run(command, capture_output=True, **_subprocess_kwargs())
+    if completed.returncode != 0:
+        stderr = completed.stderr.decode("utf-8", errors="replace").strip()
+        raise RuntimeError(stderr.splitlines()[-1] if stderr else "ffmpeg error")
+
+    audio = np.frombuffer(completed.stdout, np.int16).astype(np.float32)
+    audio *= 1.0 / 32768.0
+    return audio
+
+
+def compute_frame_energy(audio, frame_seconds=VAD_FRAME_SECONDS):
     """
-    音声ファイルをチャンクに分割
+    フレームごとの音量(dBFS)をベクトル演算で計算
 
     Args:
-        audio_file: 音声ファイルパス
+        audio: 16kHzモノラル配列
+        frame_seconds: フレーム長（秒）
+
+    Returns:
+        フレームごとのdB値の配列（端数のフレームは含まない）
+    """
+    import numpy as np
+
+    frame = int(frame_seconds * SAMPLE_RATE)
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+
+    frames = audio[:n_frames * frame].reshape(n_frames, frame)
+    # einsumで二乗和を求め、全体の二乗配列を作らない
+    power = np.einsum("ij,ij->i", frames, frames) / frame
+    return 10.0 * np.log10(power + 1e-10)
+
+
+def _speech_threshold(energy):
+    """音量分布から音声/無音のしきい値(dB)を決める"""
+    import numpy as np
+
+    floor = float(np.percentile(energy, 10))
+    peak = float(np.percentile(energy, 95))
+    # 音量の変化がほとんどない場合は絶対値で判定
+    if peak - floor < 10.0:
+        return SILENCE_FLOOR_DB
+    return max(floor + (peak - floor) * 0.3, SILENCE_FLOOR_DB)
+
+
+def detect_speech_regions(audio, min_silence_seconds=MIN_SILENCE_SECONDS,
+                          padding_seconds=0.3, min_speech_seconds=0.2,
+                          threshold_db=None):
+    """
+    音声配列から発話区間を検出
+
+    Args:
+        audio: 16kHzモノラル配列
+        min_silence_seconds: この長さ未満の無音は発話区間に含める
+        padding_seconds: 発話区間の前後に残す余白（秒）
+        min_speech_seconds: この長さ未満の発話（クリック音など）は無視する
+        threshold_db: 発話とみなす音量（None=自動）
+
+    Returns:
+        (start_sample, end_sample) のリスト
+    """
+    import numpy as np
+
+    energy = compute_frame_energy(audio)
+    if len(energy) == 0:
+        return [(0, len(audio))] if len(audio) else []
+
+    if threshold_db is None:
+        threshold_db = _speech_threshold(energy)
+    speech = energy > threshold_db
+
+    edges = np.diff(np.concatenate(([0], speech.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if len(starts) == 0:
+        return []
+
+    # 短い無音で区切られた区間を結合
+    min_gap = int(min_silence_seconds / VAD_FRAME_SECONDS)
+    keep = (starts[1:] - ends[:-1]) >= min_gap
+    starts = np.concatenate((starts[:1], starts[1:][keep]))
+    ends = np.concatenate((ends[:-1][keep], ends[-1:]))
+
+    # 短すぎる発話を除外
+    min_len = max(1, int(min_speech_seconds / VAD_FRAME_SECONDS))
+    long_enough = (ends - starts) >= min_len
+    starts = starts[long_enough]
+    ends = ends[long_enough]
+
+    frame = int(VAD_FRAME_SECONDS * SAMPLE_RATE)
+    pad = int(padding_seconds * SAMPLE_RATE)
+    regions = []
+    for start, end in zip(starts * frame, ends * frame):
+        start = max(int(start) - pad, 0)
+        end = min(int(end) + pad, len(audio))
+        if end >= len(energy) * frame:
+            # 端数のフレームも含める
+            end = len(audio)
+        if regions and start <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+    return regions
+
+
+def find_speech_window(audio, seconds):
+    """
+    発話が最も多い seconds 秒の区間を切り出す
+
+    冒頭の無音や音楽で言語の判定を誤らないように使う。
+
+    Args:
+        audio: 16kHzモノラル配列
+        seconds: 切り出す長さ（秒）
+
+    Returns:
+        切り出した配列（音声が短い場合は全体）
+    """
+    import numpy as np
+
+    window = int(seconds * SAMPLE_RATE)
+    energy = compute_frame_energy(audio)
+    frames = int(seconds / VAD_FRAME_SECONDS)
+    if len(audio) <= window or len(energy) <= frames:
+        return audio
+
+    # 累積和で各区間の発話フレーム数を求め、最も多い区間（同数なら先頭側）を選ぶ
+    speech = (energy > _speech_threshold(energy)).astype(np.int32)
+    counts = np.concatenate(([0], np.cumsum(speech)))
+    best = int(np.argmax(counts[frames:] - counts[:-frames]))
+    start = min(best * int(VAD_FRAME_SECONDS * SAMPLE_RATE), len(audio) - window)
+    return audio[start:start + window]
+
+
+def find_pause(audio, target, lower=0, search_seconds=PAUSE_SEARCH_SECONDS):
+    """
+    target（サンプル位置）の手前で最も静かな位置を探す
+
+    Args:
+        audio: 16kHzモノラル配列
+        target: 本来の分割位置（サンプル）
+        lower: チャンクの開始位置（サンプル）
+        search_seconds: 手前に遡って探す範囲（秒）
+
+    Returns:
+        分割位置（サンプル）
+    """
+    import numpy as np
+
+    if target > len(audio):
+        return len(audio)
+
+    # 短いチャンクでは探索範囲をチャンク長の1/4までに抑える
+    search = min(int(search_seconds * SAMPLE_RATE), (target - lower) // 4)
+    lo = target - search
+    energy = compute_frame_energy(audio[lo:target])
+    if len(energy) == 0:
+        return target
+
+    # 一瞬の静寂ではなく息継ぎ程度の間を選ぶため平滑化する
+    width = max(1, int(0.3 / VAD_FRAME_SECONDS))
+    if len(energy) > width:
+        energy = np.convolve(energy, np.ones(width) / width, mode="same")
+
+    # 同じ静かさなら分割位置に近い方（チャンクが長くなる方）を選ぶ
+    idx = len(energy) - 1 - int(np.argmin(energy[::-1]))
+    frame = int(VAD_FRAME_SECONDS * SAMPLE_RATE)
+    return lo + idx * frame + frame // 2
+
+
+def split_audio_array(audio, chunk_length_minutes=30, progress_callback=None,
+                      cut_at_pauses=False, overlap_seconds=0):
+    """
+    デコード済みの音声配列をチャンクに分割
+
+    各チャンクは元の配列のビュー（ゼロコピー）なので、
+    分割によるメモリ使用量の増加やディスクへの書き出しは発生しない。
+
+    Args:
+        audio: decode_audioで得た16kHzモノラル配列
         chunk_length_minutes: チャンクの長さ（分）
         progress_callback: 進捗コールバック関数
+        cut_at_pauses: 分割位置を直前の無音に合わせるか
+        overlap_seconds: 前のチャンクと重複させる長さ（秒）
 
     Returns:
-        (chunks, temp_dir) のタプル、失敗時は (None, None)
+        AudioChunk のリスト
     """
-    try:
-        setup_pydub_ffmpeg()  # ffmpegパスを設定
-        from pydub import AudioSegment
+    with stage(progress_callback, "split", chunk_length_minutes=chunk_length_minutes) as info:
+        chunk_samples = int(chunk_length_minutes * 60 * SAMPLE_RATE)
+        overlap = min(int(overlap_seconds * SAMPLE_RATE), chunk_samples // 2)
+        chunks = []
+        start = 0
+        while start < len(audio):
+            end = start + chunk_samples
+            if cut_at_pauses and end < len(audio):
+                end = find_pause(audio, end, lower=start)
+            end = min(end, len(audio))
+            # 2つ目以降のチャンクは前のチャンクの末尾を含める
+            begin = max(start - overlap, 0)
+            chunks.append(AudioChunk(audio[begin:end], begin / SAMPLE_RATE, end / SAMPLE_RATE))
+            start = end
+        info["chunks"] = len(chunks)
 
-        if progress_callback:
-            progress_callback(f"音声ファイルを{chunk_length_minutes}分ごとに分割しています...")
+    return chunks
 
-        audio = AudioSegment.from_file(audio_file)
-        chunk_length_ms = chunk_length_minutes * 60 * 1000
 
-        chunks = []
-        total_chunks = len(audio) // chunk_length_ms + (1 if len(audio) % chunk_length_ms else 0)
+def _iter_pcm_chunks(audio_file, chunk_samples):
+    """ffmpegのパイプから16kHzモノラルのPCM(int16)バイト列を逐次読み出す"""
+    command = [
+        get_ffmpeg_path(),
+        "-nostdin",
+        "-loglevel", "error",
+        "-threads", "0",
+        "-i", audio_file,
+        "-f", "s16le",
+        "-ac", "1",
+        "-acodec", "pcm_s16le",
+        "-ar", str(SAMPLE_RATE),
+        "-",
+    ]
+    # エラーメッセージはパイプが詰まらないよう一時ファイルに受ける
+    with tempfile.TemporaryFile() as stderr_file:
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=stderr_file,
+            **_subprocess_kwargs()
+        )
+
+        finished = False
+        total_bytes = 0
+        try:
+            while True:
+                # BufferedReader.read(n) はnバイト揃うかEOFまでブロックする
+                data = process.stdout.read(chunk_samples * 2)
+                if len(data) < 2:
+                    finished = True
+                    break
+                data = data[:len(data) - len(data) % 2]
+                total_bytes += len(data)
+                yield data
+        finally:
+            process.stdout.close()
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+
+        # 途中で読むのをやめた場合（kill した場合）は失敗とみなさない
+        if finished and (process.returncode != 0 or total_bytes == 0):
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode("utf-8", errors="replace").strip()
+            raise RuntimeError(
+                stderr.splitlines()[-1] if stderr
+                else f"ffmpegによる音声の読み込みに失敗しました (code {process.returncode})"
+            )
+
+
+def stream_audio_chunks(audio_file, chunk_length_minutes=30, progress_callback=None,
+                        cut_at_pauses=False, overlap_seconds=0):
+    """
+    ffmpegのパイプから1チャンクずつ読み出すジェネレーター
+
+    ファイル全体をメモリに載せないため、ピークメモリは
+    chunk_length_minutes のみに依存し、音声の長さには依存しない。
+
+    Args:
+        audio_file: 音声ファイルパス
+        chunk_length_minutes: チャンクの長さ（分）
+        progress_callback: 進捗コールバック関数
+        cut_at_pauses: 分割位置を直前の無音に合わせるか
+        overlap_seconds: 前のチャンクと重複させる長さ（秒）
+
+    Yields:
+        AudioChunk
+    """
+    import numpy as np
+
+    if progress_callback:
+        progress_callback(f"音声を{chunk_length_minutes}分ごとに逐次読み込みます...")
+
+    chunk_samples = int(chunk_length_minutes * 60 * SAMPLE_RATE)
+    overlap = min(int(overlap_seconds * SAMPLE_RATE), chunk_samples // 2)
+    pending = np.zeros(0, dtype=np.float32)
+    begin = 0  # pendingの先頭の位置（サンプル）
+    lead = 0   # pendingの先頭にある前チャンクとの重複部分
+    for data in _iter_pcm_chunks(audio_file, chunk_samples):
+        block = np.frombuffer(data, np.int16).astype(np.float32)
+        block *= 1.0 / 32768.0
+        del data
+        pending = np.concatenate((pending, block)) if len(pending) else block
+        del block
+
+        # 保持するのは常に2チャンク分程度まで
+        while len(pending) >= lead + chunk_samples:
+            cut = lead + chunk_samples
+            if cut_at_pauses:
+                cut = find_pause(pending, cut, lower=lead)
+            end = begin + cut
+            yield AudioChunk(pending[:cut], begin / SAMPLE_RATE, end / SAMPLE_RATE)
+            lead = min(overlap, cut)
+            pending = pending[cut - lead:]
+            begin = end - lead
 
-        for i, start_ms in enumerate(range(0, len(audio), chunk_length_ms)):
-            end_ms = min(start_ms + chunk_length_ms, len(audio))
-            chunk = audio[start_ms:end_ms]
+    if len(pending) > lead:
+        end = begin + len(pending)
+        yield AudioChunk(pending, begin / SAMPLE_RATE, end / SAMPLE_RATE)
 
-            # 一時ファイルとして保存
-            temp_dir = os.path.join(os.path.dirname(audio_file), "temp_chunks")
-            os.makedirs(temp_dir, exist_ok=True)
 
+def skip_silent_regions(chunks, min_silence_seconds=MIN_SILENCE_SECONDS,
+                        progress_callback=None):
+    """
+    各チャンクから無音区間を取り除くジェネレーター
+
+    発話区間だけを連結したチャンクを返す。連結位置は timeline に記録され、
+    chunk_time_to_source で元の時間軸に戻せる。
+    発話が全くないチャンクは出力しない。
+
+    Args:
+        chunks: AudioChunk のイテラブル
+        min_silence_seconds: この長さ以上の無音を取り除く
+        progress_callback: 進捗コールバック関数
+
+    Yields:
+        AudioChunk
+    """
+    import numpy as np
+
+    for chunk in chunks:
+        audio = load_chunk_audio(chunk.audio)
+        if isinstance(audio, str):
+            # 解析できない形式はそのまま渡す
+            yield chunk
+            continue
+
+        regions = detect_speech_regions(audio, min_silence_seconds)
+        speech_samples = sum(end - start for start, end in regions)
+        skipped = (len(audio) - speech_samples) / SAMPLE_RATE
+
+        if progress_callback and skipped >= 1:
+            progress_callback(
+                f"  無音区間 {format_time(skipped)} をスキップ "
+                f"({format_time(chunk.start)} - {format_time(chunk.end)})"
+            )
+
+        if not regions:
+            continue
+
+        if len(regions) == 1:
+            start, end = regions[0]
+            yield AudioChunk(
+                audio[start:end],
+                chunk.start + start / SAMPLE_RATE,
+                chunk.start + end / SAMPLE_RATE,
+            )
+            continue
+
+        timeline = []
+        offset = 0
+        for start, end in regions:
+            timeline.append((offset / SAMPLE_RATE, chunk.start + start / SAMPLE_RATE))
+            offset += end - start
+
+        yield AudioChunk(
+            np.concatenate([audio[start:end] for start, end in regions]),
+            chunk.start + regions[0][0] / SAMPLE_RATE,
+            chunk.start + regions[-1][1] / SAMPLE_RATE,
+            timeline,
+        )
+
+
+def chunk_time_to_source(chunk, seconds, is_end=False):
+    """
+    チャンク内の時刻を元の音声の時刻に変換
+
+    Args:
+        chunk: AudioChunk
+        seconds: チャンク先頭からの秒数
+        is_end: 区間の終了時刻か（連結位置ちょうどの場合は前の区間に含める）
+    """
+    if not chunk.timeline:
+        return chunk.start + seconds
+
+    keys = [chunk_offset for chunk_offset, _ in chunk.timeline]
+    if is_end:
+        idx = bisect.bisect_left(keys, seconds) - 1
+    else:
+        idx = bisect.bisect_right(keys, seconds) - 1
+    chunk_offset, source_offset = chunk.timeline[max(idx, 0)]
+    return source_offset + (seconds - chunk_offset)
+
+
+def split_audio_file(audio_file, chunk_length_minutes=30, progress_callback=None,
+                     cut_at_pauses=False, overlap_seconds=0):
+    """
+    音声ファイルをチャンクに分割し、ディスクに書き出す（スピルモード）
+
+    非常に長い音声向け。16kHzモノラルPCMのWAVとして、
+    ジョブごとに作成する非公開の一時ディレクトリへ書き出す。
+    元ファイルの場所には何も書き込まない。
+
+    Args:
+        audio_file: 音声ファイルパス
+        chunk_length_minutes: チャンクの長さ（分）
+        progress_callback: 進捗コールバック関数
+        cut_at_pauses: 分割位置を直前の無音に合わせるか
+        overlap_seconds: 前のチャンクと重複させる長さ（秒）
+
+    Returns:
+        (chunks, temp_dir) のタプル、失敗時は (None, None)
+    """
+    temp_dir = None
+    try:
+        import tempfile
+        import wave
+        import numpy as np
+
+        with stage(progress_callback, "split",
+                   chunk_length_minutes=chunk_length_minutes, spill=True) as info:
+            # mkdtempは作成ユーザーのみアクセス可能なディレクトリを作る
+            temp_dir = tempfile.mkdtemp(prefix="transcribe_chunks_")
             base_name = os.path.splitext(os.path.basename(audio_file))[0]
-            chunk_file = os.path.join(temp_dir, f"{base_name}_chunk_{i+1:03d}.wav")
+            duration = get_audio_duration(audio_file)
+            total_label = math.ceil(duration / (chunk_length_minutes * 60)) if duration else "?"
 
-            chunk.export(chunk_file, format="wav")
-            chunks.append((chunk_file, start_ms / 1000, end_ms / 1000))
+            chunks = []
+            stream = stream_audio_chunks(
+                audio_file,
+                chunk_length_minutes,
+                cut_at_pauses=cut_at_pauses,
+                overlap_seconds=overlap_seconds
+            )
+            for i, chunk in enumerate(stream):
+                chunk_file = os.path.join(temp_dir, f"{base_name}_chunk_{i+1:03d}.wav")
 
-            if progress_callback:
-                progress_callback(f"チャンク {i+1}/{total_chunks} を作成")
+                # 元がint16なので32768倍で誤差なく戻る
+                pcm = (chunk.audio * 32768.0).clip(-32768, 32767).astype(np.int16)
+                with wave.open(chunk_file, "wb") as w:
+                    w.setnchannels(1)
+                    w.setsampwidth(2)
+                    w.setframerate(SAMPLE_RATE)
+                    w.writeframes(pcm.tobytes())
+                del pcm
 
-        if progress_callback:
-            progress_callback(f"✓ {len(chunks)}個のチャンクに分割しました")
+                chunks.append(AudioChunk(chunk_file, chunk.start, chunk.end))
+
+                if progress_callback:
+                    progress_callback(f"チャンク {i+1}/{total_label} を作成")
+
+            info["chunks"] = len(chunks)
 
         return chunks, temp_dir
 
-    except ImportError:
-        error_msg = "長時間音声の処理にはpydubとffmpegが必要です"
-        if progress_callback:
-            progress_callback(f"❌ {error_msg}")
-        return None, None
     except Exception as e:
         error_msg = f"音声ファイルの分割に失敗: {e}"
         if progress_callback:
             progress_callback(f"❌ {error_msg}")
         import traceback
         traceback.print_exc()
+        cleanup_temp_files(temp_dir)
         return None, None
 
 
+def load_chunk_audio(chunk_audio):
+    """
+    チャンクをモデルに渡せる形式に変換
+
+    配列はそのまま返し、split_audio_fileが書き出した16kHzモノラルWAVは
+    ffmpegを介さずに直接float32配列へ読み込む。
+    それ以外のパスはWhisper側でデコードさせる。
+    """
+    if not isinstance(chunk_audio, str):
+        return chunk_audio
+
+    import wave
+    import numpy as np
+
+    try:
+        with wave.open(chunk_audio, "rb") as w:
+            if (w.getframerate() != SAMPLE_RATE or w.getnchannels() != 1
+                    or w.getsampwidth() != 2):
+                return chunk_audio
+            data = w.readframes(w.getnframes())
+    except (wave.Error, EOFError):
+        return chunk_audio
+
+    audio = np.frombuffer(data, np.int16).astype(np.float32)
+    audio *= 1.0 / 32768.0
+    return audio
+
+
 def format_time(seconds):
     """秒数を時間文字列にフォーマット"""
     return str(timedelta(seconds=int(seconds)))
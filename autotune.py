@@ -0,0 +1,361 @@
+"""
+自動調整
+この環境でtorchのスレッド数・並列ワーカー数（指定すればチャンク長も）を計測し、
+最も速い設定を保存する
+
+使い方:
+    python autotune.py --model medium
+    python autotune.py --model small --audio 会議サンプル.mp3 --chunk-minutes 10,20 --vad
+    python autotune.py --show
+
+保存した設定は TranscribeEngine が既定で読み込む（モデルと精度ごと）。
+計測には合成音声（または指定した録音）を使い、各設定を別のプロセスで実行する。
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import statistics
+import tempfile
+
+from app_paths import get_app_data_dir
+
+
+PROFILE_FILE = "tuning_profile.json"
+
+# 保存形式
+PROFILE_VERSION = 1
+
+# プロファイルがない場合のチャンク長（分）
+DEFAULT_CHUNK_LENGTH_MINUTES = 30
+
+# これより短いチャンク長は、重複やVADで境界を補う場合にだけ使う（分）。
+# 境界で文が切れる回数が増え、精度が下がるため
+MIN_PROFILE_CHUNK_MINUTES = 10
+
+# ワーカー数を比べるときのチャンク長（分）と、各ワーカーに行き渡らせるチャンク数
+WORKER_CHUNK_MINUTES = 1
+CHUNKS_PER_WORKER = 3
+
+
+def profile_path():
+    """設定の保存先"""
+    return os.path.join(get_app_data_dir(), PROFILE_FILE)
+
+
+def machine_info():
+    """設定が計測された環境（異なる環境の設定は使わない）"""
+    return {
+        "cpu_count": os.cpu_count(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+    }
+
+
+def _profile_key(model_name, precision):
+    return f"{model_name}/{precision}"
+
+
+def _read_profiles(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"⚠ 自動調整の設定を読み込めません: {e}")
+        return {}
+    if data.get("version") != PROFILE_VERSION:
+        return {}
+    return data.get("profiles", {})
+
+
+def load_profile(model_name, precision="fp32", path=None):
+    """
+    この環境で計測したモデルの設定を取得
+
+    Returns:
+        torch_threads, workers（チャンク長を計測した場合は chunk_length_minutes）を
+        持つ辞書（ない場合は None）
+    """
+    profile = _read_profiles(path or profile_path()).get(_profile_key(model_name, precision))
+    if not profile or profile.get("machine") != machine_info():
+        return None
+    return profile
+
+
+def save_profile(model_name, precision, profile, path=None):
+    """モデルの設定を保存（他のモデルの設定は残す）"""
+    path = path or profile_path()
+    profiles = _read_profiles(path)
+    profiles[_profile_key(model_name, precision)] = profile
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": PROFILE_VERSION, "profiles": profiles}, f,
+                  ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+    return path
+
+
+# --- 計測 -------------------------------------------------------------------
+
+def default_thread_candidates(cpu_count):
+    """スレッド数の候補（1からコア数までの2の累乗とコア数）"""
+    candidates = []
+    threads = 1
+    while threads < cpu_count:
+        candidates.append(threads)
+        threads *= 2
+    candidates.append(cpu_count)
+    return candidates
+
+
+def default_worker_candidates(cpu_count):
+    """ワーカー数の候補（1, 2, 4 のうちコア数以下）"""
+    return [w for w in (1, 2, 4) if w <= cpu_count]
+
+
+def parallel_candidates(thread_candidates, worker_candidates, cpu_count):
+    """コア数を超えない (ワーカー数, ワーカーごとのスレッド数) の組み合わせ"""
+    return [
+        (workers, threads)
+        for workers in worker_candidates
+        for threads in thread_candidates
+        if workers * threads <= cpu_count
+    ]
+
+
+def default_clip_seconds(worker_candidates):
+    """ワーカー数の比較で各ワーカーに CHUNKS_PER_WORKER 個のチャンクが行き渡る音声の長さ（秒）"""
+    return max(worker_candidates) * CHUNKS_PER_WORKER * WORKER_CHUNK_MINUTES * 60
+
+
+def worker_chunk_minutes(duration, worker_candidates):
+    """ワーカー数の比較に使うチャンク長（分、短い録音では各ワーカーに行き渡るよう短くする）"""
+    chunks = max(worker_candidates) * CHUNKS_PER_WORKER
+    return min(WORKER_CHUNK_MINUTES, duration / chunks / 60)
+
+
+def storable_chunk_minutes(chunk_minutes, vad=False, overlap_seconds=0):
+    """
+    設定に保存してよいチャンク長か
+
+    短いチャンクは境界で文が切れやすいため、重複やVADで境界を補って計測した場合だけ保存する。
+    """
+    return chunk_minutes >= MIN_PROFILE_CHUNK_MINUTES or bool(vad or overlap_seconds)
+
+
+def tune(params, thread_candidates, worker_candidates, chunk_candidates=None,
+         repeat=1, isolate=True, log=print):
+    """
+    最も速い設定を探す
+
+    まず各ワーカーに複数のチャンクが行き渡る短いチャンク長でワーカー数とスレッド数の
+    組み合わせを比べる。chunk_candidates を指定した場合は、最も速かった組み合わせで
+    チャンク長も比べる（既定の DEFAULT_CHUNK_LENGTH_MINUTES を必ず含める）。
+
+    Returns:
+        (最も速い設定, すべての試行のリスト)。チャンク長を比べなかった場合、
+        最も速い設定の chunk_length_minutes は None
+    """
+    from benchmark import run_stage, run_stage_isolated
+
+    cpu_count = os.cpu_count() or 1
+    trials = []
+
+    def measure(chunk_minutes, workers, threads):
+        trial_params = dict(
+            params,
+            chunk_minutes=chunk_minutes,
+            workers=workers,
+            torch_threads=threads,
+            warm_up=True,
+        )
+        walls = []
+        for _ in range(repeat):
+            if isolate:
+                records = run_stage_isolated("model", trial_params)
+            else:
+                records = run_stage("model", trial_params)
+            walls.append(records["transcribe"]["wall_seconds"])
+        wall = statistics.median(walls)
+        trial = {
+            "chunk_length_minutes": chunk_minutes,
+            "workers": workers,
+            "torch_threads": threads,
+            "wall_seconds": wall,
+            "realtime_factor": params["duration"] / wall if wall else None,
+        }
+        trials.append(trial)
+        log(f"  チャンク {chunk_minutes}分 / ワーカー {workers} / スレッド {threads}:"
+            f" {wall:.2f}s（{trial['realtime_factor']:.1f}倍）")
+        return trial
+
+    base_chunk = round(worker_chunk_minutes(params["duration"], worker_candidates), 3)
+    log(f"ワーカー数とスレッド数を比較しています（チャンク {base_chunk}分）...")
+    parallel_trials = [
+        measure(base_chunk, workers, threads)
+        for workers, threads in parallel_candidates(thread_candidates, worker_candidates,
+                                                    cpu_count)
+    ]
+    best = dict(min(parallel_trials, key=lambda t: t["wall_seconds"]),
+                chunk_length_minutes=None)
+    if not chunk_candidates:
+        return best, trials
+
+    chunk_candidates = sorted(set(chunk_candidates) | {DEFAULT_CHUNK_LENGTH_MINUTES})
+    log(f"チャンク長を比較しています（ワーカー {best['workers']} / スレッド {best['torch_threads']}）...")
+    chunk_trials = [
+        measure(chunk_minutes, best["workers"], best["torch_threads"])
+        for chunk_minutes in chunk_candidates
+    ]
+    return min(chunk_trials, key=lambda t: t["wall_seconds"]), trials
+
+
+# --- コマンドライン ---------------------------------------------------------
+
+def _parse_numbers(text, cast):
+    return [cast(value) for value in text.split(",") if value.strip()]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="チャンク長・スレッド数・ワーカー数をこの環境に合わせて自動調整",
+    )
+    parser.add_argument("--model", default="medium",
+                        help="調整するWhisperモデル（既定: medium、stub=動作確認用）")
+    parser.add_argument("--int8", action="store_true",
+                        help="int8量子化したモデルで調整する")
+
+    clip = parser.add_argument_group("計測に使う音声")
+    clip.add_argument("--audio", help="計測に使う録音（既定: 合成音声）")
+    clip.add_argument("--duration", type=float,
+                      help="合成音声の長さ（秒、既定: 各ワーカーに"
+                           f"{CHUNKS_PER_WORKER}個のチャンクが行き渡る長さ）")
+
+    search = parser.add_argument_group("候補")
+    search.add_argument("--chunk-minutes",
+                        help="チャンク長も比べる場合の候補（分、カンマ区切り、"
+                             f"{DEFAULT_CHUNK_LENGTH_MINUTES}分は必ず含める。既定: 比べない）")
+    search.add_argument("--vad", action="store_true",
+                        help="VADで無音に合わせて分割する処理で計測する"
+                             f"（{MIN_PROFILE_CHUNK_MINUTES}分未満のチャンク長も保存できる）")
+    search.add_argument("--overlap", type=float, default=0,
+                        help="隣り合うチャンクを重複させる処理で計測する（秒、"
+                             f"{MIN_PROFILE_CHUNK_MINUTES}分未満のチャンク長も保存できる）")
+    search.add_argument("--threads",
+                        help="ワーカーごとのスレッド数の候補（既定: 1からコア数までの2の累乗）")
+    search.add_argument("--workers",
+                        help="ワーカー数の候補（既定: 1,2,4 のうちコア数以下）")
+    search.add_argument("--repeat", type=int, default=1, help="各設定の実行回数（既定: 1）")
+    search.add_argument("--in-process", action="store_true",
+                        help="設定ごとにプロセスを分けない（スレッド数の変更が正しく反映されない）")
+
+    parser.add_argument("--dry-run", action="store_true", help="結果を保存しない")
+    parser.add_argument("--show", action="store_true", help="保存済みの設定を表示して終了")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    precision = "int8" if args.int8 else "fp32"
+    # 計測中はデータの保存先が作業ディレクトリに切り替わるため先に決めておく
+    path = profile_path()
+
+    if args.show:
+        profile = load_profile(args.model, precision, path)
+        if profile is None:
+            print(f"モデル「{args.model}」（{precision}）の設定はありません（{path}）")
+            return 1
+        print(json.dumps(profile, ensure_ascii=False, indent=2))
+        return 0
+
+    cpu_count = os.cpu_count() or 1
+    chunk_candidates = (_parse_numbers(args.chunk_minutes, float) if args.chunk_minutes
+                        else None)
+    thread_candidates = (_parse_numbers(args.threads, int) if args.threads
+                         else default_thread_candidates(cpu_count))
+    worker_candidates = (_parse_numbers(args.workers, int) if args.workers
+                         else default_worker_candidates(cpu_count))
+    if args.model == "stub":
+        # スタブモデルはワーカープロセスで動かせない
+        worker_candidates = [1]
+
+    workdir = tempfile.mkdtemp(prefix="transcribe_tune_")
+    try:
+        if args.audio:
+            from audio_processor import get_audio_duration
+            audio_file = os.path.abspath(args.audio)
+            duration = get_audio_duration(audio_file)
+            if not duration:
+                print(f"音声の長さを取得できません: {args.audio}")
+                return 2
+        else:
+            from benchmark import generate_audio
+            duration = args.duration or default_clip_seconds(worker_candidates)
+            audio_file = os.path.join(workdir, f"synthetic_{int(duration)}s.wav")
+            print(f"合成音声を生成しています: {audio_file}")
+            generate_audio(audio_file, duration)
+
+        params = {
+            "duration": duration,
+            "overlap": args.overlap,
+            "vad": args.vad,
+            "model": args.model,
+            "stub_rtf": 0,
+            "quantize": args.int8,
+            "workdir": workdir,
+            "audio_file": audio_file,
+        }
+        started = time.perf_counter()
+        best, trials = tune(
+            params, thread_candidates, worker_candidates, chunk_candidates,
+            repeat=args.repeat, isolate=not args.in_process
+        )
+        elapsed = time.perf_counter() - started
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print()
+    print(f"最も速い設定（計測 {len(trials)}通り、{elapsed:.0f}秒）:")
+    chunk_minutes = best["chunk_length_minutes"]
+    if chunk_minutes is not None and not storable_chunk_minutes(chunk_minutes, args.vad,
+                                                                args.overlap):
+        print(f"  チャンク長: {chunk_minutes}分（{MIN_PROFILE_CHUNK_MINUTES}分未満のため保存しません。"
+              "--vad または --overlap で計測すると保存できます）")
+        chunk_minutes = None
+    elif chunk_minutes is not None:
+        print(f"  チャンク長: {chunk_minutes}分")
+    print(f"  ワーカー数: {best['workers']}")
+    print(f"  スレッド数: {best['torch_threads']}")
+    print(f"  処理速度: {best['realtime_factor']:.1f}倍")
+
+    if args.dry_run:
+        return 0
+
+    profile = {
+        "workers": best["workers"],
+        "torch_threads": best["torch_threads"],
+        "realtime_factor": best["realtime_factor"],
+        "machine": machine_info(),
+        "source": os.path.basename(args.audio) if args.audio else f"synthetic {duration:.0f}s",
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "trials": trials,
+    }
+    if chunk_minutes is not None:
+        profile["chunk_length_minutes"] = chunk_minutes
+    save_profile(args.model, precision, profile, path)
+    print(f"\n✓ 設定を保存しました: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    # PyInstallerでビルドした場合に計測用のプロセスを起動できるようにする
+    import multiprocessing
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,319 @@
+"""
+バッチ処理モジュール
+複数の音声ファイルを1つのエンジン（読み込み済みモデル）で順に文字起こしする
+"""
+
+import os
+import time
+import itertools
+import threading
+
+from audio_processor import AUDIO_EXTENSIONS, probe_audio
+
+
+class TranscribeJob:
+    """キュー内の1ファイル分のジョブ"""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    def __init__(self, job_id, audio_file, priority=0, order=0, options=None):
+        """
+        Args:
+            job_id: ジョブ番号
+            audio_file: 音声ファイルパス
+            priority: 優先度（大きいほど先に処理）
+            order: 同じ優先度内での順番
+            options: TranscribeEngine.transcribe に渡す追加の引数
+        """
+        self.job_id = job_id
+        self.audio_file = audio_file
+        self.priority = priority
+        self.order = order
+        self.options = options or {}
+        self.status = self.QUEUED
+        self.message = ""
+        self.output_file = None
+        self.output_files = []
+        self.result = None
+        self.audio_seconds = None
+        self.wall_seconds = None
+
+    def sort_key(self):
+        return (-self.priority, self.order)
+
+    @property
+    def realtime_factor(self):
+        """処理速度（音声の時間 / 実時間）。1時間で何時間分を処理できるかに等しい"""
+        if self.audio_seconds and self.wall_seconds:
+            return self.audio_seconds / self.wall_seconds
+        return None
+
+
+class BatchQueue:
+    """優先度付きの文字起こしジョブキュー"""
+
+    def __init__(self, engine, progress_callback=None, on_job_update=None,
+                 preload=True):
+        """
+        Args:
+            engine: すべてのジョブで共有する TranscribeEngine
+            progress_callback: (job, message) で呼ばれる進捗コールバック関数
+            on_job_update: ジョブの状態が変わるたびに (job) で呼ばれる関数
+            preload: 開始時にモデルを読み込むか（False=必要になった時点で読み込む）
+        """
+        self.engine = engine
+        self.preload = preload
+        self.progress_callback = progress_callback
+        self.on_job_update = on_job_update
+        self._jobs = []
+        self._ids = itertools.count(1)
+        self._orders = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self._started_at = None
+        self._finished_at = None
+
+    def add_file(self, audio_file, priority=0, **options):
+        """ファイルをキューに追加し、作成したジョブを返す"""
+        with self._condition:
+            job = TranscribeJob(
+                next(self._ids), audio_file, priority, next(self._orders), options
+            )
+            self._jobs.append(job)
+            self._finished_at = None
+            self._condition.notify_all()
+        self._notify(job)
+        return job
+
+    def add_files(self, audio_files, priority=0, **options):
+        """複数のファイルをキューに追加"""
+        return [self.add_file(path, priority, **options) for path in audio_files]
+
+    def add_folder(self, folder, recursive=False, priority=0, **options):
+        """フォルダ内の音声ファイルをファイル名順にキューに追加"""
+        return self.add_files(find_audio_files(folder, recursive), priority, **options)
+
+    def jobs(self):
+        """すべてのジョブ（待機中のものは処理される順）"""
+        with self._condition:
+            queued = sorted(
+                (job for job in self._jobs if job.status == TranscribeJob.QUEUED),
+                key=TranscribeJob.sort_key,
+            )
+            others = [job for job in self._jobs if job.status != TranscribeJob.QUEUED]
+            return others + queued
+
+    def _find(self, job_id):
+        for job in self._jobs:
+            if job.job_id == job_id:
+                return job
+        return None
+
+    def set_priority(self, job_id, priority):
+        """待機中のジョブの優先度を変更"""
+        with self._condition:
+            job = self._find(job_id)
+            if job is None or job.status != TranscribeJob.QUEUED:
+                return False
+            job.priority = priority
+        self._notify(job)
+        return True
+
+    def move(self, job_id, position):
+        """
+        待機中のジョブを待機列の指定位置に移動
+
+        移動先の前後のジョブと同じ優先度になる。
+        """
+        with self._condition:
+            job = self._find(job_id)
+            if job is None or job.status != TranscribeJob.QUEUED:
+                return False
+
+            queued = sorted(
+                (j for j in self._jobs if j.status == TranscribeJob.QUEUED and j is not job),
+                key=TranscribeJob.sort_key,
+            )
+            position = max(0, min(position, len(queued)))
+            queued.insert(position, job)
+
+            # 並び順どおりに処理されるよう優先度と順番を振り直す
+            neighbor = queued[position + 1] if position + 1 < len(queued) else (
+                queued[position - 1] if position > 0 else job
+            )
+            job.priority = neighbor.priority
+            for j in queued:
+                j.order = next(self._orders)
+        self._notify(job)
+        return True
+
+    def move_to_front(self, job_id):
+        """待機中のジョブを次に処理する"""
+        return self.move(job_id, 0)
+
+    def cancel(self, job_id):
+        """待機中のジョブを取り消す"""
+        with self._condition:
+            job = self._find(job_id)
+            if job is None or job.status != TranscribeJob.QUEUED:
+                return False
+            job.status = TranscribeJob.CANCELLED
+        self._notify(job)
+        return True
+
+    def start(self):
+        """バックグラウンドで処理を開始（キューが空になると待機する）"""
+        with self._condition:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """実行中のジョブの完了後に処理を停止"""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+
+    def wait(self, timeout=None):
+        """待機中のジョブがすべて終わるまで待つ"""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not any(
+                    job.status in (TranscribeJob.QUEUED, TranscribeJob.RUNNING)
+                    for job in self._jobs
+                ),
+                timeout,
+            )
+
+    def is_busy(self):
+        """処理中または待機中のジョブがあるか"""
+        with self._condition:
+            return any(
+                job.status in (TranscribeJob.QUEUED, TranscribeJob.RUNNING)
+                for job in self._jobs
+            )
+
+    def _next_job(self):
+        """次に処理するジョブを取り出す（なければ待機、停止時は None）"""
+        with self._condition:
+            while True:
+                if self._stopping:
+                    return None
+                queued = [job for job in self._jobs if job.status == TranscribeJob.QUEUED]
+                if queued:
+                    job = min(queued, key=TranscribeJob.sort_key)
+                    job.status = TranscribeJob.RUNNING
+                    if self._started_at is None:
+                        self._started_at = time.perf_counter()
+                    return job
+                self._condition.wait()
+
+    def _run(self):
+        # モデルは一度だけ読み込み、すべてのジョブで使い回す
+        if self.preload:
+            self.engine.preload()
+
+        while True:
+            job = self._next_job()
+            if job is None:
+                break
+            self._notify(job)
+            self._run_job(job)
+
+            with self._condition:
+                if not any(j.status == TranscribeJob.QUEUED for j in self._jobs):
+                    self._finished_at = time.perf_counter()
+                self._condition.notify_all()
+
+    def _run_job(self, job):
+        info = probe_audio(job.audio_file)
+        job.audio_seconds = info.duration if info else None
+
+        def progress_callback(message):
+            job.message = message
+            if self.progress_callback:
+                self.progress_callback(job, message)
+
+        started = time.perf_counter()
+        try:
+            success, message, output_file = self.engine.transcribe(
+                job.audio_file,
+                progress_callback=progress_callback,
+                **job.options
+            )
+        except Exception as e:
+            success, message, output_file = False, f"エラー: {e}", None
+        job.wall_seconds = time.perf_counter() - started
+
+        job.status = TranscribeJob.DONE if success else TranscribeJob.FAILED
+        job.message = message
+        job.output_file = output_file
+        job.output_files = self.engine.last_output_files if success else []
+        job.result = self.engine.last_result if success else None
+        self._notify(job)
+
+    def _notify(self, job):
+        if self.on_job_update:
+            self.on_job_update(job)
+
+    def stats(self):
+        """
+        ジョブごとと全体の処理速度
+
+        throughput は音声の時間 / 実時間（1時間あたりに処理できる音声の時間数）。
+        """
+        with self._condition:
+            done = [job for job in self._jobs if job.status == TranscribeJob.DONE]
+            audio_seconds = sum(job.audio_seconds or 0 for job in done)
+            busy_seconds = sum(job.wall_seconds or 0 for job in done)
+
+            elapsed = None
+            if self._started_at is not None:
+                elapsed = (self._finished_at or time.perf_counter()) - self._started_at
+
+            return {
+                "jobs": [
+                    {
+                        "job_id": job.job_id,
+                        "audio_file": job.audio_file,
+                        "status": job.status,
+                        "audio_seconds": job.audio_seconds,
+                        "wall_seconds": job.wall_seconds,
+                        "throughput": job.realtime_factor,
+                    }
+                    for job in self._jobs
+                ],
+                "completed": len(done),
+                "failed": sum(job.status == TranscribeJob.FAILED for job in self._jobs),
+                "queued": sum(job.status == TranscribeJob.QUEUED for job in self._jobs),
+                "audio_seconds": audio_seconds,
+                "elapsed_seconds": elapsed,
+                "throughput": audio_seconds / elapsed if elapsed else None,
+                "busy_throughput": audio_seconds / busy_seconds if busy_seconds else None,
+            }
+
+
+def find_audio_files(folder, recursive=False):
+    """フォルダ内の対応形式の音声ファイルをファイル名順に列挙"""
+    extensions = tuple(f".{ext}" for ext in AUDIO_EXTENSIONS)
+    found = []
+    if recursive:
+        for root, _, names in os.walk(folder):
+            found.extend(
+                os.path.join(root, name) for name in names
+                if name.lower().endswith(extensions)
+            )
+    else:
+        found.extend(
+            os.path.join(folder, name) for name in os.listdir(folder)
+            if name.lower().endswith(extensions)
+            and os.path.isfile(os.path.join(folder, name))
+        )
+    return sorted(found)
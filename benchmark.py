@@ -0,0 +1,656 @@
+"""
+ベンチマーク
+合成した音声で処理の各段階にかかる時間・メモリ・処理速度を計測する
+
+使い方:
+    python benchmark.py --duration 600 --save baseline.json
+    python benchmark.py --duration 600 --compare baseline.json
+    python benchmark.py --duration 120 --model tiny --stages model
+    python benchmark.py --compare-int8 会議.mp3 --model medium --reference 正解.txt
+
+音声はオフラインで生成するため、同じ引数なら同じ入力で計測できる。
+既定のスタブモデルはWhisperを使わず、入力から決まった結果を返す。
+--compare-int8 は実際の録音をfp32とint8量子化のモデルで文字起こしし、
+速度と誤り率（正解がなければfp32の結果に対する差）を比べる。
+"""
+
+import os
+import sys
+import json
+import time
+import wave
+import shutil
+import hashlib
+import argparse
+import platform
+import subprocess
+import statistics
+import tempfile
+
+from metrics import peak_rss_mb
+
+
+# 計測する段階（記録順）
+STAGES = ["probe", "decode", "split", "chunk_export", "model"]
+
+# --compare-int8 で比べる精度
+PRECISIONS = ["fp32", "int8"]
+
+# 結果のJSONの形式
+BENCHMARK_VERSION = 1
+
+# 合成音声を生成する単位（秒）
+GENERATE_BLOCK_SECONDS = 60
+
+
+# --- 合成音声 ---------------------------------------------------------------
+
+def _synth_block(rng, samples, sample_rate, channels):
+    """発話のような音と無音が交互に続く信号を生成"""
+    import numpy as np
+
+    audio = rng.normal(0.0, 0.002, samples).astype(np.float32)
+    pos = int(rng.uniform(0.2, 1.0) * sample_rate)
+    while pos < samples:
+        length = int(rng.uniform(1.5, 8.0) * sample_rate)
+        end = min(pos + length, samples)
+        t = np.arange(end - pos, dtype=np.float32) / sample_rate
+
+        # 基本周波数と倍音に、音節程度の速さの振幅変化を掛ける
+        f0 = rng.uniform(110, 240)
+        voice = sum(
+            np.sin(2 * np.pi * f0 * k * t + rng.uniform(0, 2 * np.pi)) / k
+            for k in range(1, 5)
+        )
+        envelope = 0.5 + 0.5 * np.sin(2 * np.pi * rng.uniform(3, 6) * t)
+        audio[pos:end] += (0.15 * voice * envelope).astype(np.float32)
+
+        # ときどき長い無音（無音区間の検出用）を入れる
+        gap = rng.uniform(3.0, 6.0) if rng.random() < 0.15 else rng.uniform(0.2, 1.2)
+        pos = end + int(gap * sample_rate)
+
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+    if channels > 1:
+        pcm = np.repeat(pcm[:, None], channels, axis=1)
+    return pcm.tobytes()
+
+
+def generate_audio(path, duration, sample_rate=44100, channels=2, seed=0):
+    """
+    合成音声をファイルに書き出す
+
+    WAV以外の形式はWAVを生成してからffmpegで変換する。
+    GENERATE_BLOCK_SECONDS ごとに生成するため、長い音声でもメモリ使用量は一定。
+    """
+    import numpy as np
+    from audio_processor import get_ffmpeg_path, _subprocess_kwargs
+
+    fmt = os.path.splitext(path)[1].lstrip(".").lower()
+    wav_path = path if fmt == "wav" else os.path.splitext(path)[0] + ".src.wav"
+
+    total = int(duration * sample_rate)
+    block = GENERATE_BLOCK_SECONDS * sample_rate
+    with wave.open(wav_path, "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        for index, start in enumerate(range(0, total, block)):
+            # ブロックごとに乱数を初期化し、長さを変えても先頭部分は同じ音声にする
+            rng = np.random.default_rng([seed, index])
+            w.writeframes(_synth_block(rng, min(block, total - start), sample_rate, channels))
+
+    if wav_path != path:
+        subprocess.run(
+            [get_ffmpeg_path(), "-v", "error", "-y", "-i", wav_path, path],
+            check=True,
+            **_subprocess_kwargs()
+        )
+        os.remove(wav_path)
+    return path
+
+
+# --- スタブモデル ------------------------------------------------------------
+
+class StubModel:
+    """
+    Whisperの代わりに決まった結果を返すモデル
+
+    5秒ごとに1セグメントを返し、テキストは区間の音量から決める。
+    rtf を指定すると、その処理速度（音声の時間 / 実時間）になるよう待機する。
+    """
+
+    WINDOW_SECONDS = 5
+
+    def __init__(self, rtf=0):
+        self.rtf = rtf
+
+    def transcribe(self, audio, **options):
+        import numpy as np
+        from audio_processor import SAMPLE_RATE, decode_audio
+
+        if isinstance(audio, str):
+            audio = decode_audio(audio)
+
+        duration = len(audio) / SAMPLE_RATE
+        if self.rtf:
+            time.sleep(duration / self.rtf)
+
+        window = self.WINDOW_SECONDS * SAMPLE_RATE
+        segments = []
+        for i, start in enumerate(range(0, len(audio), window)):
+            part = audio[start:start + window]
+            level = int(np.sqrt(np.mean(np.square(part, dtype=np.float64))) * 1000)
+            segments.append({
+                "id": i,
+                "start": start / SAMPLE_RATE,
+                "end": min(start + window, len(audio)) / SAMPLE_RATE,
+                "text": f"発話{level:03d}",
+            })
+        return {"text": "".join(s["text"] for s in segments), "segments": segments}
+
+
+# --- 計測 -------------------------------------------------------------------
+
+def _timed(func):
+    started = time.perf_counter()
+    value = func()
+    return value, time.perf_counter() - started
+
+
+def run_stage(stage, params):
+    """
+    1つの段階を実行して計測する
+
+    Returns:
+        {段階名: {"wall_seconds": ..., "peak_rss_mb": ...}, ...} の辞書
+        （model は model_load と transcribe の2つを返す）
+    """
+    # キャッシュや検索インデックスを利用者のデータと混ぜない
+    os.environ["TRANSCRIBE_APP_HOME"] = os.path.join(params["workdir"], "app_home")
+
+    import audio_processor
+    audio_file = params["audio_file"]
+    chunk_minutes = params["chunk_minutes"]
+    records = {}
+
+    def record(name, seconds, **extra):
+        records[name] = {"wall_seconds": seconds, "peak_rss_mb": peak_rss_mb()}
+        records[name].update(extra)
+
+    if stage == "probe":
+        audio_processor._audio_info_cache.clear()
+        duration, seconds = _timed(lambda: audio_processor.get_audio_duration(audio_file))
+        record("probe", seconds, duration=duration)
+
+    elif stage == "decode":
+        audio, seconds = _timed(lambda: audio_processor.decode_audio(audio_file))
+        if audio is None:
+            raise RuntimeError("音声のデコードに失敗しました")
+        record("decode", seconds)
+
+    elif stage == "split":
+        audio = audio_processor.decode_audio(audio_file)
+        if audio is None:
+            raise RuntimeError("音声のデコードに失敗しました")
+        chunks, seconds = _timed(lambda: audio_processor.split_audio_array(
+            audio, chunk_minutes,
+            cut_at_pauses=params["vad"],
+            overlap_seconds=params["overlap"]
+        ))
+        record("split", seconds, chunks=len(chunks))
+
+    elif stage == "chunk_export":
+        (chunks, temp_dir), seconds = _timed(lambda: audio_processor.split_audio_file(
+            audio_file, chunk_minutes,
+            cut_at_pauses=params["vad"],
+            overlap_seconds=params["overlap"]
+        ))
+        if chunks is None:
+            raise RuntimeError("音声ファイルの分割に失敗しました")
+        audio_processor.cleanup_temp_files(temp_dir)
+        record("chunk_export", seconds, chunks=len(chunks))
+
+    elif stage == "model":
+        from transcribe_core import TranscribeEngine
+
+        engine = TranscribeEngine(
+            params["model"],
+            workers=params.get("workers", 1),
+            torch_threads=params.get("torch_threads"),
+            quantize=params.get("quantize", False),
+            use_profile=False
+        )
+        if params["model"] == "stub":
+            _, seconds = _timed(lambda: setattr(engine, "model", StubModel(params["stub_rtf"])))
+        elif engine.workers > 1:
+            # 並列処理ではメインプロセスにモデルを読み込まず、各ワーカーが読み込む
+            _, seconds = _timed(engine.warm_up)
+        else:
+            (success, message), seconds = _timed(engine.load_model)
+            if not success:
+                raise RuntimeError(message)
+        record("model_load", seconds)
+
+        output_dir = os.path.join(params["workdir"], "out")
+        os.makedirs(output_dir, exist_ok=True)
+        def transcribe():
+            return engine.transcribe(
+                audio_file,
+                output_dir=output_dir,
+                use_chunking=True,
+                chunk_length_minutes=chunk_minutes,
+                vad=params["vad"],
+                overlap_seconds=params["overlap"],
+                use_cache=False
+            )
+
+        if params.get("warm_up"):
+            # ワーカープロセスの起動とモデルの読み込みを計測から除く
+            transcribe()
+        (success, message, output_file), seconds = _timed(transcribe)
+        if not success:
+            raise RuntimeError(message)
+        text = engine.last_result["text"]
+        record(
+            "transcribe", seconds,
+            segments=len(engine.last_result["segments"]),
+            output_sha1=hashlib.sha1(text.encode("utf-8")).hexdigest(),
+        )
+        if params.get("keep_text"):
+            records["transcribe"]["text"] = text
+        engine.close()
+
+    else:
+        raise ValueError(f"未知の段階: {stage}")
+
+    return records
+
+
+def run_stage_isolated(stage, params):
+    """段階ごとに新しいプロセスで実行し、ピークメモリを段階ごとに計測する"""
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=1,
+                             mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(run_stage, stage, params).result()
+
+
+def run_benchmark(params, stages=STAGES, repeat=3, isolate=True, log=print):
+    """
+    ベンチマークを実行
+
+    Returns:
+        結果の辞書（JSONとして保存できる形式）
+    """
+    runs = {}
+    for stage in stages:
+        for i in range(repeat):
+            log(f"{stage} ({i + 1}/{repeat}) ...")
+            if isolate:
+                records = run_stage_isolated(stage, params)
+            else:
+                records = run_stage(stage, params)
+            for name, record in records.items():
+                runs.setdefault(name, []).append(record)
+
+    audio_seconds = params["duration"]
+    summary = {}
+    for name, records in runs.items():
+        wall = statistics.median(r["wall_seconds"] for r in records)
+        rss = [r["peak_rss_mb"] for r in records if r["peak_rss_mb"] is not None]
+        summary[name] = {
+            "wall_seconds": wall,
+            "wall_seconds_min": min(r["wall_seconds"] for r in records),
+            "peak_rss_mb": max(rss) if rss else None,
+            "realtime_factor": audio_seconds / wall if wall else None,
+            "runs": records,
+        }
+
+    return {
+        "version": BENCHMARK_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": environment_info(),
+        "params": {k: v for k, v in params.items() if k not in ("workdir", "audio_file")},
+        "stages": summary,
+    }
+
+
+def environment_info():
+    """結果を比較するときに確認する実行環境"""
+    info = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+    try:
+        import numpy
+        info["numpy"] = numpy.__version__
+    except ImportError:
+        pass
+    return info
+
+
+# --- 量子化の比較 -----------------------------------------------------------
+
+def edit_distance(reference, hypothesis):
+    """2つの列の編集距離（置換・挿入・削除の最小回数）"""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref in enumerate(reference, 1):
+        current = [i]
+        for j, hyp in enumerate(hypothesis, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref != hyp),
+            ))
+        previous = current
+    return previous[-1]
+
+
+def error_rates(reference, hypothesis):
+    """
+    単語誤り率（空白区切り）と文字誤り率（空白を除く）
+
+    日本語は空白で区切られないため、文字誤り率を主な指標にする。
+    """
+    ref_words, hyp_words = reference.split(), hypothesis.split()
+    ref_chars = [c for c in reference if not c.isspace()]
+    hyp_chars = [c for c in hypothesis if not c.isspace()]
+    return {
+        "wer": edit_distance(ref_words, hyp_words) / max(len(ref_words), 1),
+        "cer": edit_distance(ref_chars, hyp_chars) / max(len(ref_chars), 1),
+    }
+
+
+def run_precision_comparison(params, repeat=1, isolate=True, reference_text=None, log=print):
+    """
+    fp32とint8量子化のモデルで同じ音声を文字起こしして比べる
+
+    量子化済みの重みは作業ディレクトリに保存されるため、
+    int8の初回の読み込みには量子化の時間が含まれる。
+
+    Returns:
+        結果の辞書（JSONとして保存できる形式）
+    """
+    summary = {}
+    texts = {}
+    for precision in PRECISIONS:
+        stage_params = dict(params, quantize=precision == "int8", keep_text=True)
+        runs = []
+        for i in range(repeat):
+            log(f"{precision} ({i + 1}/{repeat}) ...")
+            if isolate:
+                runs.append(run_stage_isolated("model", stage_params))
+            else:
+                runs.append(run_stage("model", stage_params))
+
+        wall = statistics.median(r["transcribe"]["wall_seconds"] for r in runs)
+        rss = [r["transcribe"]["peak_rss_mb"] for r in runs
+               if r["transcribe"]["peak_rss_mb"] is not None]
+        summary[precision] = {
+            "model_load_seconds": statistics.median(r["model_load"]["wall_seconds"] for r in runs),
+            "model_load_seconds_first": runs[0]["model_load"]["wall_seconds"],
+            "transcribe_seconds": wall,
+            "realtime_factor": params["duration"] / wall if wall else None,
+            "peak_rss_mb": max(rss) if rss else None,
+        }
+        texts[precision] = runs[0]["transcribe"]["text"]
+
+    reference = reference_text if reference_text is not None else texts["fp32"]
+    for precision, record in summary.items():
+        record.update(error_rates(reference, texts[precision]))
+
+    fp32, int8 = summary["fp32"]["transcribe_seconds"], summary["int8"]["transcribe_seconds"]
+    return {
+        "version": BENCHMARK_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": environment_info(),
+        "params": {k: v for k, v in params.items() if k not in ("workdir", "audio_file")},
+        "reference": "file" if reference_text is not None else "fp32",
+        "precisions": summary,
+        "speedup": fp32 / int8 if int8 else None,
+    }
+
+
+def format_precision_results(results):
+    """量子化の比較結果を表形式の文字列にする"""
+    lines = [
+        f"{'精度':<6} {'読み込み':>10} {'文字起こし':>10} {'処理速度':>8}"
+        f" {'ピークメモリ':>10} {'WER':>7} {'CER':>7}"
+    ]
+    for precision, record in results["precisions"].items():
+        rss = f"{record['peak_rss_mb']:.0f} MB" if record["peak_rss_mb"] else "-"
+        rtf = f"{record['realtime_factor']:.1f}倍" if record["realtime_factor"] else "-"
+        lines.append(
+            f"{precision:<6} {record['model_load_seconds']:9.2f}s"
+            f" {record['transcribe_seconds']:9.2f}s {rtf:>8} {rss:>10}"
+            f" {record['wer']:6.1%} {record['cer']:6.1%}"
+        )
+    if results["reference"] == "fp32":
+        lines.append("※ 誤り率はfp32の結果を正解とした差")
+    if results["speedup"]:
+        lines.append(f"int8はfp32の{results['speedup']:.2f}倍の速度です")
+    return "\n".join(lines)
+
+
+# --- 比較 -------------------------------------------------------------------
+
+def compare_results(current, baseline, threshold=0.10, min_seconds=0.05):
+    """
+    基準の結果と比べる
+
+    Args:
+        threshold: 遅くなったとみなす割合
+        min_seconds: これより小さい差は誤差として扱う
+
+    Returns:
+        (表示用の行のリスト, 遅くなった段階のリスト)
+    """
+    lines = []
+    regressions = []
+
+    if current["params"] != baseline.get("params"):
+        lines.append("⚠ 計測条件が基準と異なります")
+    if current["environment"] != baseline.get("environment"):
+        lines.append("⚠ 実行環境が基準と異なります")
+
+    for name, stage in current["stages"].items():
+        base = baseline.get("stages", {}).get(name)
+        if base is None:
+            lines.append(f"  {name:<13} {stage['wall_seconds']:8.3f}s  （基準なし）")
+            continue
+
+        ratio = stage["wall_seconds"] / base["wall_seconds"] if base["wall_seconds"] else 1.0
+        mark = ""
+        if (ratio > 1 + threshold
+                and stage["wall_seconds"] - base["wall_seconds"] > min_seconds):
+            mark = "  ⚠ 遅くなっています"
+            regressions.append(name)
+        lines.append(
+            f"  {name:<13} {base['wall_seconds']:8.3f}s -> {stage['wall_seconds']:8.3f}s"
+            f" ({(ratio - 1) * 100:+.1f}%){mark}"
+        )
+
+        base_sha = base.get("runs", [{}])[0].get("output_sha1")
+        sha = stage["runs"][0].get("output_sha1")
+        if base_sha and sha and base_sha != sha:
+            lines.append(f"  {name:<13} ⚠ 文字起こし結果が基準と異なります")
+
+    return lines, regressions
+
+
+def format_results(results):
+    """結果を表形式の文字列にする"""
+    lines = [f"{'段階':<13} {'時間(中央値)':>12} {'ピークメモリ':>12} {'処理速度':>10}"]
+    for name, stage in results["stages"].items():
+        rss = f"{stage['peak_rss_mb']:.0f} MB" if stage["peak_rss_mb"] else "-"
+        rtf = f"{stage['realtime_factor']:.1f}倍" if stage["realtime_factor"] else "-"
+        lines.append(f"{name:<13} {stage['wall_seconds']:11.3f}s {rss:>12} {rtf:>10}")
+    return "\n".join(lines)
+
+
+# --- コマンドライン ---------------------------------------------------------
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="文字起こし処理のベンチマーク")
+
+    audio = parser.add_argument_group("合成音声")
+    audio.add_argument("--duration", type=float, default=300,
+                       help="音声の長さ（秒、既定: 300）")
+    audio.add_argument("--format", default="wav", choices=["wav", "mp3", "flac", "m4a", "ogg"],
+                       help="音声の形式（WAV以外はffmpegで変換、既定: wav）")
+    audio.add_argument("--sample-rate", type=int, default=44100,
+                       help="サンプリング周波数（既定: 44100）")
+    audio.add_argument("--channels", type=int, default=2, help="チャンネル数（既定: 2）")
+    audio.add_argument("--seed", type=int, default=0, help="乱数のシード（既定: 0）")
+
+    pipeline = parser.add_argument_group("処理")
+    pipeline.add_argument("--chunk-minutes", type=float, default=1,
+                          help="チャンクの長さ（分、既定: 1）")
+    pipeline.add_argument("--overlap", type=float, default=0,
+                          help="チャンクの重複（秒）")
+    pipeline.add_argument("--vad", action="store_true", help="分割位置を無音に合わせる")
+    pipeline.add_argument("--model", default="stub",
+                          help="stub または Whisperモデル名（既定: stub）")
+    pipeline.add_argument("--stub-rtf", type=float, default=0,
+                          help="スタブモデルの処理速度（音声の時間 / 実時間、0=待機しない）")
+    pipeline.add_argument("--int8", action="store_true",
+                          help="model の段階でint8量子化したモデルを使う")
+
+    quantization = parser.add_argument_group("量子化の比較")
+    quantization.add_argument("--compare-int8", metavar="AUDIO",
+                              help="この録音をfp32とint8で文字起こしし、速度と誤り率を比べる")
+    quantization.add_argument("--reference", metavar="TEXT",
+                              help="誤り率の正解とするテキストファイル（既定: fp32の結果）")
+
+    run = parser.add_argument_group("実行")
+    run.add_argument("--stages", default=",".join(STAGES),
+                     help=f"計測する段階（カンマ区切り、既定: {','.join(STAGES)}）")
+    run.add_argument("--repeat", type=int, default=3, help="各段階の実行回数（既定: 3）")
+    run.add_argument("--in-process", action="store_true",
+                     help="段階ごとにプロセスを分けない（ピークメモリは累積になる）")
+    run.add_argument("--workdir", help="作業ディレクトリ（既定: 一時ディレクトリ）")
+    run.add_argument("--keep", action="store_true", help="作業ディレクトリを残す")
+
+    report = parser.add_argument_group("結果")
+    report.add_argument("--save", help="結果をJSONで保存するファイル")
+    report.add_argument("--compare", help="比較する基準のJSONファイル")
+    report.add_argument("--threshold", type=float, default=0.10,
+                        help="遅くなったとみなす割合（既定: 0.10）")
+    report.add_argument("--fail-on-regression", action="store_true",
+                        help="遅くなった段階があれば終了コード1で終了する")
+    return parser
+
+
+def compare_precision_main(args):
+    """--compare-int8 の実行"""
+    if args.model == "stub":
+        print("--compare-int8 には --model でWhisperモデルを指定してください")
+        return 2
+
+    from audio_processor import get_audio_duration
+
+    duration = get_audio_duration(args.compare_int8)
+    if not duration:
+        print(f"音声の長さを取得できません: {args.compare_int8}")
+        return 2
+
+    reference_text = None
+    if args.reference:
+        with open(args.reference, "r", encoding="utf-8") as f:
+            reference_text = f.read()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="transcribe_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    try:
+        params = {
+            "duration": duration,
+            "source": os.path.basename(args.compare_int8),
+            "chunk_minutes": args.chunk_minutes,
+            "overlap": args.overlap,
+            "vad": args.vad,
+            "model": args.model,
+            "workdir": workdir,
+            "audio_file": os.path.abspath(args.compare_int8),
+        }
+        results = run_precision_comparison(
+            params, args.repeat, isolate=not args.in_process, reference_text=reference_text
+        )
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print()
+    print(format_precision_results(results))
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n✓ 結果を保存しました: {args.save}")
+    return 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.compare_int8:
+        return compare_precision_main(args)
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        print(f"未知の段階: {', '.join(unknown)}（{', '.join(STAGES)} から選択）")
+        return 2
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="transcribe_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    try:
+        audio_file = os.path.join(
+            workdir, f"synthetic_{int(args.duration)}s_{args.sample_rate}_{args.channels}ch.{args.format}"
+        )
+        print(f"合成音声を生成しています: {audio_file}")
+        generate_audio(audio_file, args.duration, args.sample_rate, args.channels, args.seed)
+
+        params = {
+            "duration": args.duration,
+            "format": args.format,
+            "sample_rate": args.sample_rate,
+            "channels": args.channels,
+            "seed": args.seed,
+            "chunk_minutes": args.chunk_minutes,
+            "overlap": args.overlap,
+            "vad": args.vad,
+            "model": args.model,
+            "stub_rtf": args.stub_rtf,
+            "quantize": args.int8,
+            "workdir": workdir,
+            "audio_file": audio_file,
+        }
+        results = run_benchmark(params, stages, args.repeat, isolate=not args.in_process)
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print()
+    print(format_results(results))
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n✓ 結果を保存しました: {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        lines, regressions = compare_results(results, baseline, args.threshold)
+        print(f"\n基準との比較（{args.compare}）:")
+        print("\n".join(lines))
+        if regressions and args.fail_on_regression:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
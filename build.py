@@ -50,6 +50,7 @@ def build_app():
         "--hidden-import", "torch",
         "--hidden-import", "torchaudio",
         "--hidden-import", "pydub",
+        "--hidden-import", "psutil",
         "--collect-all", "flet",
         "--collect-all", "whisper",
     ]
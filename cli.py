@@ -0,0 +1,273 @@
+"""
+コマンドライン版 文字起こしツール
+GUIを使わずにサーバーやcronから文字起こしを実行する
+
+使い方:
+    python cli.py 会議.mp3 --model small --output-dir ./out
+    python cli.py ./recordings --workers 4 --vad
+    python cli.py 会議.mp3 --metrics-jsonl events.jsonl --metrics-port 9464
+    python cli.py 会議.mp3 --deadline 20
+    python cli.py ./recordings --language auto
+
+進捗は1行1件のJSONとして標準出力に書き出す。
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+from output_writers import OUTPUT_FORMATS
+
+
+MODEL_CHOICES = ["tiny", "base", "small", "medium", "large"]
+
+
+def build_parser():
+    """引数パーサーを作成"""
+    parser = argparse.ArgumentParser(
+        description="Whisperによる音声文字起こし（コマンドライン版）",
+    )
+    parser.add_argument(
+        "inputs", nargs="+",
+        help="音声ファイルまたは音声ファイルを含むフォルダ",
+    )
+    parser.add_argument(
+        "-m", "--model", default="medium", choices=MODEL_CHOICES,
+        help="Whisperモデル（既定: medium）",
+    )
+    parser.add_argument(
+        "--int8", action="store_true",
+        help="Linear層をint8に動的量子化したモデルをCPUで使う（高速化、精度はわずかに低下）",
+    )
+    parser.add_argument(
+        "-l", "--language", default="ja",
+        help="言語コード（既定: ja、auto=音声の一部から一度だけ判定してすべてのチャンクで使う）",
+    )
+    parser.add_argument(
+        "--language-per-chunk", action="store_true",
+        help="--language auto の場合にチャンクごとに判定し直す（複数の言語が混在する録音向け）",
+    )
+    parser.add_argument(
+        "-o", "--output-dir",
+        help="出力先ディレクトリ（既定: デスクトップ）",
+    )
+    parser.add_argument(
+        "--format", dest="formats", action="append", choices=OUTPUT_FORMATS,
+        help="出力形式（複数指定可、既定: txt）。すべての形式を1回の処理で書き出す",
+    )
+    parser.add_argument(
+        "--recursive", action="store_true",
+        help="フォルダ内を再帰的に検索する",
+    )
+
+    chunking = parser.add_argument_group("チャンク処理")
+    chunking.add_argument(
+        "--chunking", choices=["auto", "on", "off"], default="auto",
+        help="チャンク分割（既定: auto=チャンク長より長い音声のみ）",
+    )
+    chunking.add_argument(
+        "--chunk-minutes", type=float,
+        help="チャンクの長さ（分、既定: autotune.py の結果または30）",
+    )
+    chunking.add_argument(
+        "--overlap", type=float, default=0,
+        help="隣り合うチャンクで重複させる長さ（秒）",
+    )
+    chunking.add_argument(
+        "--vad", action="store_true",
+        help="分割位置を無音に合わせ、無音区間を除外する",
+    )
+    chunking.add_argument(
+        "--streaming", choices=["auto", "on", "off"], default="auto",
+        help="チャンクを逐次読み込む（既定: auto=長時間音声のみ）",
+    )
+    chunking.add_argument(
+        "--spill", action="store_true",
+        help="チャンクを一時ディレクトリに書き出してから処理する",
+    )
+
+    parallel = parser.add_argument_group("並列処理")
+    parallel.add_argument(
+        "-j", "--workers", type=int,
+        help="チャンクを並列処理するワーカープロセス数（既定: autotune.py の結果または1）",
+    )
+    parallel.add_argument(
+        "--threads", type=int,
+        help="torchのスレッド数（並列時はワーカーごと、既定: autotune.py の結果）",
+    )
+    parallel.add_argument(
+        "--no-profile", action="store_true",
+        help="autotune.py で保存した設定を使わない",
+    )
+
+    parser.add_argument(
+        "--deadline", type=float, metavar="MINUTES",
+        help="この分数以内に終わる最も精度の高いモデルを選ぶ（--model より優先、1ファイルのみ）",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="結果キャッシュを使わずに再実行する",
+    )
+    parser.add_argument(
+        "--progress", choices=["json", "text", "none"], default="json",
+        help="進捗の出力形式（既定: json）",
+    )
+
+    metrics = parser.add_argument_group("計測")
+    metrics.add_argument(
+        "--metrics-jsonl", metavar="FILE",
+        help="段階ごとの計測イベントを1行1件のJSONとしてファイルに追記する",
+    )
+    metrics.add_argument(
+        "--metrics-port", type=int, metavar="PORT",
+        help="処理中に http://127.0.0.1:PORT/metrics で集計値（Prometheus形式）を公開する",
+    )
+    return parser
+
+
+class ProgressPrinter:
+    """進捗を標準出力に書き出すクラス"""
+
+    def __init__(self, mode):
+        self.mode = mode
+
+    def emit(self, event, **fields):
+        if self.mode == "none":
+            return
+        if self.mode == "json":
+            record = {"event": event, "time": round(time.time(), 3)}
+            record.update(fields)
+            print(json.dumps(record, ensure_ascii=False), flush=True)
+        elif "message" in fields:
+            prefix = f"[{os.path.basename(fields['file'])}] " if fields.get("file") else ""
+            print(f"{prefix}{fields['message']}", flush=True)
+
+
+def collect_inputs(inputs, recursive):
+    """引数のファイルとフォルダから音声ファイルの一覧を作成"""
+    from batch_queue import find_audio_files
+
+    files = []
+    for path in inputs:
+        if os.path.isdir(path):
+            files.extend(find_audio_files(path, recursive))
+        else:
+            files.append(path)
+    return files
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    printer = ProgressPrinter(args.progress)
+    formats = args.formats or ["txt"]
+
+    files = collect_inputs(args.inputs, args.recursive)
+    if not files:
+        printer.emit("error", message="音声ファイルが見つかりません")
+        return 2
+
+    if args.language_per_chunk and args.language != "auto":
+        printer.emit("error", message="--language-per-chunk は --language auto と組み合わせて指定します")
+        return 2
+
+    if args.deadline is not None and len(files) > 1:
+        printer.emit("error", message="--deadline は1つの音声ファイルにのみ指定できます")
+        return 2
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    # 重い依存関係（torch, whisper）は実際に文字起こしが必要になるまで読み込まない
+    from transcribe_core import TranscribeEngine
+    from batch_queue import BatchQueue, TranscribeJob
+
+    tri_state = {"auto": None, "on": True, "off": False}
+    options = {
+        "output_dir": args.output_dir,
+        "use_chunking": tri_state[args.chunking],
+        "chunk_length_minutes": args.chunk_minutes,
+        "streaming": tri_state[args.streaming],
+        "spill_to_disk": args.spill,
+        "vad": args.vad,
+        "overlap_seconds": args.overlap,
+        "use_cache": not args.no_cache,
+        "output_formats": formats,
+        "language": args.language,
+        "language_policy": "chunk" if args.language_per_chunk else "file",
+    }
+    if args.deadline is not None:
+        options["deadline_seconds"] = args.deadline * 60
+
+    from metrics import JsonLinesSink, get_metrics, serve_metrics
+
+    sink = None
+    if args.metrics_jsonl:
+        sink = JsonLinesSink(args.metrics_jsonl)
+        get_metrics().add_listener(sink)
+    server = serve_metrics(args.metrics_port) if args.metrics_port else None
+
+    engine = TranscribeEngine(
+        args.model,
+        workers=args.workers,
+        torch_threads=args.threads,
+        quantize=args.int8,
+        use_profile=not args.no_profile,
+    )
+
+    def on_job_update(job):
+        if job.status == TranscribeJob.RUNNING:
+            printer.emit("start", file=job.audio_file, job_id=job.job_id)
+        elif job.status in (TranscribeJob.DONE, TranscribeJob.FAILED):
+            printer.emit(
+                "result",
+                file=job.audio_file,
+                job_id=job.job_id,
+                success=job.status == TranscribeJob.DONE,
+                message=job.message,
+                outputs=job.output_files,
+                audio_seconds=job.audio_seconds,
+                wall_seconds=job.wall_seconds,
+                throughput=job.realtime_factor if job.status == TranscribeJob.DONE else None,
+            )
+
+    queue = BatchQueue(
+        engine,
+        progress_callback=lambda job, message: printer.emit(
+            "progress", file=job.audio_file, job_id=job.job_id, message=message
+        ),
+        on_job_update=on_job_update,
+        preload=False,
+    )
+    queue.add_files(files, **options)
+
+    try:
+        queue.start()
+        queue.wait()
+        queue.stop()
+    finally:
+        engine.close()
+        if server:
+            server.shutdown()
+        if sink:
+            get_metrics().remove_listener(sink)
+            sink.close()
+
+    stats = queue.stats()
+    printer.emit(
+        "summary",
+        completed=stats["completed"],
+        failed=stats["failed"],
+        audio_seconds=stats["audio_seconds"],
+        elapsed_seconds=stats["elapsed_seconds"],
+        throughput=stats["throughput"],
+    )
+    return 0 if stats["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    # PyInstallerでビルドした場合に並列処理のワーカーを起動できるようにする
+    import multiprocessing
+    multiprocessing.freeze_support()
+    sys.exit(main())
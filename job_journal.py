@@ -0,0 +1,142 @@
+"""
+ジョブジャーナルモジュール
+チャンクごとの文字起こし結果を記録し、中断したジョブを再開できるようにする
+"""
+
+import os
+import json
+import time
+
+from app_paths import get_app_data_dir
+from result_cache import compact_segments
+
+
+# この日数より古いジャーナルは削除する
+JOURNAL_MAX_AGE_DAYS = 30
+
+
+class JobJournal:
+    """1つのジョブのチャンク結果を追記形式で保存するクラス"""
+
+    def __init__(self, path, job_key, audio_file=None):
+        """
+        Args:
+            path: ジャーナルファイルのパス（JSON Lines）
+            job_key: ジョブを識別するキー（音声の内容と設定から作成）
+            audio_file: 元の音声ファイル（記録用）
+        """
+        self.path = path
+        self.job_key = job_key
+        self.audio_file = audio_file
+
+    @classmethod
+    def for_job(cls, job_key, audio_file=None, journal_dir=None):
+        """ジョブキーに対応するジャーナルを取得"""
+        journal_dir = journal_dir or get_app_data_dir("journals")
+        prune_journals(journal_dir)
+        return cls(os.path.join(journal_dir, f"{job_key}.jsonl"), job_key, audio_file)
+
+    def load(self):
+        """
+        記録済みのチャンク結果を読み込む
+
+        書き込み途中で中断した最終行は無視する。先頭行（ヘッダー）が読めない、
+        または別のジョブのものであればジャーナルを削除して最初からやり直す。
+
+        Returns:
+            {チャンク番号: {"text": ..., "segments": [...], "language": ...}} の辞書
+            （language は記録されている場合のみ）
+        """
+        completed = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except OSError:
+            return completed
+
+        # 設定の異なるジョブや壊れたジャーナルは使わない
+        if not lines or not self._is_own_header(lines[0]):
+            self.discard()
+            return {}
+
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+
+            if entry.get("type") == "chunk":
+                completed[entry["index"]] = {
+                    "text": entry["text"],
+                    "segments": entry["segments"],
+                }
+                if entry.get("language"):
+                    completed[entry["index"]]["language"] = entry["language"]
+        return completed
+
+    def _is_own_header(self, line):
+        """先頭行がこのジョブのヘッダーか"""
+        try:
+            header = json.loads(line)
+        except ValueError:
+            return False
+        return (isinstance(header, dict) and header.get("type") == "header"
+                and header.get("job_key") == self.job_key)
+
+    def record_chunk(self, index, result):
+        """
+        チャンクの結果を追記し、ディスクに確実に書き込む
+
+        Args:
+            index: チャンク番号
+            result: model.transcribe の結果（チャンク内の時刻のまま）
+        """
+        new_file = not os.path.exists(self.path)
+        with open(self.path, "a", encoding="utf-8") as f:
+            if new_file:
+                header = {
+                    "type": "header",
+                    "job_key": self.job_key,
+                    "audio_file": self.audio_file,
+                    "created": time.time(),
+                }
+                f.write(json.dumps(header, ensure_ascii=False) + "\n")
+
+            entry = {
+                "type": "chunk",
+                "index": index,
+                "text": result["text"],
+                "segments": compact_segments(result["segments"]),
+            }
+            if result.get("language"):
+                # 言語を自動判定したジョブを再開した場合も言語を出力に残す
+                entry["language"] = result["language"]
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def discard(self):
+        """ジョブ完了後にジャーナルを削除"""
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def prune_journals(journal_dir, max_age_days=JOURNAL_MAX_AGE_DAYS):
+    """再開されないまま古くなったジャーナルを削除"""
+    limit = time.time() - max_age_days * 24 * 60 * 60
+    try:
+        names = os.listdir(journal_dir)
+    except OSError:
+        return
+
+    for name in names:
+        if not name.endswith(".jsonl"):
+            continue
+        path = os.path.join(journal_dir, name)
+        try:
+            if os.path.getmtime(path) < limit:
+                os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,139 @@
+"""
+言語判定モジュール
+音声の一部から話されている言語を一度だけ判定し、ファイルごとに結果を保存する
+"""
+
+import os
+import json
+import threading
+
+from app_paths import get_app_data_dir
+
+
+# 言語を指定しない場合（従来どおり日本語）
+DEFAULT_LANGUAGE = "ja"
+
+# 音声から言語を判定する指定
+AUTO_LANGUAGE = "auto"
+
+# 言語の判定方法
+# file: ファイル全体で一度だけ判定し、すべてのチャンクで使う
+# chunk: チャンクごとに判定し直す（複数の言語が混在する録音向け）
+LANGUAGE_POLICIES = ("file", "chunk")
+
+# 判定に使う音声の長さ（秒、Whisperが一度に処理する長さ）
+LANGUAGE_SAMPLE_SECONDS = 30
+
+# 音声全体をデコードしない場合に判定用の区間を探す範囲（先頭からの秒数）
+LANGUAGE_SCAN_SECONDS = 180
+
+# チャンクごとの判定がこの確率未満ならファイル全体の判定結果を使う
+CHUNK_LANGUAGE_MIN_PROBABILITY = 0.5
+
+# 保存する判定結果の上限（古いものから削除）
+MAX_ENTRIES = 1000
+
+
+def detect_language(model, audio):
+    """
+    音声の先頭30秒から言語を判定
+
+    Args:
+        model: Whisperモデル
+        audio: 16kHzモノラル配列
+
+    Returns:
+        (言語コード, 確率) のタプル
+    """
+    import whisper
+
+    mel_options = {}
+    n_mels = getattr(getattr(model, "dims", None), "n_mels", 80)
+    if n_mels != 80:
+        # large-v3 などはメルフィルタの数が異なる
+        mel_options["n_mels"] = n_mels
+    mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), **mel_options)
+    _, probs = model.detect_language(mel.to(model.device))
+    language = max(probs, key=probs.get)
+    return language, float(probs[language])
+
+
+def detect_chunk_language(model, audio, fallback):
+    """
+    チャンクの発話が最も多い区間から言語を判定
+
+    判定の確率が低い場合（無音や短い相づちなど）は fallback を返す。
+    """
+    from audio_processor import find_speech_window
+
+    language, probability = detect_language(
+        model, find_speech_window(audio, LANGUAGE_SAMPLE_SECONDS)
+    )
+    if probability < CHUNK_LANGUAGE_MIN_PROBABILITY:
+        return fallback
+    return language
+
+
+class LanguageCache:
+    """音声ファイルの内容ごとに判定した言語を保存するクラス"""
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path: 保存先（None=アプリのデータディレクトリ）
+        """
+        self.path = path or os.path.join(get_app_data_dir(), "languages.json")
+        self._lock = threading.Lock()
+        self._entries = self._read()
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"⚠ 言語の判定結果を読み込めません: {e}")
+            return {}
+
+    def get(self, content_hash):
+        """
+        判定済みの言語
+
+        Returns:
+            (言語コード, 確率) のタプル、未判定の場合は None
+        """
+        with self._lock:
+            entry = self._entries.get(content_hash)
+        if entry is None:
+            return None
+        return entry["language"], entry["probability"]
+
+    def put(self, content_hash, language, probability):
+        """判定結果を保存"""
+        with self._lock:
+            self._entries.pop(content_hash, None)
+            self._entries[content_hash] = {"language": language, "probability": probability}
+            # 挿入順に並ぶため先頭が最も古い
+            for key in list(self._entries)[:-MAX_ENTRIES]:
+                del self._entries[key]
+            try:
+                temp_path = f"{self.path}.tmp"
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump(self._entries, f, ensure_ascii=False)
+                os.replace(temp_path, self.path)
+            except OSError as e:
+                print(f"⚠ 言語の判定結果の保存に失敗: {e}")
+
+
+_language_cache = None
+_language_cache_lock = threading.Lock()
+
+
+def get_language_cache():
+    """プロセス全体で共有する言語の判定結果を取得"""
+    global _language_cache
+    with _language_cache_lock:
+        if _language_cache is None:
+            _language_cache = LanguageCache()
+        return _language_cache
@@ -0,0 +1,130 @@
+"""
+ログ表示モジュール
+処理ログを行数上限付きで保持し、画面の更新を一定間隔にまとめる
+"""
+
+import time
+import threading
+from collections import deque
+
+
+# 画面に残すログの最大行数
+LOG_MAX_LINES = 500
+
+# 画面を更新する頻度（回/秒）
+DEFAULT_FRAME_RATE = 10
+
+
+class LogBuffer:
+    """最大行数を超えると古い行から捨てるログ"""
+
+    def __init__(self, max_lines=LOG_MAX_LINES):
+        """
+        Args:
+            max_lines: 保持する最大行数
+        """
+        self.max_lines = max_lines
+        self._lines = deque(maxlen=max_lines)
+        self._lock = threading.Lock()
+        self._total = 0
+
+    def append(self, message):
+        """1行追加（どのスレッドからでも呼べる）"""
+        with self._lock:
+            self._lines.append(message)
+            self._total += 1
+
+    def clear(self):
+        """すべての行を削除"""
+        with self._lock:
+            self._lines.clear()
+            self._total = 0
+
+    def lines(self):
+        """保持している行の一覧"""
+        with self._lock:
+            return list(self._lines)
+
+    def read_since(self, total):
+        """
+        前回読んだ時点以降に追加された行を取得
+
+        Args:
+            total: 前回の read_since が返した追加回数（初回は 0）
+
+        Returns:
+            (追加回数, 新しい行の一覧, 全体を読み直したか) のタプル。
+            前回以降に最大行数以上が追加された場合やクリアされた場合は
+            保持している全行を返す。
+        """
+        with self._lock:
+            added = self._total - total
+            if added < 0 or added >= len(self._lines):
+                return self._total, list(self._lines), True
+            if added == 0:
+                return self._total, [], False
+            return self._total, list(self._lines)[-added:], False
+
+
+class FrameScheduler:
+    """
+    画面の更新要求をまとめ、一定間隔で描画するクラス
+
+    request() はフラグを立てるだけなので、ワーカースレッドが
+    画面とのやり取りを待つことはない。
+    """
+
+    def __init__(self, render, frame_rate=DEFAULT_FRAME_RATE):
+        """
+        Args:
+            render: 描画を行う関数（引数なし）
+            frame_rate: 1秒あたりの最大描画回数
+        """
+        self.render = render
+        self.interval = 1.0 / frame_rate
+        self._requested = threading.Event()
+        self._render_lock = threading.Lock()
+        self._stopping = False
+        self._thread = None
+
+    def start(self):
+        """描画スレッドを開始"""
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """描画スレッドを停止"""
+        self._stopping = True
+        self._requested.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def request(self):
+        """次のフレームで描画するよう要求"""
+        self._requested.set()
+
+    def flush(self):
+        """待たずにすぐ描画する（処理の完了時など）"""
+        self._requested.clear()
+        self._render_once()
+
+    def _render_once(self):
+        with self._render_lock:
+            try:
+                self.render()
+            except Exception as e:
+                # 描画の失敗で処理を止めない
+                print(f"⚠ 画面の更新に失敗: {e}")
+
+    def _run(self):
+        while True:
+            self._requested.wait()
+            if self._stopping:
+                break
+            self._requested.clear()
+            self._render_once()
+            # 間隔内に届いた要求は次のフレームでまとめて描画する
+            time.sleep(self.interval)
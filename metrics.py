@@ -0,0 +1,366 @@
+"""
+計測イベントモジュール
+処理の各段階を構造化したイベントとして記録し、JSON Lines や Prometheus 形式で出力する
+
+表示用の進捗メッセージもイベントから作るため、画面の表示と計測値は常に一致する。
+"""
+
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+
+def peak_rss_mb():
+    """このプロセスのピークメモリ使用量（MB、取得できない場合は None）"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linuxは KB、macOSはバイト単位
+        return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 1024 / 1024
+    except Exception:
+        return None
+
+
+def _clock(seconds):
+    """秒を h:mm:ss 形式に変換（audio_processor.format_time と同じ形式）"""
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+# --- 表示用メッセージ ---------------------------------------------------------
+
+def _stage_start_message(event):
+    stage = event.get("stage")
+    if stage == "decode":
+        return "音声をデコードしています..."
+    if stage == "model_load":
+        return f"Whisperモデル「{event.get('model')}」を読み込んでいます..."
+    if stage == "split":
+        target = "音声ファイル" if event.get("spill") else "音声"
+        return f"{target}を{event.get('chunk_length_minutes')}分ごとに分割しています..."
+    if stage == "language_detect":
+        return "言語を判定しています..."
+    return None
+
+
+def _stage_end_message(event):
+    stage = event.get("stage")
+    if not event.get("ok", True):
+        # 失敗は呼び出し元が理由とともに表示する
+        return None
+    if stage == "split":
+        return f"✓ {event.get('chunks')}個のチャンクに分割しました"
+    if stage == "model_load":
+        if event.get("cached"):
+            return f"✓ 読み込み済みのモデル「{event.get('model')}」を使用します"
+        return "✓ モデルの読み込みが完了しました"
+    if stage == "language_detect":
+        source = "（前回の判定結果）" if event.get("cached") else ""
+        return f"✓ 言語: {event.get('language')}（確率 {event.get('probability', 0):.0%}）{source}"
+    return None
+
+
+def _model_selected_message(event):
+    estimate = _clock(event["estimated_seconds"])
+    if event.get("on_time"):
+        return f"期限内に終わる見込みのモデル「{event['model']}」を使用します（予測 {estimate}）"
+    return (f"⚠ どのモデルも期限に間に合わない見込みのため、"
+            f"最も速いモデル「{event['model']}」を使用します（予測 {estimate}）")
+
+
+EVENT_MESSAGES = {
+    "message": lambda event: event["text"],
+    "stage_start": _stage_start_message,
+    "stage_end": _stage_end_message,
+    "chunk_start": lambda event: (
+        f"チャンク {event['index'] + 1}/{event.get('total') or '?'} を処理中 "
+        f"({_clock(event['start'])} - {_clock(event['end'])})"
+    ),
+    "chunk_end": lambda event: f"✓ チャンク {event['index'] + 1} 完了",
+    "model_selected": _model_selected_message,
+    "model_downgrade": lambda event: (
+        f"⚠ 期限に間に合わない見込みのため、残りのチャンクを"
+        f"モデル「{event['model']}」で処理します"
+    ),
+}
+
+
+def format_event(event):
+    """イベントの表示用メッセージ（表示しないイベントは None）"""
+    formatter = EVENT_MESSAGES.get(event["event"])
+    return formatter(event) if formatter else None
+
+
+# --- 集計 ---------------------------------------------------------------------
+
+class MetricsRecorder:
+    """イベントを集計し、登録されたリスナーに配るクラス"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._listeners = []
+        self.reset()
+
+    def reset(self):
+        """集計値をすべて消去"""
+        with self._lock:
+            self.stage_seconds = {}
+            self.stage_runs = {}
+            self.jobs = {}
+            self.audio_seconds = 0.0
+            self.job_seconds = 0.0
+            self.chunks = 0
+            self.chunk_audio_seconds = 0.0
+            self.chunk_seconds = 0.0
+            self.model_load_seconds = {}
+            self.model_downgrades = 0
+            self.last_realtime_factor = None
+            self.peak_rss_mb = None
+
+    def add_listener(self, listener):
+        """すべてのイベントを (event) で受け取る関数を登録"""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def record(self, event):
+        """イベントを集計してリスナーに配る"""
+        name = event["event"]
+        with self._lock:
+            if name == "stage_end":
+                stage = event["stage"]
+                self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + event["wall_seconds"]
+                self.stage_runs[stage] = self.stage_runs.get(stage, 0) + 1
+                if stage == "model_load" and event.get("ok") and not event.get("cached"):
+                    self.model_load_seconds[event.get("model")] = event["wall_seconds"]
+            elif name == "model_downgrade":
+                self.model_downgrades += 1
+            elif name == "chunk_end":
+                self.chunks += 1
+                self.chunk_audio_seconds += event.get("audio_seconds") or 0.0
+                self.chunk_seconds += event.get("wall_seconds") or 0.0
+            elif name == "job_end":
+                status = "success" if event.get("success") else "failure"
+                self.jobs[status] = self.jobs.get(status, 0) + 1
+                # キャッシュから返した結果は処理速度の集計に含めない
+                if event.get("success") and not event.get("cached"):
+                    self.audio_seconds += event.get("audio_seconds") or 0.0
+                    self.job_seconds += event["wall_seconds"]
+                    if event.get("realtime_factor"):
+                        self.last_realtime_factor = event["realtime_factor"]
+
+            rss = event.get("peak_rss_mb")
+            if rss is not None and (self.peak_rss_mb is None or rss > self.peak_rss_mb):
+                self.peak_rss_mb = rss
+            listeners = list(self._listeners)
+
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                # 出力先の不具合で文字起こしを止めない
+                print(f"⚠ 計測イベントの出力に失敗: {e}")
+
+    def prometheus_text(self):
+        """集計値を Prometheus のテキスト形式で返す"""
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        with self._lock:
+            metric("transcribe_stage_seconds_total", "counter",
+                   "Wall time spent in each stage",
+                   [({"stage": s}, v) for s, v in sorted(self.stage_seconds.items())])
+            metric("transcribe_stage_runs_total", "counter",
+                   "Number of times each stage ran",
+                   [({"stage": s}, v) for s, v in sorted(self.stage_runs.items())])
+            metric("transcribe_jobs_total", "counter",
+                   "Finished transcription jobs",
+                   [({"status": s}, v) for s, v in sorted(self.jobs.items())])
+            metric("transcribe_audio_seconds_total", "counter",
+                   "Audio seconds transcribed by successful jobs",
+                   [({}, self.audio_seconds)])
+            metric("transcribe_job_seconds_total", "counter",
+                   "Wall time of successful jobs",
+                   [({}, self.job_seconds)])
+            metric("transcribe_chunks_total", "counter",
+                   "Transcribed chunks", [({}, self.chunks)])
+            metric("transcribe_chunk_audio_seconds_total", "counter",
+                   "Audio seconds in transcribed chunks", [({}, self.chunk_audio_seconds)])
+            metric("transcribe_chunk_seconds_total", "counter",
+                   "Wall time spent transcribing chunks", [({}, self.chunk_seconds)])
+            metric("transcribe_model_downgrades_total", "counter",
+                   "Jobs that switched to a faster model to meet a deadline",
+                   [({}, self.model_downgrades)])
+            metric("transcribe_model_load_seconds", "gauge",
+                   "Time of the last load of each model",
+                   [({"model": m}, v) for m, v in sorted(self.model_load_seconds.items())])
+            if self.last_realtime_factor is not None:
+                metric("transcribe_realtime_factor", "gauge",
+                       "Audio seconds per wall second of the last successful job",
+                       [({}, self.last_realtime_factor)])
+            if self.peak_rss_mb is not None:
+                metric("transcribe_peak_rss_bytes", "gauge",
+                       "Peak resident memory of the process",
+                       [({}, int(self.peak_rss_mb * 1024 * 1024))])
+
+        return "\n".join(lines) + "\n"
+
+
+_recorder = MetricsRecorder()
+
+
+def get_metrics():
+    """プロセス全体で共有する集計を取得"""
+    return _recorder
+
+
+# --- 出力先 -------------------------------------------------------------------
+
+class JsonLinesSink:
+    """イベントを1行1件のJSONとしてファイルに追記するリスナー"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def __call__(self, event):
+        line = json.dumps(event, ensure_ascii=False, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def serve_metrics(port, host="127.0.0.1", recorder=None):
+    """
+    /metrics で Prometheus 形式の集計値を返すHTTPサーバーをバックグラウンドで起動
+
+    Returns:
+        起動したサーバー（shutdown() で停止）
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    recorder = recorder or get_metrics()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = recorder.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# --- 進捗の通知 ---------------------------------------------------------------
+
+class ProgressReporter:
+    """
+    進捗コールバックとして渡せるイベントの通知先
+
+    文字列で呼ぶと "message" イベントになる。構造化したイベントは emit() で送り、
+    表示用メッセージは format_event で作って progress_callback に渡す。
+    """
+
+    def __init__(self, progress_callback=None, event_callback=None, recorder=None,
+                 **context):
+        """
+        Args:
+            progress_callback: 表示用メッセージを受け取る関数
+            event_callback: イベントの辞書を受け取る関数
+            recorder: 集計先（None=プロセス全体の集計）
+            context: すべてのイベントに付ける項目（音声ファイルなど）
+        """
+        self.progress_callback = progress_callback
+        self.event_callback = event_callback
+        self.recorder = recorder or get_metrics()
+        self.context = context
+
+    def emit(self, name, **fields):
+        event = {"event": name, "time": time.time()}
+        event.update(self.context)
+        event.update(fields)
+
+        self.recorder.record(event)
+        if self.event_callback:
+            self.event_callback(event)
+        if self.progress_callback:
+            message = format_event(event)
+            if message:
+                self.progress_callback(message)
+
+    def __call__(self, message):
+        self.emit("message", text=message)
+
+
+def emit_event(callback, name, **fields):
+    """
+    進捗コールバックにイベントを送る
+
+    ProgressReporter 以外の関数（文字列だけを受け取る従来のコールバック）には
+    表示用メッセージだけを渡す。
+    """
+    if callback is None:
+        return
+    emit = getattr(callback, "emit", None)
+    if emit is not None:
+        emit(name, **fields)
+        return
+    message = format_event(dict(fields, event=name))
+    if message:
+        callback(message)
+
+
+@contextmanager
+def stage(callback, name, **fields):
+    """
+    段階の開始と終了をイベントとして送る
+
+    with stage(progress_callback, "decode") as info:
+        ...
+        info["audio_seconds"] = ...   # 終了イベントに含める値
+    """
+    emit_event(callback, "stage_start", stage=name, **fields)
+    info = dict(fields)
+    started = time.perf_counter()
+    ok = False
+    try:
+        yield info
+        ok = True
+    finally:
+        wall = time.perf_counter() - started
+        info.update(wall_seconds=wall, ok=ok, peak_rss_mb=peak_rss_mb())
+        if ok and info.get("audio_seconds") and wall > 0:
+            info.setdefault("realtime_factor", info["audio_seconds"] / wall)
+        emit_event(callback, "stage_end", stage=name, **info)
@@ -0,0 +1,181 @@
+"""
+モデルレジストリモジュール
+読み込み済みのWhisperモデルをプロセス全体で共有する
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+
+
+# 読み込み済みモデルに使うメモリの上限（MB）。環境変数で変更できる
+DEFAULT_MEMORY_BUDGET_MB = int(os.environ.get("TRANSCRIBE_MODEL_CACHE_MB", "6144"))
+
+
+def resolve_device(device=None):
+    """デバイス名を決定（None の場合は whisper.load_model と同じ規則）"""
+    if device:
+        return device
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def estimate_model_bytes(model):
+    """モデルのパラメータとバッファが占めるメモリ量（バイト）"""
+    total = 0
+    for tensor in list(model.parameters()) + list(model.buffers()):
+        total += tensor.numel() * tensor.element_size()
+
+    # int8に動的量子化したLinear層の重みはパラメータに含まれない
+    for module in model.modules():
+        packed = getattr(module, "_packed_params", None)
+        if packed is not None and hasattr(packed, "_weight_bias"):
+            for tensor in packed._weight_bias():
+                if tensor is not None:
+                    total += tensor.numel() * tensor.element_size()
+    return total
+
+
+class ModelRegistry:
+    """モデル名・デバイス・精度をキーに読み込み済みモデルを保持するクラス"""
+
+    def __init__(self, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB):
+        """
+        Args:
+            memory_budget_mb: 保持するモデルの合計サイズの上限（MB）
+        """
+        self.memory_budget_mb = memory_budget_mb
+        self._models = OrderedDict()  # (model_name, device, precision) -> (model, bytes)
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._warmed = set()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_seconds = {}
+
+    def _load_lock(self, key):
+        """同じモデルを複数スレッドから同時に読み込まないためのロック"""
+        with self._lock:
+            return self._load_locks.setdefault(key, threading.Lock())
+
+    def is_loaded(self, model_name, device=None, precision="fp32"):
+        """モデルが読み込み済みか"""
+        key = (model_name, resolve_device(device), precision)
+        with self._lock:
+            return key in self._models
+
+    def get(self, model_name, device=None, loader=None, precision="fp32"):
+        """
+        モデルを取得（未読み込みなら読み込む）
+
+        Args:
+            model_name: Whisperモデル名
+            device: デバイス（None=自動）
+            loader: (model_name, device) を受け取りモデルを返す関数
+                    （None=whisper.load_model）
+            precision: 重みの精度（"fp32" または "int8"）。
+                       同じモデルでも精度ごとに別々に保持する
+
+        Returns:
+            読み込み済みのモデル
+        """
+        key = (model_name, resolve_device(device), precision)
+
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                self.hits += 1
+                return self._models[key][0]
+
+        with self._load_lock(key):
+            # 待っている間に他のスレッドが読み込んだ場合
+            with self._lock:
+                if key in self._models:
+                    self._models.move_to_end(key)
+                    self.hits += 1
+                    return self._models[key][0]
+                self.misses += 1
+
+            if loader is None:
+                import whisper
+                loader = lambda name, dev: whisper.load_model(name, device=dev)
+
+            started = time.perf_counter()
+            model = loader(model_name, key[1])
+            self.load_seconds[key] = time.perf_counter() - started
+
+            with self._lock:
+                self._models[key] = (model, estimate_model_bytes(model))
+                self._evict()
+            return model
+
+    def is_warm(self, model_name, device=None, precision="fp32"):
+        """ウォームアップ済みか"""
+        key = (model_name, resolve_device(device), precision)
+        with self._lock:
+            return key in self._warmed and key in self._models
+
+    def mark_warm(self, model_name, device=None, precision="fp32"):
+        """ウォームアップ済みとして記録"""
+        key = (model_name, resolve_device(device), precision)
+        with self._lock:
+            self._warmed.add(key)
+
+    def _evict(self):
+        """上限を超えた分を最も長く使われていないモデルから解放（ロック取得済みで呼ぶ）"""
+        budget = self.memory_budget_mb * 1024 * 1024
+        # 直前に読み込んだモデルは上限を超えていても残す
+        while len(self._models) > 1 and self._total_bytes() > budget:
+            key, _ = self._models.popitem(last=False)
+            self._warmed.discard(key)
+            self.evictions += 1
+
+    def _total_bytes(self):
+        return sum(size for _, size in self._models.values())
+
+    def set_memory_budget(self, memory_budget_mb):
+        """メモリ上限を変更"""
+        with self._lock:
+            self.memory_budget_mb = memory_budget_mb
+            self._evict()
+
+    def clear(self):
+        """保持しているモデルをすべて解放"""
+        with self._lock:
+            self._models.clear()
+            self._warmed.clear()
+
+    def stats(self):
+        """ヒット数・ミス数・読み込み時間などの統計"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "loaded": [
+                    {"model": name, "device": device, "precision": precision,
+                     "mb": size / 1024 / 1024}
+                    for (name, device, precision), (_, size) in self._models.items()
+                ],
+                "total_mb": self._total_bytes() / 1024 / 1024,
+                "memory_budget_mb": self.memory_budget_mb,
+                "load_seconds": {
+                    f"{name}@{device}/{precision}": seconds
+                    for (name, device, precision), seconds in self.load_seconds.items()
+                },
+            }
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry():
+    """プロセス全体で共有するモデルレジストリを取得"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
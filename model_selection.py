@@ -0,0 +1,250 @@
+"""
+モデル選択モジュール
+この環境で計測したモデルごとの処理速度から、期限までに終わる最も精度の高いモデルを選ぶ
+"""
+
+import os
+import json
+import time
+import statistics
+import threading
+
+from app_paths import get_app_data_dir
+from autotune import machine_info
+from quantization import model_label
+
+
+# 速い順（後ろほど精度が高い）
+MODEL_ORDER = ["tiny", "base", "small", "medium", "large"]
+
+# 計測がない場合のCPUでの処理速度の目安（音声の秒数 / 実時間の秒数）
+DEFAULT_REALTIME_FACTORS = {
+    "tiny": 10.0,
+    "base": 6.0,
+    "small": 2.5,
+    "medium": 1.0,
+    "large": 0.5,
+}
+
+# int8量子化による速度の向上の目安
+INT8_SPEEDUP = 1.8
+
+# 計測がない場合のモデル読み込み時間の目安（秒）
+DEFAULT_LOAD_SECONDS = {
+    "tiny": 2.0,
+    "base": 3.0,
+    "small": 6.0,
+    "medium": 15.0,
+    "large": 30.0,
+}
+
+# モデルごとに保持する計測結果の数
+MAX_SAMPLES = 10
+
+# 予測に対する余裕（予測時間がこの割合だけ長くても期限内に収まるモデルを選ぶ）
+SAFETY_MARGIN = 1.1
+
+
+class SpeedStore:
+    """モデルごとに計測した処理速度と読み込み時間を保存するクラス"""
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path: 保存先（None=アプリのデータディレクトリ）
+        """
+        self.path = path or os.path.join(get_app_data_dir(), "model_speed.json")
+        self._lock = threading.Lock()
+        self._models = self._read()
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"⚠ 処理速度の記録を読み込めません: {e}")
+            return {}
+        # 別の環境で計測した値は使わない
+        if data.get("machine") != machine_info():
+            return {}
+        return data.get("models", {})
+
+    def _write(self):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"machine": machine_info(), "models": self._models}, f,
+                      ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.path)
+
+    def record(self, label, audio_seconds, wall_seconds):
+        """
+        文字起こし1件の処理速度を記録
+
+        wall_seconds は文字起こしの段階だけの時間（モデルの読み込みやデコードを含めない。
+        読み込み時間は record_load で別に記録し、予測時に加える）。
+        予測は1プロセスで音声全体を処理する場合の速度として使うため、
+        並列処理やVADを使った処理は記録しないこと。
+        """
+        if not audio_seconds or not wall_seconds:
+            return
+        with self._lock:
+            entry = self._models.setdefault(label, {})
+            samples = entry.setdefault("realtime_factors", [])
+            samples.append(audio_seconds / wall_seconds)
+            del samples[:-MAX_SAMPLES]
+            entry["updated"] = time.time()
+            try:
+                self._write()
+            except OSError as e:
+                print(f"⚠ 処理速度の記録に失敗: {e}")
+
+    def record_load(self, label, seconds):
+        """モデルの読み込み時間を記録"""
+        with self._lock:
+            self._models.setdefault(label, {})["load_seconds"] = seconds
+            try:
+                self._write()
+            except OSError as e:
+                print(f"⚠ 処理速度の記録に失敗: {e}")
+
+    def realtime_factor(self, model_name, quantize=False):
+        """
+        モデルの処理速度
+
+        Returns:
+            (処理速度, 計測値かどうか) のタプル
+        """
+        with self._lock:
+            samples = self._models.get(model_label(model_name, quantize), {}).get(
+                "realtime_factors"
+            )
+        if samples:
+            return statistics.median(samples), True
+        rtf = DEFAULT_REALTIME_FACTORS.get(model_name, 1.0)
+        return (rtf * INT8_SPEEDUP if quantize else rtf), False
+
+    def load_seconds(self, model_name, quantize=False):
+        """モデルの読み込み時間（計測がなければ目安）"""
+        with self._lock:
+            seconds = self._models.get(model_label(model_name, quantize), {}).get("load_seconds")
+        if seconds is not None:
+            return seconds
+        return DEFAULT_LOAD_SECONDS.get(model_name, 10.0)
+
+    def estimate_seconds(self, model_name, audio_seconds, quantize=False, loaded=False):
+        """音声の文字起こしにかかる時間の予測（秒）"""
+        rtf, _ = self.realtime_factor(model_name, quantize)
+        load = 0.0 if loaded else self.load_seconds(model_name, quantize)
+        return load + audio_seconds / rtf
+
+
+_speed_store = None
+_speed_store_lock = threading.Lock()
+
+
+def get_speed_store():
+    """プロセス全体で共有する処理速度の記録を取得"""
+    global _speed_store
+    with _speed_store_lock:
+        if _speed_store is None:
+            _speed_store = SpeedStore()
+        return _speed_store
+
+
+def choose_model(audio_seconds, deadline_seconds, quantize=False, store=None,
+                 models=MODEL_ORDER, is_loaded=None):
+    """
+    期限までに終わる最も精度の高いモデルを選ぶ
+
+    Args:
+        audio_seconds: 音声の長さ（秒）
+        deadline_seconds: 残り時間（秒）
+        quantize: int8量子化したモデルを使うか
+        store: 処理速度の記録（None=共有の記録）
+        models: 候補（速い順）
+        is_loaded: モデル名を受け取り、読み込み済みかを返す関数
+
+    Returns:
+        (モデル名, {モデル名: 予測時間}, 期限に間に合うか) のタプル。
+        どのモデルも間に合わない場合は最も速いモデルを返す
+    """
+    store = store or get_speed_store()
+    estimates = {
+        name: store.estimate_seconds(
+            name, audio_seconds, quantize, loaded=bool(is_loaded and is_loaded(name))
+        )
+        for name in models
+    }
+    for name in reversed(models):
+        if estimates[name] * SAFETY_MARGIN <= deadline_seconds:
+            return name, estimates, True
+    return models[0], estimates, False
+
+
+class DeadlineTracker:
+    """
+    ジョブの進み具合から期限に間に合うかを判断するクラス
+
+    チャンクが完了するたびに chunk_done() を呼び、遅れている場合は
+    残りのチャンクに使う速いモデルを返す。モデルを速くするだけで、
+    遅いモデルには戻さない。
+    """
+
+    def __init__(self, deadline_at, audio_seconds, model_name, quantize=False, store=None,
+                 models=MODEL_ORDER):
+        """
+        Args:
+            deadline_at: 期限（time.time() の値）
+            audio_seconds: 音声全体の長さ（秒）
+            model_name: 使用中のモデル名
+        """
+        self.deadline_at = deadline_at
+        self.audio_seconds = audio_seconds
+        self.model_name = model_name
+        self.quantize = quantize
+        self.store = store or get_speed_store()
+        self.models = models
+        self.done_audio_seconds = 0.0
+        self.downgraded = False
+        self._model_audio_seconds = 0.0
+        self._model_wall_seconds = 0.0
+
+    def chunk_done(self, audio_seconds, wall_seconds):
+        """
+        チャンクの完了を記録
+
+        Returns:
+            残りに使うべきモデル名（今のままで間に合う場合は None）
+        """
+        self.done_audio_seconds += audio_seconds
+        self._model_audio_seconds += audio_seconds
+        self._model_wall_seconds += wall_seconds
+
+        remaining_audio = self.audio_seconds - self.done_audio_seconds
+        remaining_time = self.deadline_at - time.time()
+        if remaining_audio <= 0 or not self._model_wall_seconds:
+            return None
+
+        # このジョブで実際に出ている速度で残りを予測する
+        rtf = self._model_audio_seconds / self._model_wall_seconds
+        if remaining_audio / rtf * SAFETY_MARGIN <= remaining_time:
+            return None
+
+        if self.model_name not in self.models:
+            return None
+        faster = self.models[:self.models.index(self.model_name)]
+        if not faster:
+            return None
+        name, _, _ = choose_model(
+            remaining_audio, remaining_time, self.quantize, self.store, faster
+        )
+        return name
+
+    def switch(self, model_name):
+        """残りのチャンクを別のモデルで処理する"""
+        self.model_name = model_name
+        self.downgraded = True
+        self._model_audio_seconds = 0.0
+        self._model_wall_seconds = 0.0
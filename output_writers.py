@@ -0,0 +1,341 @@
+"""
+出力ファイルモジュール
+確定したセグメントを文字起こしの進行に合わせて各形式のファイルへ追記する
+"""
+
+import os
+import json
+
+from audio_processor import format_time
+
+
+# 出力形式と拡張子
+OUTPUT_FORMATS = ["txt", "json", "jsonl", "srt", "vtt"]
+
+DEFAULT_OUTPUT_FORMATS = ("txt",)
+
+# 書き込み途中のファイルに付ける拡張子
+PARTIAL_SUFFIX = ".part"
+
+
+def output_path(base_path, fmt):
+    """
+    出力形式ごとのファイルパス
+
+    Args:
+        base_path: 拡張子を除いた出力ファイルのパス（例: .../会議_文字起こし）
+        fmt: 出力形式
+    """
+    return f"{base_path}.{fmt}"
+
+
+def _segment_line(segment):
+    """テキスト形式のタイムスタンプ付きの1行"""
+    start = int(segment["start"])
+    end = int(segment["end"])
+    text = segment["text"].strip()
+    return (
+        f"[{start // 60:02d}:{start % 60:02d} - {end // 60:02d}:{end % 60:02d}] {text}\n"
+    )
+
+
+def _subtitle_time(seconds, separator):
+    """字幕形式の時刻（00:01:02,345 / 00:01:02.345）"""
+    millis = int(round(max(seconds, 0) * 1000))
+    hours, millis = divmod(millis, 3600 * 1000)
+    minutes, millis = divmod(millis, 60 * 1000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+class SegmentWriter:
+    """
+    1つの形式の出力を書き出す基底クラス
+
+    書き込み中は「出力ファイル名.part」に追記し、完了時に出力ファイル名へ
+    置き換える。途中で失敗した場合は .part が残り、そこまでの結果を確認できる。
+    """
+
+    extension = None
+
+    def __init__(self, path, info):
+        """
+        Args:
+            path: 出力ファイルのパス
+            info: 元ファイルやモデル名などの情報の辞書
+        """
+        self.path = path
+        self.partial_path = path + PARTIAL_SUFFIX
+        self.info = info
+        self.count = 0
+        self._file = open(self.partial_path, "w", encoding="utf-8")
+        self.write_header()
+
+    def write_header(self):
+        """ファイルの先頭を書き出す"""
+
+    def write_segment(self, segment):
+        """セグメントを1つ書き出す"""
+        raise NotImplementedError
+
+    def write_footer(self, result, info):
+        """ファイルの末尾を書き出す"""
+
+    def write_segments(self, segments):
+        for segment in segments:
+            self.count += 1
+            self.write_segment(segment)
+
+    def sync(self):
+        """書き込んだ内容をディスクに確実に書き込む"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def finish(self, result, info):
+        """
+        末尾を書き出して出力ファイル名に置き換える
+
+        Args:
+            result: 文字起こし結果全体
+            info: 完了時点で確定した情報（音声の長さなど）
+        """
+        self.write_footer(result, info)
+        self.sync()
+        self._file.close()
+        os.replace(self.partial_path, self.path)
+
+    def abort(self):
+        """途中までの内容を残して閉じる（何も書いていなければ削除）"""
+        if self._file.closed:
+            return
+        self.sync()
+        self._file.close()
+        if self.count == 0:
+            os.remove(self.partial_path)
+
+
+class TextWriter(SegmentWriter):
+    """
+    これまでと同じレイアウトのテキスト形式
+
+    本文はすべてのセグメントが揃うまで確定しないため、タイムスタンプ付き
+    セグメントを .part に追記しておき、完了時に見出しと本文を付けて書き出す。
+    """
+
+    extension = "txt"
+
+    def write_segment(self, segment):
+        self._file.write(_segment_line(segment))
+
+    def finish(self, result, info):
+        self.sync()
+        self._file.close()
+
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write("=" * 60 + "\n")
+            f.write(" 音声文字起こし結果\n")
+            f.write("=" * 60 + "\n\n")
+            f.write(f"元ファイル: {info['audio_file']}\n")
+            f.write(f"使用モデル: {info['model']}\n")
+            if info.get("duration"):
+                f.write(f"音声の長さ: {format_time(info['duration'])}\n")
+            if info.get("use_chunking"):
+                f.write(f"処理方法: チャンク分割処理（{info['chunk_length_minutes']}分ごと）\n")
+            if info.get("vad"):
+                f.write("無音区間: 除外して処理\n")
+            if info.get("language"):
+                f.write(f"言語: {info['language']}（自動判定）\n")
+            f.write("\n")
+            f.write("=" * 60 + "\n")
+            f.write(" 文字起こしテキスト\n")
+            f.write("=" * 60 + "\n\n")
+            f.write(result["text"])
+            f.write("\n\n")
+            f.write("=" * 60 + "\n")
+            f.write(" タイムスタンプ付きセグメント\n")
+            f.write("=" * 60 + "\n\n")
+
+            with open(self.partial_path, "r", encoding="utf-8") as spool:
+                for line in spool:
+                    f.write(line)
+
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(temp_path, self.path)
+        os.remove(self.partial_path)
+
+
+class JsonWriter(SegmentWriter):
+    """1つのJSONドキュメント（segments を先に、text を最後に書く）"""
+
+    extension = "json"
+
+    def write_header(self):
+        self._file.write("{\n")
+        self._file.write(f'  "source": {json.dumps(self.info["audio_file"], ensure_ascii=False)},\n')
+        self._file.write(f'  "model": {json.dumps(self.info["model"])},\n')
+        self._file.write('  "segments": [')
+
+    def write_segment(self, segment):
+        separator = "\n    " if self.count == 1 else ",\n    "
+        self._file.write(separator + json.dumps(_segment_record(segment, self.count - 1),
+                                                ensure_ascii=False))
+
+    def write_footer(self, result, info):
+        self._file.write("\n  ],\n" if self.count else "],\n")
+        self._file.write(f'  "duration": {json.dumps(info.get("duration"))},\n')
+        if info["model"] != self.info["model"]:
+            # 見出しを書いた後にモデルを切り替えた場合（txt の「A → B」と同じ表記）
+            self._file.write(f'  "models_used": {json.dumps(info["model"], ensure_ascii=False)},\n')
+        if info.get("language"):
+            self._file.write(f'  "language": {json.dumps(info["language"])},\n')
+        self._file.write(f'  "text": {json.dumps(result["text"], ensure_ascii=False)}\n')
+        self._file.write("}\n")
+
+
+class JsonLinesWriter(SegmentWriter):
+    """1行1セグメントのJSON Lines形式"""
+
+    extension = "jsonl"
+
+    def write_header(self):
+        header = {
+            "type": "header",
+            "source": self.info["audio_file"],
+            "model": self.info["model"],
+        }
+        self._file.write(json.dumps(header, ensure_ascii=False) + "\n")
+
+    def write_segment(self, segment):
+        record = {"type": "segment"}
+        record.update(_segment_record(segment, self.count - 1))
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def write_footer(self, result, info):
+        footer = {
+            "type": "summary",
+            "segments": self.count,
+            "duration": info.get("duration"),
+            "text": result["text"],
+        }
+        if info["model"] != self.info["model"]:
+            footer["models_used"] = info["model"]
+        if info.get("language"):
+            footer["language"] = info["language"]
+        self._file.write(json.dumps(footer, ensure_ascii=False) + "\n")
+
+
+class SrtWriter(SegmentWriter):
+    """SubRip字幕形式"""
+
+    extension = "srt"
+
+    def write_segment(self, segment):
+        self._file.write(
+            f"{self.count}\n"
+            f"{_subtitle_time(segment['start'], ',')} --> {_subtitle_time(segment['end'], ',')}\n"
+            f"{segment['text'].strip()}\n\n"
+        )
+
+
+class VttWriter(SegmentWriter):
+    """WebVTT字幕形式"""
+
+    extension = "vtt"
+
+    def write_header(self):
+        self._file.write("WEBVTT\n\n")
+
+    def write_segment(self, segment):
+        self._file.write(
+            f"{_subtitle_time(segment['start'], '.')} --> {_subtitle_time(segment['end'], '.')}\n"
+            f"{segment['text'].strip()}\n\n"
+        )
+
+
+def _segment_record(segment, index):
+    return {
+        "id": index,
+        "start": round(float(segment["start"]), 3),
+        "end": round(float(segment["end"]), 3),
+        "text": segment["text"],
+    }
+
+
+WRITER_CLASSES = {
+    cls.extension: cls
+    for cls in (TextWriter, JsonWriter, JsonLinesWriter, SrtWriter, VttWriter)
+}
+
+
+class TranscriptWriter:
+    """複数の出力形式へ同時に書き出すクラス"""
+
+    def __init__(self, base_path, formats=DEFAULT_OUTPUT_FORMATS, audio_file=None,
+                 model=None):
+        """
+        Args:
+            base_path: 拡張子を除いた出力ファイルのパス
+            formats: 出力形式のリスト（OUTPUT_FORMATS のいずれか）
+            audio_file: 元の音声ファイル
+            model: 使用したモデル名
+        """
+        unknown = [fmt for fmt in formats if fmt not in WRITER_CLASSES]
+        if unknown:
+            raise ValueError(f"未対応の出力形式: {', '.join(unknown)}")
+
+        info = {"audio_file": audio_file, "model": model}
+        self.writers = []
+        try:
+            for fmt in dict.fromkeys(formats):
+                self.writers.append(WRITER_CLASSES[fmt](output_path(base_path, fmt), info))
+        except OSError:
+            self.abort()
+            raise
+        self.finished = False
+
+    @property
+    def paths(self):
+        """出力ファイルのパス（指定した形式の順）"""
+        return [writer.path for writer in self.writers]
+
+    def write_segments(self, segments):
+        """
+        確定したセグメントを追記し、ディスクに確実に書き込む
+
+        チャンクの完了ごとに呼ぶ。
+        """
+        for writer in self.writers:
+            writer.write_segments(segments)
+            writer.sync()
+
+    def finish(self, result, duration=None, use_chunking=False,
+               chunk_length_minutes=None, vad=False, model=None, language=None):
+        """
+        すべての形式を完成させ、出力ファイルのパスを返す
+
+        model を指定すると、完了時に書き出す見出しのモデル名を置き換える
+        （処理の途中でモデルを切り替えた場合）。
+        language は自動判定した言語（複数の場合はカンマ区切り）。
+        """
+        for writer in self.writers:
+            info = dict(writer.info)
+            if model:
+                info["model"] = model
+            info.update({
+                "duration": duration,
+                "use_chunking": use_chunking,
+                "chunk_length_minutes": chunk_length_minutes,
+                "vad": vad,
+                "language": language,
+            })
+            writer.finish(result, info)
+        self.finished = True
+        return self.paths
+
+    def abort(self):
+        """途中までの内容を .part として残して閉じる"""
+        for writer in self.writers:
+            writer.abort()
@@ -0,0 +1,217 @@
+"""
+並列文字起こしモジュール
+複数のワーカープロセスでチャンクを同時に文字起こしする
+"""
+
+import os
+from concurrent.futures import FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from audio_processor import load_chunk_audio
+
+
+# ワーカープロセスごとに読み込んだモデル
+_worker_model = None
+
+
+def _init_worker(model_name, device, torch_threads, quantize=False):
+    """ワーカープロセスの初期化（モデルを一度だけ読み込む）"""
+    global _worker_model
+
+    import torch
+    if torch_threads:
+        torch.set_num_threads(torch_threads)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            # 既に並列処理が始まっている場合は変更できない
+            pass
+
+    if quantize:
+        # 量子化済みの重みは保存先から読むため、ワーカーごとに量子化し直さない
+        from quantization import load_quantized_model
+        _worker_model = load_quantized_model(model_name, device)
+        return
+
+    import whisper
+    _worker_model = whisper.load_model(model_name, device=device)
+
+
+def _transcribe_worker(chunk_audio, options, redetect_language=False):
+    """ワーカープロセスで1チャンクを文字起こし"""
+    audio = load_chunk_audio(chunk_audio)
+    if redetect_language:
+        from language_detection import detect_chunk_language
+        options = dict(
+            options,
+            language=detect_chunk_language(_worker_model, audio, options.get("language"))
+        )
+    return _worker_model.transcribe(audio, **options)
+
+
+def _warm_up_worker(options):
+    """ワーカープロセスで短い無音を一度推論し、初回の初期化を済ませる"""
+    import numpy as np
+    from audio_processor import SAMPLE_RATE
+    _worker_model.transcribe(np.zeros(SAMPLE_RATE, dtype=np.float32), **options)
+
+
+def _detect_language_worker(audio):
+    """ワーカープロセスで言語を判定"""
+    from language_detection import detect_language
+    return detect_language(_worker_model, audio)
+
+
+def default_torch_threads(workers):
+    """ワーカー数からワーカーごとのtorchスレッド数を決める"""
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+class ParallelChunkTranscriber:
+    """ワーカープロセスのプールでチャンクを並列に文字起こしするクラス"""
+
+    def __init__(self, model_name, workers, torch_threads=None, device="cpu", quantize=False):
+        """
+        Args:
+            model_name: Whisperモデル名
+            workers: ワーカープロセス数（各プロセスがモデルを1つずつ保持する）
+            torch_threads: ワーカーごとのtorchスレッド数（None=コア数から自動）
+            device: モデルを配置するデバイス
+            quantize: int8に動的量子化したモデルを使うか（CPUのみ）
+        """
+        self.model_name = model_name
+        self.quantize = quantize
+        self.workers = workers
+        self.torch_threads = torch_threads or default_torch_threads(workers)
+        self.device = device
+        self.executor = None
+        self.warm = False
+
+    def start(self):
+        """ワーカープロセスを起動（起動済みなら何もしない）"""
+        if self.executor is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # torchはforkと相性が悪いため、全OSでspawnを使う
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.model_name, self.device, self.torch_threads, self.quantize),
+            )
+
+    def close(self):
+        """ワーカープロセスを終了"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+        self.warm = False
+
+    def warm_up(self, options):
+        """
+        すべてのワーカープロセスを起動してモデルを読み込み、一度推論しておく
+
+        ワーカーは必要になった時点で起動されるため、ワーカー数と同じ数の処理を
+        同時に投入してすべてを起動させる。
+
+        Args:
+            options: model.transcribe に渡すオプション
+        """
+        if self.warm:
+            return
+        self.start()
+        try:
+            futures = [self.executor.submit(_warm_up_worker, options)
+                       for _ in range(self.workers)]
+            for future in futures:
+                future.result()
+        except BrokenProcessPool:
+            # 異常終了したプールは次回作り直す
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+            raise
+        self.warm = True
+
+    def detect_language(self, audio):
+        """
+        ワーカーのモデルで言語を判定（メインプロセスでモデルを読み込まない）
+
+        Returns:
+            (言語コード, 確率) のタプル
+        """
+        self.start()
+        return self.executor.submit(_detect_language_worker, audio).result()
+
+    def transcribe_chunks(self, chunks, options, on_start=None, on_done=None,
+                          known_results=None, redetect_language=False):
+        """
+        チャンクを並列に文字起こしし、時系列順に結果を返すジェネレーター
+
+        チャンクは必要な分だけ読み進めるため、逐次読み込みのチャンクも
+        同時に保持するのはワーカー数の2倍までに抑えられる。
+
+        Args:
+            chunks: AudioChunk のイテラブル
+            options: model.transcribe に渡すオプション
+            on_start: チャンクを投入したときに (idx, chunk) で呼ばれる関数
+            on_done: チャンクが完了したときに (idx, chunk, result) で呼ばれる関数
+            known_results: 処理済みのチャンクの結果 {idx: result}（再処理しない）
+            redetect_language: チャンクごとに言語を判定し直すか
+
+        Yields:
+            (idx, chunk, result) のタプル
+        """
+        self.start()
+
+        known_results = known_results or {}
+        window = self.workers * 2
+        chunk_iter = enumerate(chunks)
+        exhausted = False
+        pending = {}
+        ready = {}
+        next_idx = 0
+
+        try:
+            while True:
+                while not exhausted and len(pending) + len(ready) < window:
+                    try:
+                        idx, chunk = next(chunk_iter)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    if idx in known_results:
+                        ready[idx] = (idx, chunk, known_results[idx])
+                        continue
+                    future = self.executor.submit(
+                        _transcribe_worker, chunk.audio, options, redetect_language
+                    )
+                    pending[future] = (idx, chunk)
+                    if on_start:
+                        on_start(idx, chunk)
+
+                if next_idx in ready:
+                    yield ready.pop(next_idx)
+                    next_idx += 1
+                    continue
+
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    idx, chunk = pending.pop(future)
+                    result = future.result()
+                    ready[idx] = (idx, chunk, result)
+                    if on_done:
+                        on_done(idx, chunk, result)
+
+        except BrokenProcessPool:
+            # 異常終了したプールは次回作り直す
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+            raise
+
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,95 @@
+"""
+モデル量子化モジュール
+WhisperモデルのLinear層をint8に動的量子化し、CPUでの推論を高速化する
+"""
+
+import os
+
+from app_paths import get_app_data_dir
+
+
+# 量子化したモデルは動的量子化のカーネルがあるCPUでのみ動く
+QUANTIZED_DEVICE = "cpu"
+
+
+def model_label(model_name, quantize=False):
+    """出力や記録に使うモデル名（量子化したモデルは「medium (int8)」のように表す）"""
+    return f"{model_name} (int8)" if quantize else model_name
+
+
+def quantized_cache_path(model_name):
+    """
+    量子化済みモデルの保存先
+
+    モジュールごと保存するため、torchとwhisperのバージョンが変わったら作り直す。
+    """
+    import torch
+    import whisper
+
+    whisper_version = getattr(whisper, "__version__", "unknown")
+    file_name = f"{model_name}-int8-torch{torch.__version__}-whisper{whisper_version}.pt"
+    return os.path.join(get_app_data_dir("models"), file_name.replace("+", "_"))
+
+
+def quantize_model(model):
+    """
+    モデルのLinear層をint8に動的量子化する（モデルを直接書き換える）
+
+    Returns:
+        量子化したモデル
+    """
+    import torch
+    from torch import nn
+
+    # whisper.model.Linear は forward だけを上書きした nn.Linear のサブクラス。
+    # quantize_dynamic は型が一致する層しか置き換えないため nn.Linear に戻す
+    for module in model.modules():
+        if isinstance(module, nn.Linear) and type(module) is not nn.Linear:
+            module.__class__ = nn.Linear
+
+    model.eval()
+    return torch.ao.quantization.quantize_dynamic(
+        model, {nn.Linear}, dtype=torch.qint8, inplace=True
+    )
+
+
+def load_quantized_model(model_name, device=QUANTIZED_DEVICE):
+    """
+    int8量子化したWhisperモデルを読み込む
+
+    一度量子化したモデルはアプリのデータディレクトリに保存し、
+    次回からはfp32の重みの読み込みと量子化を省略する。
+
+    Args:
+        model_name: Whisperモデル名
+        device: 読み込み先（CPUのみ対応）
+
+    Returns:
+        量子化したモデル
+    """
+    import torch
+
+    if device != QUANTIZED_DEVICE:
+        raise ValueError(f"int8量子化はCPUでのみ使用できます（指定: {device}）")
+
+    path = quantized_cache_path(model_name)
+    if os.path.exists(path):
+        try:
+            # 自分で保存したファイルのみを読む（量子化した層を含むためモジュールごと復元する）
+            return torch.load(path, map_location=QUANTIZED_DEVICE, weights_only=False)
+        except Exception as e:
+            print(f"⚠ 量子化済みモデルを読み込めないため作り直します: {e}")
+
+    import whisper
+    model = quantize_model(whisper.load_model(model_name, device=QUANTIZED_DEVICE))
+
+    # ワーカープロセスが同時に保存しても壊れないようにプロセスごとの一時ファイルから置き換える
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        torch.save(model, temp_path)
+        os.replace(temp_path, path)
+    except OSError as e:
+        print(f"⚠ 量子化済みモデルの保存に失敗: {e}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return model
@@ -0,0 +1,175 @@
+"""
+文字起こし結果キャッシュモジュール
+音声の内容とパラメータをキーに文字起こし結果をディスクに保存する
+"""
+
+import os
+import json
+import gzip
+import hashlib
+import threading
+
+from app_paths import get_app_data_dir
+
+
+# キャッシュ全体のサイズ上限（MB）
+DEFAULT_MAX_SIZE_MB = 512
+
+# キャッシュ形式のバージョン（形式を変えたら上げる）
+CACHE_VERSION = 1
+
+# ハッシュ値のメモ {(絶対パス, サイズ, 更新時刻): ハッシュ}
+_hash_cache = {}
+
+
+def hash_audio_file(audio_file, block_size=1024 * 1024):
+    """
+    音声ファイルの内容を逐次読み込みでハッシュ化
+
+    同じファイル（パス・サイズ・更新時刻が同じ）はプロセス内で再計算しない。
+    """
+    stat = os.stat(audio_file)
+    memo_key = (os.path.abspath(audio_file), stat.st_size, stat.st_mtime_ns)
+    if memo_key in _hash_cache:
+        return _hash_cache[memo_key]
+
+    digest = hashlib.blake2b(digest_size=20)
+    with open(audio_file, "rb") as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            digest.update(block)
+
+    content_hash = digest.hexdigest()
+    _hash_cache[memo_key] = content_hash
+    return content_hash
+
+
+def make_cache_key(content_hash, model_name, language, params):
+    """音声の内容・モデル・言語・デコードパラメータからキャッシュキーを作成"""
+    payload = json.dumps(
+        {
+            "version": CACHE_VERSION,
+            "content": content_hash,
+            "model": model_name,
+            "language": language,
+            "params": params,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def compact_segments(segments):
+    """保存に必要な項目だけを残したセグメント"""
+    return [
+        {
+            "id": segment.get("id", i),
+            "start": segment["start"],
+            "end": segment["end"],
+            "text": segment["text"],
+        }
+        for i, segment in enumerate(segments)
+    ]
+
+
+class ResultCache:
+    """文字起こし結果をディスクにキャッシュするクラス"""
+
+    def __init__(self, cache_dir=None, max_size_mb=DEFAULT_MAX_SIZE_MB):
+        """
+        Args:
+            cache_dir: 保存先ディレクトリ（None=アプリのデータディレクトリ）
+            max_size_mb: キャッシュ全体のサイズ上限（MB）
+        """
+        self.cache_dir = cache_dir or get_app_data_dir("cache", "results")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.max_size_mb = max_size_mb
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json.gz")
+
+    def get(self, key):
+        """
+        キャッシュ済みの結果を取得
+
+        Returns:
+            結果の辞書、存在しない場合は None
+        """
+        path = self._path(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if entry.get("version") != CACHE_VERSION:
+            return None
+
+        # 最近使ったものを残すため更新時刻を記録
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def put(self, key, result, **metadata):
+        """
+        結果を保存
+
+        Args:
+            key: make_cache_key で作成したキー
+            result: {"text": ..., "segments": [...]} 形式の結果
+            **metadata: 一緒に保存する情報（音声の長さなど）
+        """
+        entry = dict(metadata)
+        entry["version"] = CACHE_VERSION
+        entry["text"] = result["text"]
+        entry["segments"] = compact_segments(result["segments"])
+
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(temp_path, "wt", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+        self._evict()
+
+    def _evict(self):
+        """サイズ上限を超えた分を古いものから削除"""
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith(".json.gz"):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            limit = self.max_size_mb * 1024 * 1024
+            # 直前に保存したもの（最も新しいもの）は上限を超えていても残す
+            for _, size, path in sorted(entries)[:-1]:
+                if total <= limit:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+
+    def clear(self):
+        """キャッシュをすべて削除"""
+        with self._lock:
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".json.gz"):
+                    try:
+                        os.remove(os.path.join(self.cache_dir, name))
+                    except OSError:
+                        pass
@@ -0,0 +1,170 @@
+"""
+起動時間計測モジュール
+アプリ起動の各段階にかかった時間を記録し、過去の起動と比較する
+"""
+
+import os
+import json
+import time
+import threading
+
+from app_paths import get_app_data_dir
+
+
+# 計測する段階（記録順）と表示名
+STARTUP_PHASES = [
+    ("interpreter", "Python起動"),
+    ("flet_import", "flet読み込み"),
+    ("ui_build", "UI構築"),
+    ("first_paint", "初回描画"),
+    ("heavy_imports", "whisper/torch読み込み"),
+    ("engine_ready", "モデル準備完了"),
+]
+
+# 保存する起動記録の件数
+STARTUP_HISTORY_SIZE = 20
+
+# 過去の中央値からこの倍率以上遅くなった段階を警告する
+REGRESSION_RATIO = 1.5
+
+# これより短い段階は誤差が大きいため比較しない（秒）
+REGRESSION_MIN_SECONDS = 0.2
+
+
+def _process_start_time():
+    """プロセスの起動時刻（取得できない場合は None）"""
+    try:
+        import psutil
+        return psutil.Process(os.getpid()).create_time()
+    except Exception:
+        return None
+
+
+class StartupProfiler:
+    """起動の各段階に到達した時刻を記録するクラス"""
+
+    def __init__(self):
+        now = time.time()
+        process_start = _process_start_time()
+        # プロセスの起動時刻が分からない場合はこのモジュールの読み込み時点を起点にする
+        self.origin = process_start if process_start and process_start <= now else now
+        self.origin_known = process_start is not None
+        self._marks = {}
+        self._lock = threading.Lock()
+        self._finished = False
+
+    def mark(self, phase):
+        """段階に到達したことを記録（2回目以降は無視）"""
+        with self._lock:
+            if phase not in self._marks:
+                self._marks[phase] = time.time() - self.origin
+
+    def elapsed(self, phase):
+        """起動から段階に到達するまでの秒数（未到達なら None）"""
+        with self._lock:
+            return self._marks.get(phase)
+
+    def timings(self):
+        """
+        段階ごとの所要時間
+
+        Returns:
+            [(段階, 起動からの秒数, 前の段階からの秒数), ...]
+        """
+        with self._lock:
+            marks = dict(self._marks)
+
+        rows = []
+        previous = 0.0
+        for phase, _ in STARTUP_PHASES:
+            if phase not in marks:
+                continue
+            rows.append((phase, marks[phase], marks[phase] - previous))
+            previous = marks[phase]
+        return rows
+
+    def format_report(self, regressions=None):
+        """段階ごとの所要時間を表示用の文字列にする"""
+        labels = dict(STARTUP_PHASES)
+        lines = ["起動時間:"]
+        if not self.origin_known:
+            lines.append("  （psutilがないためPython起動の時間は計測していません）")
+        for phase, total, delta in self.timings():
+            lines.append(f"  {labels[phase]}: {total:.2f}秒 (+{delta:.2f}秒)")
+        for phase, delta, median in regressions or []:
+            lines.append(
+                f"  ⚠ {labels[phase]}が遅くなっています: "
+                f"{delta:.2f}秒（過去の中央値 {median:.2f}秒）"
+            )
+        return "\n".join(lines)
+
+    def finish(self, history_file=None):
+        """
+        計測を終えて記録を保存し、過去の起動より遅くなった段階を返す
+
+        Args:
+            history_file: 起動記録のファイル（None=アプリのデータディレクトリ）
+
+        Returns:
+            [(段階, 今回の秒数, 過去の中央値), ...]（2回目以降の呼び出しでは空）
+        """
+        with self._lock:
+            if self._finished:
+                return []
+            self._finished = True
+
+        history_file = history_file or os.path.join(get_app_data_dir(), "startup_history.jsonl")
+        history = _load_history(history_file)
+        current = {phase: delta for phase, _, delta in self.timings()}
+        regressions = find_regressions(current, history)
+
+        history.append({"time": time.time(), "phases": current})
+        try:
+            with open(history_file, "w", encoding="utf-8") as f:
+                for entry in history[-STARTUP_HISTORY_SIZE:]:
+                    f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            print(f"⚠ 起動記録を保存できません: {e}")
+
+        return regressions
+
+
+def _load_history(history_file):
+    """保存済みの起動記録を読み込む"""
+    history = []
+    try:
+        with open(history_file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    history.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return history
+
+
+def find_regressions(current, history):
+    """過去の起動の中央値より大きく遅くなった段階を探す"""
+    regressions = []
+    for phase, _ in STARTUP_PHASES:
+        if phase not in current:
+            continue
+        past = sorted(
+            entry["phases"][phase] for entry in history
+            if phase in entry.get("phases", {})
+        )
+        if len(past) < 3:
+            continue
+        median = past[len(past) // 2]
+        if current[phase] >= REGRESSION_MIN_SECONDS and current[phase] > median * REGRESSION_RATIO:
+            regressions.append((phase, current[phase], median))
+    return regressions
+
+
+_profiler = StartupProfiler()
+
+
+def get_startup_profiler():
+    """プロセス全体で共有する起動時間計測を取得"""
+    return _profiler
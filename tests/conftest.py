@@ -0,0 +1,20 @@
+"""
+テスト共通の設定
+リポジトリ直下のモジュールを読み込めるようにし、アプリのデータ保存先をテストごとに分ける
+"""
+
+import os
+import sys
+
+import pytest
+
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def app_home(tmp_path, monkeypatch):
+    """アプリのデータディレクトリ（利用者のデータに書き込まない）"""
+    home = tmp_path / "app_home"
+    monkeypatch.setenv("TRANSCRIBE_APP_HOME", str(home))
+    return home
@@ -0,0 +1,95 @@
+"""自動調整の候補と設定の保存のテスト"""
+
+import pytest
+
+import autotune
+from autotune import (
+    DEFAULT_CHUNK_LENGTH_MINUTES,
+    default_clip_seconds,
+    load_profile,
+    parallel_candidates,
+    save_profile,
+    storable_chunk_minutes,
+    tune,
+    worker_chunk_minutes,
+)
+
+
+def test_clip_gives_every_worker_several_chunks():
+    workers = [1, 2, 4]
+    duration = default_clip_seconds(workers)
+    chunk_seconds = worker_chunk_minutes(duration, workers) * 60
+
+    assert duration / chunk_seconds >= max(workers) * autotune.CHUNKS_PER_WORKER
+
+
+def test_short_recording_uses_shorter_chunks():
+    assert worker_chunk_minutes(60, [1, 2, 4]) * 60 == pytest.approx(5.0)
+
+
+def test_parallel_candidates_fit_the_cpu():
+    assert parallel_candidates([1, 2, 4], [1, 2], 4) == [(1, 1), (1, 2), (1, 4), (2, 1), (2, 2)]
+
+
+def test_short_chunks_need_soft_boundaries():
+    assert storable_chunk_minutes(DEFAULT_CHUNK_LENGTH_MINUTES)
+    assert storable_chunk_minutes(autotune.MIN_PROFILE_CHUNK_MINUTES)
+    assert not storable_chunk_minutes(2.5)
+    assert storable_chunk_minutes(2.5, vad=True)
+    assert storable_chunk_minutes(2.5, overlap_seconds=1)
+
+
+def _fake_runs(monkeypatch, wall):
+    """設定ごとの処理時間を wall(チャンク長, ワーカー数, スレッド数) で返す"""
+    calls = []
+
+    def run_stage(stage, params):
+        calls.append((params["chunk_minutes"], params["workers"], params["torch_threads"]))
+        return {"transcribe": {"wall_seconds": wall(*calls[-1])}}
+
+    import benchmark
+    monkeypatch.setattr(benchmark, "run_stage", run_stage)
+    return calls
+
+
+def test_tune_workers_only_by_default(monkeypatch):
+    calls = _fake_runs(monkeypatch, lambda chunk, workers, threads: 10 / workers + threads)
+    monkeypatch.setattr(autotune.os, "cpu_count", lambda: 4)
+    params = {"duration": 720}
+
+    best, trials = tune(params, [1, 2], [1, 2], isolate=False, log=lambda message: None)
+
+    assert {chunk for chunk, _, _ in calls} == {1}
+    assert (best["workers"], best["torch_threads"]) == (2, 1)
+    assert best["chunk_length_minutes"] is None
+    assert len(trials) == len(calls)
+
+
+def test_tune_chunks_always_includes_default(monkeypatch):
+    calls = _fake_runs(monkeypatch, lambda chunk, workers, threads: chunk)
+    params = {"duration": 720}
+
+    best, _ = tune(params, [1], [1], chunk_candidates=[2.5, 5], isolate=False,
+                   log=lambda message: None)
+
+    assert [chunk for chunk, _, _ in calls] == [1, 2.5, 5, DEFAULT_CHUNK_LENGTH_MINUTES]
+    assert best["chunk_length_minutes"] == 2.5
+
+
+def test_profile_round_trip(tmp_path):
+    path = str(tmp_path / "profile.json")
+    profile = {"workers": 2, "torch_threads": 4, "machine": autotune.machine_info()}
+
+    save_profile("small", "int8", profile, path)
+    save_profile("medium", "fp32", dict(profile, workers=1), path)
+
+    assert load_profile("small", "int8", path)["workers"] == 2
+    assert load_profile("medium", "fp32", path)["workers"] == 1
+    assert load_profile("small", "fp32", path) is None
+
+
+def test_profile_from_other_machine_is_ignored(tmp_path):
+    path = str(tmp_path / "profile.json")
+    save_profile("small", "fp32", {"workers": 2, "machine": {"cpu_count": -1}}, path)
+
+    assert load_profile("small", "fp32", path) is None
@@ -0,0 +1,158 @@
+"""BatchQueue のテスト"""
+
+import os
+import wave
+import time
+import threading
+
+import pytest
+
+from batch_queue import BatchQueue, TranscribeJob, find_audio_files
+
+
+class RecordingEngine:
+    """文字起こしせずに呼ばれた順番を記録するエンジン"""
+
+    def __init__(self, fail=()):
+        self.calls = []
+        self.fail = set(fail)
+        self.preloaded = 0
+        self.last_output_files = []
+        self.last_result = None
+        # 最初のジョブで止めておき、待機列を並べ替えてから進める
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def preload(self):
+        self.preloaded += 1
+
+    def transcribe(self, audio_file, progress_callback=None, **options):
+        self.gate.wait(5)
+        name = os.path.basename(audio_file)
+        self.calls.append((name, options))
+        progress_callback(f"{name} を処理しています")
+        if name in self.fail:
+            return False, "失敗しました", None
+        output = f"{audio_file}.txt"
+        self.last_output_files = [output]
+        self.last_result = {"text": name, "segments": []}
+        return True, "完了", output
+
+
+def _wav(folder, name, seconds=1):
+    path = os.path.join(folder, name)
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(16000)
+        f.writeframes(b"\0\0" * 16000 * seconds)
+    return path
+
+
+@pytest.fixture
+def files(tmp_path):
+    return [_wav(str(tmp_path), f"{name}.wav") for name in "abcde"]
+
+
+def _queued_names(queue):
+    return [os.path.basename(job.audio_file) for job in queue.jobs()
+            if job.status == TranscribeJob.QUEUED]
+
+
+def test_higher_priority_first_then_fifo(files):
+    queue = BatchQueue(RecordingEngine())
+    queue.add_file(files[0])
+    queue.add_file(files[1], priority=5)
+    queue.add_file(files[2])
+    queue.add_file(files[3], priority=5)
+
+    assert _queued_names(queue) == ["b.wav", "d.wav", "a.wav", "c.wav"]
+
+
+def test_move_and_priority(files):
+    queue = BatchQueue(RecordingEngine())
+    a, b, c, d = queue.add_files(files[:4])
+
+    assert queue.move(d.job_id, 1)
+    assert _queued_names(queue) == ["a.wav", "d.wav", "b.wav", "c.wav"]
+
+    assert queue.move_to_front(c.job_id)
+    assert _queued_names(queue) == ["c.wav", "a.wav", "d.wav", "b.wav"]
+
+    # 末尾より後ろを指定した場合は末尾に移動する
+    assert queue.move(c.job_id, 99)
+    assert _queued_names(queue) == ["a.wav", "d.wav", "b.wav", "c.wav"]
+
+    assert queue.set_priority(b.job_id, 1)
+    assert _queued_names(queue) == ["b.wav", "a.wav", "d.wav", "c.wav"]
+
+
+def test_move_takes_neighbor_priority(files):
+    queue = BatchQueue(RecordingEngine())
+    urgent = queue.add_file(files[0], priority=5)
+    normal = queue.add_file(files[1])
+
+    queue.move_to_front(normal.job_id)
+
+    assert normal.priority == urgent.priority
+    assert _queued_names(queue) == ["b.wav", "a.wav"]
+
+
+def test_cancel_and_unknown_jobs(files):
+    queue = BatchQueue(RecordingEngine())
+    a, b = queue.add_files(files[:2])
+
+    assert queue.cancel(a.job_id)
+    assert not queue.cancel(a.job_id)
+    assert not queue.move(a.job_id, 0)
+    assert not queue.set_priority(999, 1)
+    assert _queued_names(queue) == ["b.wav"]
+
+
+def test_runs_jobs_in_queue_order(files):
+    engine = RecordingEngine(fail={"c.wav"})
+    engine.gate.clear()
+    updates = []
+    queue = BatchQueue(engine, on_job_update=lambda job: updates.append(job.status))
+    first = queue.add_file(files[0])
+    queue.start()
+    # 最初のジョブの実行中に残りを追加して並べ替える
+    while first.status != TranscribeJob.RUNNING:
+        time.sleep(0.01)
+    b, c, d = queue.add_files(files[1:4], vad=True)
+    queue.move_to_front(d.job_id)
+    engine.gate.set()
+
+    assert queue.wait(timeout=5)
+    queue.stop()
+
+    assert [name for name, _ in engine.calls] == ["a.wav", "d.wav", "b.wav", "c.wav"]
+    assert engine.calls[1][1] == {"vad": True}
+    assert engine.preloaded == 1
+    assert c.status == TranscribeJob.FAILED
+    assert b.status == TranscribeJob.DONE
+    assert b.output_files == [f"{files[1]}.txt"]
+    assert b.audio_seconds == 1.0
+    assert TranscribeJob.RUNNING in updates
+
+    stats = queue.stats()
+    assert stats["completed"] == 3
+    assert stats["failed"] == 1
+    assert stats["queued"] == 0
+    assert stats["audio_seconds"] == 3.0
+
+
+def test_find_audio_files(tmp_path):
+    _wav(str(tmp_path), "b.WAV")
+    _wav(str(tmp_path), "a.wav")
+    (tmp_path / "notes.txt").write_text("x")
+    sub = tmp_path / "sub"
+    sub.mkdir()
+    _wav(str(sub), "c.wav")
+
+    names = [os.path.relpath(p, tmp_path) for p in find_audio_files(str(tmp_path))]
+    recursive = [os.path.relpath(p, tmp_path)
+                 for p in find_audio_files(str(tmp_path), recursive=True)]
+
+    assert names == ["a.wav", "b.WAV"]
+    assert recursive == ["a.wav", "b.WAV", os.path.join("sub", "c.wav")]
@@ -0,0 +1,100 @@
+"""JobJournal のテスト"""
+
+import json
+
+import pytest
+
+from job_journal import JobJournal
+
+
+def _result(text, language=None):
+    result = {"text": text, "segments": [{"start": 0.0, "end": 1.0, "text": text}]}
+    if language:
+        result["language"] = language
+    return result
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return JobJournal(str(tmp_path / "job.jsonl"), "job", audio_file="a.mp3")
+
+
+def test_missing_journal_is_empty(journal):
+    assert journal.load() == {}
+
+
+def test_records_and_loads_chunks(journal):
+    journal.record_chunk(0, _result("一つ目"))
+    journal.record_chunk(2, _result("三つ目"))
+
+    loaded = journal.load()
+
+    assert sorted(loaded) == [0, 2]
+    assert loaded[2]["text"] == "三つ目"
+    assert loaded[2]["segments"] == [{"id": 0, "start": 0.0, "end": 1.0, "text": "三つ目"}]
+
+
+def test_truncated_last_line_is_ignored(journal):
+    journal.record_chunk(0, _result("一つ目"))
+    journal.record_chunk(1, _result("二つ目"))
+    with open(journal.path, "r+", encoding="utf-8") as f:
+        content = f.read()
+        # 最後のチャンクを書き込み途中で中断した状態にする
+        f.seek(0)
+        f.truncate()
+        f.write(content[:-20])
+
+    assert sorted(journal.load()) == [0]
+
+
+def test_other_job_is_ignored(tmp_path, journal):
+    journal.record_chunk(0, _result("一つ目"))
+
+    other = JobJournal(journal.path, "other")
+
+    assert other.load() == {}
+
+
+@pytest.mark.parametrize("header", ['{"type": "hea', "", '{"type": "chunk", "index": 0}'])
+def test_corrupt_header_is_a_mismatch(journal, header):
+    journal.record_chunk(0, _result("一つ目"))
+    journal.record_chunk(1, _result("二つ目"))
+    with open(journal.path, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    lines[0] = header + "\n"
+    with open(journal.path, "w", encoding="utf-8") as f:
+        f.writelines(lines)
+
+    assert journal.load() == {}
+    # 壊れたジャーナルは捨て、以降の記録は新しいジャーナルになる
+    journal.record_chunk(2, _result("三つ目"))
+    assert sorted(journal.load()) == [2]
+
+
+def test_language_is_persisted(journal):
+    journal.record_chunk(0, _result("hello", language="en"))
+    journal.record_chunk(1, _result("こんにちは"))
+
+    loaded = journal.load()
+
+    assert loaded[0]["language"] == "en"
+    assert "language" not in loaded[1]
+
+
+def test_header_records_job(journal):
+    journal.record_chunk(0, _result("一つ目"))
+
+    with open(journal.path, "r", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+
+    assert header["type"] == "header"
+    assert header["job_key"] == "job"
+    assert header["audio_file"] == "a.mp3"
+
+
+def test_discard_removes_file(journal):
+    journal.record_chunk(0, _result("一つ目"))
+    journal.discard()
+    journal.discard()
+
+    assert journal.load() == {}
@@ -0,0 +1,102 @@
+"""LogBuffer / FrameScheduler のテスト"""
+
+import time
+import threading
+
+from log_buffer import FrameScheduler, LogBuffer
+
+
+def test_keeps_only_the_newest_lines():
+    log = LogBuffer(max_lines=3)
+    for i in range(5):
+        log.append(f"行{i}")
+
+    assert log.lines() == ["行2", "行3", "行4"]
+
+
+def test_read_since_returns_only_new_lines():
+    log = LogBuffer(max_lines=10)
+    log.append("a")
+    log.append("b")
+    total, lines, _ = log.read_since(0)
+    assert lines == ["a", "b"]
+
+    log.append("c")
+    total, lines, reset = log.read_since(total)
+    assert (lines, reset) == (["c"], False)
+
+    total, lines, reset = log.read_since(total)
+    assert (total, lines, reset) == (3, [], False)
+
+
+def test_read_since_after_overflow_rereads_everything():
+    log = LogBuffer(max_lines=3)
+    log.append("a")
+    total, _, _ = log.read_since(0)
+    for line in "bcdef":
+        log.append(line)
+
+    total, lines, reset = log.read_since(total)
+
+    assert (total, lines, reset) == (6, ["d", "e", "f"], True)
+
+
+def test_read_since_after_clear_rereads_everything():
+    log = LogBuffer(max_lines=10)
+    for line in "abc":
+        log.append(line)
+    total, _, _ = log.read_since(0)
+    log.clear()
+    log.append("x")
+
+    total, lines, reset = log.read_since(total)
+
+    assert (total, lines, reset) == (1, ["x"], True)
+
+
+def test_appends_from_many_threads_are_counted():
+    log = LogBuffer(max_lines=50)
+
+    def worker():
+        for i in range(200):
+            log.append(i)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    total, lines, _ = log.read_since(0)
+    assert total == 800
+    assert len(lines) == 50
+
+
+def test_frame_scheduler_coalesces_requests():
+    rendered = []
+    scheduler = FrameScheduler(lambda: rendered.append(time.perf_counter()), frame_rate=20)
+    scheduler.start()
+    try:
+        for _ in range(100):
+            scheduler.request()
+            time.sleep(0.001)
+        time.sleep(0.1)
+    finally:
+        scheduler.stop()
+
+    # 100回の要求が間隔ごとの描画にまとめられる
+    assert 1 <= len(rendered) < 20
+
+
+def test_frame_scheduler_survives_render_errors():
+    calls = []
+
+    def render():
+        calls.append(1)
+        raise RuntimeError("描画に失敗")
+
+    scheduler = FrameScheduler(render)
+    scheduler.flush()
+    scheduler.flush()
+
+    assert len(calls) == 2
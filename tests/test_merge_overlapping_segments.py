@@ -0,0 +1,80 @@
+"""merge_overlapping_segments のテスト"""
+
+from transcribe_core import merge_overlapping_segments
+
+
+def seg(start, end, text):
+    return {"start": start, "end": end, "text": text}
+
+
+def texts(segments):
+    return [s["text"] for s in segments]
+
+
+# 前のチャンクは 0〜30秒、新しいチャンクは 25秒から（重複区間は 25〜30秒、中央は 27.5秒）
+OVERLAP = (25.0, 30.0)
+
+
+def test_without_overlap_concatenates():
+    previous = [seg(0, 5, "a")]
+    incoming = [seg(30, 35, "b")]
+
+    assert merge_overlapping_segments(previous, incoming, 30.0, 30.0) == previous + incoming
+
+
+def test_duplicate_keeps_longer_text():
+    previous = [seg(0, 10, "前半"), seg(26, 30, "今日は")]
+    incoming = [seg(26, 29, "今日は良い天気ですね"), seg(31, 35, "後半")]
+
+    merged = merge_overlapping_segments(previous, incoming, *OVERLAP)
+
+    assert texts(merged) == ["前半", "今日は良い天気ですね", "後半"]
+
+
+def test_duplicate_of_similar_length_keeps_containing_text():
+    # 長さの差は1.2倍以内で中央より前にあるが、前のチャンクのものは途中で切れている
+    previous = [seg(26, 27.4, "今日は良い天気で")]
+    incoming = [seg(26, 28, "今日は良い天気です")]
+
+    merged = merge_overlapping_segments(previous, incoming, *OVERLAP)
+
+    assert texts(merged) == ["今日は良い天気です"]
+
+
+def test_duplicate_touching_chunk_edge_loses():
+    # 中央より後ろにあっても、前のチャンクの端に接していない方を残す
+    previous = [seg(27.0, 29.0, "ABCDEFGHIJ")]
+    incoming = [seg(25.1, 29.0, "ABCDEFGHIK")]
+
+    merged = merge_overlapping_segments(previous, incoming, *OVERLAP)
+
+    assert texts(merged) == ["ABCDEFGHIJ"]
+
+
+def test_duplicate_falls_back_to_midpoint():
+    previous = [seg(26, 27, "同じ文です"), seg(28, 29, "次の文です")]
+    incoming = [seg(26, 27, "同じ文です"), seg(28, 29, "次の文です")]
+
+    merged = merge_overlapping_segments(previous, incoming, *OVERLAP)
+
+    assert merged == [previous[0], incoming[1]]
+
+
+def test_unmatched_segments_split_at_the_seam():
+    previous = [seg(20, 24, "確定済み"), seg(25.5, 27, "前だけ"), seg(28, 30, "切れた前")]
+    incoming = [seg(25, 26.5, "ノイズ"), seg(28, 29.5, "別の文"), seg(31, 33, "続き")]
+
+    merged = merge_overlapping_segments(previous, incoming, *OVERLAP)
+
+    assert texts(merged) == ["確定済み", "前だけ", "別の文", "続き"]
+
+
+def test_result_is_sorted():
+    previous = [seg(26, 29, "とても長い前のチャンクの文章")]
+    incoming = [seg(27.5, 28, "短い"), seg(28.5, 29, "とても長い前のチャンクの文")]
+
+    merged = merge_overlapping_segments(previous, incoming, *OVERLAP)
+
+    starts = [s["start"] for s in merged]
+    assert starts == sorted(starts)
+    assert texts(merged) == ["とても長い前のチャンクの文章", "短い"]
@@ -0,0 +1,79 @@
+"""期限に合わせたモデル選択のテスト"""
+
+import time
+
+import pytest
+
+from model_selection import DeadlineTracker, SpeedStore, choose_model
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SpeedStore(str(tmp_path / "model_speed.json"))
+
+
+def test_estimates_fall_back_to_defaults(store):
+    assert store.realtime_factor("medium") == (1.0, False)
+    rtf, measured = store.realtime_factor("medium", quantize=True)
+    assert rtf > 1.0 and not measured
+    assert store.estimate_seconds("medium", 600, loaded=True) == 600
+
+
+def test_measurements_are_saved_per_model(tmp_path, store):
+    store.record("small", 600, 100)
+    store.record("small", 600, 300)
+    store.record("small", 600, 200)
+    store.record_load("small", 4.0)
+
+    reloaded = SpeedStore(store.path)
+
+    assert reloaded.realtime_factor("small") == (3.0, True)
+    assert reloaded.estimate_seconds("small", 300) == 104.0
+    assert reloaded.realtime_factor("medium")[1] is False
+
+
+def test_chooses_most_accurate_model_in_time(store):
+    for name, rtf in [("tiny", 30), ("base", 20), ("small", 10), ("medium", 4), ("large", 2)]:
+        store.record(name, rtf * 100, 100)
+        store.record_load(name, 0)
+
+    assert choose_model(600, 400, store=store)[0] == "large"
+    assert choose_model(600, 200, store=store)[0] == "medium"
+    name, estimates, on_time = choose_model(600, 1, store=store)
+    assert (name, on_time) == ("tiny", False)
+    assert estimates["small"] == 60
+
+
+def test_loaded_model_skips_load_time(store):
+    store.record("medium", 100, 100)
+    store.record_load("medium", 50)
+
+    assert choose_model(100, 120, store=store)[0] != "medium"
+    assert choose_model(100, 120, store=store,
+                        is_loaded=lambda name: name == "medium")[0] == "medium"
+
+
+def test_tracker_downgrades_when_behind(store):
+    tracker = DeadlineTracker(time.time() + 100, 1000, "medium", store=store)
+
+    # 100秒分に50秒かかっている（残り900秒分に450秒かかる見込み）
+    faster = tracker.chunk_done(100, 50)
+
+    assert faster in ("tiny", "base", "small")
+    tracker.switch(faster)
+    assert tracker.downgraded
+    assert tracker.model_name == faster
+
+
+def test_tracker_keeps_model_when_on_time(store):
+    tracker = DeadlineTracker(time.time() + 1000, 1000, "medium", store=store)
+
+    assert tracker.chunk_done(100, 10) is None
+    assert tracker.chunk_done(900, 90) is None
+    assert not tracker.downgraded
+
+
+def test_tracker_cannot_go_below_fastest(store):
+    tracker = DeadlineTracker(time.time() + 1, 1000, "tiny", store=store)
+
+    assert tracker.chunk_done(100, 50) is None
@@ -0,0 +1,138 @@
+"""出力ファイル（txt/json/jsonl/srt/vtt）のテスト"""
+
+import json
+import os
+
+import pytest
+
+from output_writers import OUTPUT_FORMATS, PARTIAL_SUFFIX, TranscriptWriter
+
+
+SEGMENTS = [
+    {"start": 0.0, "end": 2.5, "text": " こんにちは"},
+    {"start": 62.25, "end": 3725.0, "text": " 長い話です "},
+]
+RESULT = {"text": "こんにちは長い話です", "segments": SEGMENTS}
+
+
+def _write(tmp_path, formats, chunks=(SEGMENTS[:1], SEGMENTS[1:]), **finish):
+    base = str(tmp_path / "会議_文字起こし")
+    writer = TranscriptWriter(base, formats, audio_file="会議.mp3", model="small")
+    for segments in chunks:
+        writer.write_segments(segments)
+    paths = writer.finish(RESULT, duration=3725.0, **finish)
+    return {os.path.splitext(path)[1][1:]: path for path in paths}
+
+
+def _read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def test_writes_every_format_and_removes_partials(tmp_path):
+    paths = _write(tmp_path, OUTPUT_FORMATS)
+
+    assert sorted(paths) == sorted(OUTPUT_FORMATS)
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(PARTIAL_SUFFIX)]
+
+
+def test_text_layout(tmp_path):
+    text = _read(_write(tmp_path, ["txt"], use_chunking=True, chunk_length_minutes=30,
+                        vad=True, language="ja")["txt"])
+
+    assert "元ファイル: 会議.mp3\n使用モデル: small\n音声の長さ: 1:02:05\n" in text
+    assert "処理方法: チャンク分割処理（30分ごと）\n" in text
+    assert "無音区間: 除外して処理\n" in text
+    assert "言語: ja（自動判定）\n" in text
+    assert " 文字起こしテキスト\n" + "=" * 60 + "\n\nこんにちは長い話です\n" in text
+    assert text.endswith("[00:00 - 00:02] こんにちは\n[01:02 - 62:05] 長い話です\n")
+
+
+def test_json_document(tmp_path):
+    data = json.loads(_read(_write(tmp_path, ["json"])["json"]))
+
+    assert data["source"] == "会議.mp3"
+    assert data["model"] == "small"
+    assert data["duration"] == 3725.0
+    assert data["text"] == RESULT["text"]
+    assert data["segments"] == [
+        {"id": 0, "start": 0.0, "end": 2.5, "text": " こんにちは"},
+        {"id": 1, "start": 62.25, "end": 3725.0, "text": " 長い話です "},
+    ]
+    assert "models_used" not in data
+    assert "language" not in data
+
+
+def test_json_without_segments(tmp_path):
+    data = json.loads(_read(_write(tmp_path, ["json"], chunks=())["json"]))
+
+    assert data["segments"] == []
+
+
+def test_json_lines_records(tmp_path):
+    lines = _read(_write(tmp_path, ["jsonl"], language="en")["jsonl"]).splitlines()
+    records = [json.loads(line) for line in lines]
+
+    assert records[0] == {"type": "header", "source": "会議.mp3", "model": "small"}
+    assert [r["type"] for r in records[1:-1]] == ["segment", "segment"]
+    assert records[2]["id"] == 1
+    assert records[-1] == {
+        "type": "summary",
+        "segments": 2,
+        "duration": 3725.0,
+        "text": RESULT["text"],
+        "language": "en",
+    }
+
+
+@pytest.mark.parametrize("fmt", ["txt", "json", "jsonl"])
+def test_switched_model_is_recorded(tmp_path, fmt):
+    content = _read(_write(tmp_path, [fmt], model="small → tiny")[fmt])
+
+    if fmt == "txt":
+        assert "使用モデル: small → tiny\n" in content
+    elif fmt == "json":
+        assert json.loads(content)["models_used"] == "small → tiny"
+    else:
+        assert json.loads(content.splitlines()[-1])["models_used"] == "small → tiny"
+
+
+def test_srt_cues(tmp_path):
+    srt = _read(_write(tmp_path, ["srt"])["srt"])
+
+    assert srt == (
+        "1\n00:00:00,000 --> 00:00:02,500\nこんにちは\n\n"
+        "2\n00:01:02,250 --> 01:02:05,000\n長い話です\n\n"
+    )
+
+
+def test_vtt_cues(tmp_path):
+    vtt = _read(_write(tmp_path, ["vtt"])["vtt"])
+
+    assert vtt == (
+        "WEBVTT\n\n"
+        "00:00:00.000 --> 00:00:02.500\nこんにちは\n\n"
+        "00:01:02.250 --> 01:02:05.000\n長い話です\n\n"
+    )
+
+
+def test_abort_keeps_partial_output(tmp_path):
+    base = str(tmp_path / "a")
+    writer = TranscriptWriter(base, ["srt", "vtt"], audio_file="a.mp3", model="small")
+    writer.write_segments(SEGMENTS[:1])
+    writer.abort()
+
+    assert sorted(os.listdir(tmp_path)) == ["a.srt.part", "a.vtt.part"]
+    assert "こんにちは" in _read(base + ".srt.part")
+
+
+def test_abort_without_segments_leaves_nothing(tmp_path):
+    writer = TranscriptWriter(str(tmp_path / "a"), ["json"], audio_file="a.mp3")
+    writer.abort()
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="docx"):
+        TranscriptWriter(str(tmp_path / "a"), ["txt", "docx"])
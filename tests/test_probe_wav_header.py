@@ -0,0 +1,81 @@
+"""_probe_wav_header のテスト"""
+
+import struct
+
+from audio_processor import _probe_wav_header
+
+
+def _fmt_chunk(audio_format=1, channels=2, sample_rate=44100, bits=16):
+    block_align = channels * bits // 8
+    body = struct.pack("<HHIIHH", audio_format, channels, sample_rate,
+                       sample_rate * block_align, block_align, bits)
+    return b"fmt " + struct.pack("<I", len(body)) + body
+
+
+def _write_wav(path, chunks):
+    body = b"WAVE" + b"".join(chunks)
+    path.write_bytes(b"RIFF" + struct.pack("<I", len(body)) + body)
+    return str(path)
+
+
+def _data_chunk(size, declared=None):
+    declared = size if declared is None else declared
+    chunk = b"data" + struct.pack("<I", declared) + b"\0" * size
+    return chunk + (b"\0" if size & 1 else b"")
+
+
+def test_pcm_duration_and_format(tmp_path):
+    # 44.1kHz ステレオ 16bit の 2秒分
+    path = _write_wav(tmp_path / "a.wav", [_fmt_chunk(), _data_chunk(44100 * 4 * 2)])
+
+    info = _probe_wav_header(path)
+
+    assert info.duration == 2.0
+    assert info.sample_rate == 44100
+    assert info.channels == 2
+    assert info.codec == "pcm_16bit"
+    assert info.source == "wav_header"
+
+
+def test_skips_unknown_chunks_with_odd_size(tmp_path):
+    odd_list = b"LIST" + struct.pack("<I", 3) + b"abc\0"
+    path = _write_wav(tmp_path / "a.wav", [
+        odd_list,
+        _fmt_chunk(channels=1, sample_rate=16000),
+        _data_chunk(16000 * 2),
+    ])
+
+    info = _probe_wav_header(path)
+
+    assert info.duration == 1.0
+    assert info.channels == 1
+
+
+def test_float_format(tmp_path):
+    path = _write_wav(tmp_path / "a.wav", [
+        _fmt_chunk(audio_format=3, channels=1, sample_rate=8000, bits=32),
+        _data_chunk(8000 * 4),
+    ])
+
+    assert _probe_wav_header(path).codec == "pcm_float_32bit"
+
+
+def test_streamed_data_size_uses_file_size(tmp_path):
+    # ストリーミング書き出しではサイズが未確定のまま残る
+    path = _write_wav(tmp_path / "a.wav", [
+        _fmt_chunk(channels=1, sample_rate=16000),
+        _data_chunk(16000 * 2 * 3, declared=0xFFFFFFFF),
+    ])
+
+    assert _probe_wav_header(path).duration == 3.0
+
+
+def test_rejects_non_wav_and_missing_fmt(tmp_path):
+    mp3 = tmp_path / "a.mp3"
+    mp3.write_bytes(b"ID3\x03\x00" + b"\0" * 100)
+    no_fmt = _write_wav(tmp_path / "b.wav", [_data_chunk(100)])
+    truncated = _write_wav(tmp_path / "c.wav", [_fmt_chunk()])
+
+    assert _probe_wav_header(str(mp3)) is None
+    assert _probe_wav_header(no_fmt) is None
+    assert _probe_wav_header(truncated) is None
@@ -0,0 +1,90 @@
+"""ResultCache のテスト"""
+
+import gzip
+import json
+import os
+import random
+import string
+
+import pytest
+
+from result_cache import CACHE_VERSION, ResultCache, make_cache_key
+
+
+MB = 1024 * 1024
+
+
+def _result(seed):
+    # 圧縮後もほぼ同じ大きさになるよう乱数の文字列を使う
+    rng = random.Random(seed)
+    text = "".join(rng.choice(string.ascii_letters) for _ in range(20000))
+    return {"text": text, "segments": [{"start": 0.0, "end": 1.0, "text": text}]}
+
+
+def _set_mtime(cache, key, mtime):
+    os.utime(cache._path(key), (mtime, mtime))
+
+
+def _keys(cache):
+    return sorted(name[:-len(".json.gz")] for name in os.listdir(cache.cache_dir))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(str(tmp_path / "results"))
+
+
+def test_put_and_get_round_trip(cache):
+    cache.put("a", {"text": "こんにちは", "segments": [
+        {"id": 3, "start": 0.0, "end": 1.5, "text": "こんにちは", "tokens": [1, 2]},
+    ]}, duration=1.5)
+
+    entry = cache.get("a")
+
+    assert entry["text"] == "こんにちは"
+    assert entry["duration"] == 1.5
+    assert entry["segments"] == [{"id": 3, "start": 0.0, "end": 1.5, "text": "こんにちは"}]
+    assert cache.get("missing") is None
+
+
+def test_other_version_is_ignored(cache):
+    with gzip.open(cache._path("old"), "wt", encoding="utf-8") as f:
+        json.dump({"version": CACHE_VERSION + 1, "text": "", "segments": []}, f)
+
+    assert cache.get("old") is None
+
+
+def test_evicts_least_recently_used(cache):
+    cache.put("a", _result(1))
+    entry_size = os.path.getsize(cache._path("a"))
+    cache.max_size_mb = entry_size * 3.5 / MB
+    cache.put("b", _result(2))
+    cache.put("c", _result(3))
+    _set_mtime(cache, "a", 100)
+    _set_mtime(cache, "b", 200)
+    _set_mtime(cache, "c", 300)
+
+    # 読み込んだものは最近使ったものとして残る
+    assert cache.get("a") is not None
+    cache.put("d", _result(4))
+
+    assert _keys(cache) == ["a", "c", "d"]
+
+
+def test_keeps_newest_entry_over_the_limit(cache):
+    cache.max_size_mb = 1 / MB
+    cache.put("a", _result(1))
+    _set_mtime(cache, "a", 100)
+    cache.put("b", _result(2))
+
+    assert _keys(cache) == ["b"]
+
+
+def test_cache_key_depends_on_every_input():
+    base = make_cache_key("hash", "small", "ja", {"vad": False})
+
+    assert base == make_cache_key("hash", "small", "ja", {"vad": False})
+    assert base != make_cache_key("other", "small", "ja", {"vad": False})
+    assert base != make_cache_key("hash", "medium", "ja", {"vad": False})
+    assert base != make_cache_key("hash", "small", "en", {"vad": False})
+    assert base != make_cache_key("hash", "small", "ja", {"vad": True})
@@ -0,0 +1,97 @@
+"""stream_audio_chunks と split_audio_array が同じチャンクを返すことのテスト"""
+
+import sys
+
+import numpy as np
+import pytest
+
+import audio_processor
+from audio_processor import SAMPLE_RATE, split_audio_array, stream_audio_chunks
+
+
+# 3秒のチャンク
+CHUNK_MINUTES = 0.05
+
+
+def _speech_like_pcm(seconds, seed=0):
+    """1〜2秒の音と0.5〜1秒の無音を交互に並べた int16 の音声"""
+    rng = np.random.default_rng(seed)
+    parts = []
+    total = 0
+    while total < seconds * SAMPLE_RATE:
+        voiced = int(rng.uniform(1, 2) * SAMPLE_RATE)
+        silent = int(rng.uniform(0.5, 1) * SAMPLE_RATE)
+        parts.append(rng.normal(0, 4000, voiced))
+        parts.append(rng.normal(0, 5, silent))
+        total += voiced + silent
+    pcm = np.concatenate(parts)[:int(seconds * SAMPLE_RATE)]
+    return np.clip(pcm, -32768, 32767).astype(np.int16)
+
+
+@pytest.fixture
+def pcm_source(monkeypatch):
+    """ffmpegの代わりに int16 の配列を chunk_samples ずつ渡す"""
+    def use(pcm):
+        def fake_iter(audio_file, chunk_samples):
+            data = pcm.tobytes()
+            step = chunk_samples * 2
+            for i in range(0, len(data), step):
+                yield data[i:i + step]
+        monkeypatch.setattr(audio_processor, "_iter_pcm_chunks", fake_iter)
+        return pcm.astype(np.float32) / 32768.0
+    return use
+
+
+@pytest.mark.parametrize("cut_at_pauses", [False, True])
+@pytest.mark.parametrize("overlap_seconds", [0, 0.5])
+def test_stream_matches_array(pcm_source, cut_at_pauses, overlap_seconds):
+    # 最後のチャンクがちょうどチャンク長にならない長さにする
+    audio = pcm_source(_speech_like_pcm(20.3))
+
+    expected = split_audio_array(audio, CHUNK_MINUTES, cut_at_pauses=cut_at_pauses,
+                                 overlap_seconds=overlap_seconds)
+    streamed = list(stream_audio_chunks("dummy.wav", CHUNK_MINUTES,
+                                        cut_at_pauses=cut_at_pauses,
+                                        overlap_seconds=overlap_seconds))
+
+    assert len(streamed) == len(expected) > 1
+    for got, want in zip(streamed, expected):
+        assert got.start == pytest.approx(want.start)
+        assert got.end == pytest.approx(want.end)
+        np.testing.assert_array_equal(got.audio, want.audio)
+
+
+def test_chunks_cover_the_whole_audio(pcm_source):
+    audio = pcm_source(_speech_like_pcm(10))
+
+    chunks = list(stream_audio_chunks("dummy.wav", CHUNK_MINUTES, overlap_seconds=0.5))
+
+    assert chunks[0].start == 0
+    assert chunks[-1].end == pytest.approx(len(audio) / SAMPLE_RATE)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk.start == pytest.approx(previous.end - 0.5)
+
+
+def test_short_audio_is_one_chunk(pcm_source):
+    audio = pcm_source(_speech_like_pcm(1))
+
+    chunks = list(stream_audio_chunks("dummy.wav", CHUNK_MINUTES))
+
+    assert len(chunks) == 1
+    np.testing.assert_array_equal(chunks[0].audio, audio)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="シェルスクリプトでffmpegを置き換える")
+def test_ffmpeg_failure_after_partial_output_raises(tmp_path, monkeypatch):
+    ffmpeg = tmp_path / "ffmpeg"
+    ffmpeg.write_text(
+        "#!/bin/sh\n"
+        "head -c 64000 /dev/zero\n"
+        "echo 'Invalid data found when processing input' >&2\n"
+        "exit 1\n"
+    )
+    ffmpeg.chmod(0o755)
+    monkeypatch.setattr(audio_processor, "get_ffmpeg_path", lambda: str(ffmpeg))
+
+    with pytest.raises(RuntimeError, match="Invalid data"):
+        list(audio_processor._iter_pcm_chunks("broken.mp3", SAMPLE_RATE))
@@ -0,0 +1,128 @@
+"""TranscriptSearchIndex のテスト"""
+
+import os
+import sqlite3
+
+import pytest
+
+from output_writers import TranscriptWriter
+from transcript_search import TranscriptSearchIndex, format_ms
+
+
+SEGMENTS = [
+    {"start": 0.0, "end": 2.0, "text": "本日の会議を始めます"},
+    {"start": 2.0, "end": 4.5, "text": "議題は予算です"},
+    {"start": 4.5, "end": 6.0, "text": "Budget is 100% approved"},
+    {"start": 6.0, "end": 7.0, "text": "了解"},
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = TranscriptSearchIndex(str(tmp_path / "transcripts.db"))
+    index.add_transcript(str(tmp_path / "a.txt"), "a.mp3", "small", SEGMENTS, duration=7.0)
+    index.add_transcript(str(tmp_path / "b.txt"), "b.mp3", "tiny",
+                         [{"start": 1.0, "end": 2.0, "text": "別の会議"}])
+    yield index
+    index.close()
+
+
+def texts(hits):
+    return [hit.text for hit in hits]
+
+
+def test_long_query_uses_full_text_search(index):
+    if not index.fts_enabled:
+        pytest.skip("この SQLite では trigram トークナイザーが使えない")
+
+    hits = index.search("会議を始")
+
+    assert texts(hits) == ["本日の会議を始めます"]
+    assert hits[0].audio_file == "a.mp3"
+    assert hits[0].model == "small"
+    assert (hits[0].start_ms, hits[0].end_ms) == (0, 2000)
+
+
+@pytest.mark.parametrize("fts_enabled", [True, False])
+def test_short_queries(index, fts_enabled):
+    index.fts_enabled = index.fts_enabled and fts_enabled
+
+    assert texts(index.search("会議")) == ["本日の会議を始めます", "別の会議"]
+    assert texts(index.search("議")) == ["本日の会議を始めます", "議題は予算です", "別の会議"]
+    assert texts(index.search("了解")) == ["了解"]
+    assert texts(index.search("解")) == ["了解"]
+    assert texts(index.search("な")) == []
+
+
+def test_like_search_without_fts(index):
+    index.fts_enabled = False
+
+    assert texts(index.search("予算です")) == ["議題は予算です"]
+    # 英字の大文字・小文字を区別せず、% や _ は文字として扱う
+    assert texts(index.search("BUDGET")) == ["Budget is 100% approved"]
+    assert texts(index.search("0%")) == ["Budget is 100% approved"]
+    assert texts(index.search("_")) == []
+
+
+def test_paging_and_empty_query(index):
+    assert index.search("   ") == []
+    assert len(index.search("議", limit=2)) == 2
+    assert texts(index.search("議", limit=2, offset=2)) == ["別の会議"]
+
+
+def test_replace_and_remove(tmp_path, index):
+    path = str(tmp_path / "a.txt")
+    index.add_transcript(path, "a.mp3", "medium", [{"start": 0, "end": 1, "text": "新しい会議"}])
+
+    assert texts(index.search("会議")) == ["新しい会議", "別の会議"]
+    assert index.stats()["transcripts"] == 2
+
+    index.remove(path)
+
+    assert texts(index.search("会議")) == ["別の会議"]
+    assert index.stats()["segments"] == 1
+
+
+def test_bigram_index_is_built_for_existing_database(tmp_path):
+    db_path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE transcripts (
+            id INTEGER PRIMARY KEY, output_file TEXT NOT NULL UNIQUE, audio_file TEXT,
+            model TEXT, duration REAL, indexed_at REAL, file_size INTEGER, file_mtime REAL
+        );
+        CREATE TABLE segments (
+            id INTEGER PRIMARY KEY, transcript_id INTEGER NOT NULL, start_ms INTEGER NOT NULL,
+            end_ms INTEGER NOT NULL, text TEXT NOT NULL
+        );
+        INSERT INTO transcripts (id, output_file) VALUES (1, '/old.txt');
+        INSERT INTO segments VALUES (1, 1, 0, 1000, '以前の会議');
+    """)
+    conn.commit()
+    conn.close()
+
+    index = TranscriptSearchIndex(db_path)
+
+    assert texts(index.search("会議")) == ["以前の会議"]
+    index.close()
+
+
+def test_import_text_file(tmp_path, index):
+    writer = TranscriptWriter(str(tmp_path / "c_文字起こし"), ["txt"],
+                              audio_file="c.mp3", model="base")
+    writer.write_segments([{"start": 75, "end": 80, "text": "取り込んだ会議"}])
+    (path,) = writer.finish({"text": "取り込んだ会議", "segments": []})
+
+    assert index.import_text_file(path) == 1
+    # 内容が変わっていなければ読み直さない
+    assert index.import_text_file(path) is None
+    assert index.import_folder(str(tmp_path)) == 0
+
+    (hit,) = [h for h in index.search("会議") if h.audio_file == "c.mp3"]
+    assert hit.model == "base"
+    assert (hit.start_ms, hit.end_ms) == (75000, 80000)
+    assert hit.output_file == os.path.abspath(path)
+
+
+def test_format_ms():
+    assert format_ms(3723004) == "1:02:03.004"
@@ -0,0 +1,87 @@
+"""TranscriptIndex のテスト"""
+
+import pytest
+
+from output_writers import TranscriptWriter
+from transcript_viewer import TranscriptIndex, parse_segment_start
+
+
+def _transcript(tmp_path, count):
+    """10秒ごとのセグメントを count 個持つテキスト形式の出力"""
+    segments = [{"start": i * 10, "end": i * 10 + 8, "text": f"発話{i}"} for i in range(count)]
+    writer = TranscriptWriter(str(tmp_path / "a_文字起こし"), ["txt"],
+                              audio_file="a.mp3", model="small")
+    writer.write_segments(segments)
+    (path,) = writer.finish({"text": "本文", "segments": segments}, duration=count * 10)
+    return path
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = TranscriptIndex(_transcript(tmp_path, 250))
+    yield index
+    index.close()
+
+
+def test_rows_start_at_segment_list(index):
+    assert len(index) == 250
+    assert index.rows(0, 2) == ["[00:00 - 00:08] 発話0", "[00:10 - 00:18] 発話1"]
+    assert index.rows(249, 10) == ["[41:30 - 41:38] 発話249"]
+
+
+def test_paging_clamps_to_range(index):
+    assert index.page_count(100) == 3
+
+    number, rows = index.page(1, 100)
+    assert number == 1
+    assert rows[0].endswith("発話100")
+    assert len(rows) == 100
+
+    number, rows = index.page(99, 100)
+    assert number == 2
+    assert len(rows) == 50
+
+    assert index.page(-1, 100)[0] == 0
+
+
+def test_find_time(index):
+    assert index.find_time(0) == 0
+    # 時刻を含むセグメントがなければ直後のもの
+    assert index.find_time(15) == 2
+    assert index.find_time(20) == 2
+    assert index.find_time(10 ** 6) == 249
+
+
+def test_refresh_after_rewrite(tmp_path):
+    path = _transcript(tmp_path, 3)
+    index = TranscriptIndex(path)
+    assert len(index) == 3
+    index.close()
+
+    _transcript(tmp_path, 5)
+    index.refresh()
+
+    assert len(index) == 5
+    index.close()
+
+
+def test_plain_file_without_header(tmp_path):
+    path = tmp_path / "plain.txt"
+    path.write_text("1行目\n2行目\n3行目", encoding="utf-8")
+    empty = tmp_path / "empty.txt"
+    empty.write_text("")
+
+    index = TranscriptIndex(str(path))
+    empty_index = TranscriptIndex(str(empty))
+
+    assert index.rows(0, 10) == ["1行目", "2行目", "3行目"]
+    assert len(empty_index) == 0
+    assert empty_index.page_count() == 1
+    assert empty_index.find_time(10) == 0
+    index.close()
+    empty_index.close()
+
+
+def test_parse_segment_start():
+    assert parse_segment_start("[61:05 - 61:10] text") == 61 * 60 + 5
+    assert parse_segment_start("本文") is None
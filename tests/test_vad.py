@@ -0,0 +1,99 @@
+"""detect_speech_regions / skip_silent_regions / chunk_time_to_source のテスト"""
+
+import numpy as np
+import pytest
+
+from audio_processor import (
+    SAMPLE_RATE,
+    AudioChunk,
+    chunk_time_to_source,
+    detect_speech_regions,
+    skip_silent_regions,
+)
+
+
+def _audio(*parts):
+    """(秒, 音があるか) の並びから音声を作る"""
+    rng = np.random.default_rng(0)
+    return np.concatenate([
+        (rng.normal(0, 0.2 if voiced else 0.0001, int(seconds * SAMPLE_RATE)))
+        for seconds, voiced in parts
+    ]).astype(np.float32)
+
+
+def _seconds(regions):
+    return [(start / SAMPLE_RATE, end / SAMPLE_RATE) for start, end in regions]
+
+
+def test_detects_speech_with_padding():
+    audio = _audio((3, False), (2, True), (4, False), (1, True), (3, False))
+
+    regions = _seconds(detect_speech_regions(audio, padding_seconds=0.3))
+
+    assert len(regions) == 2
+    assert regions[0] == pytest.approx((2.7, 5.3), abs=0.05)
+    assert regions[1] == pytest.approx((8.7, 10.3), abs=0.05)
+
+
+def test_short_pauses_are_merged():
+    audio = _audio((2, False), (1, True), (1, False), (1, True), (2, False))
+
+    regions = _seconds(detect_speech_regions(audio, min_silence_seconds=2.0,
+                                             padding_seconds=0))
+
+    assert regions == [pytest.approx((2.0, 5.0), abs=0.05)]
+
+
+def test_clicks_are_ignored():
+    audio = _audio((2, False), (0.06, True), (3, False), (1, True), (2, False))
+
+    regions = _seconds(detect_speech_regions(audio, padding_seconds=0))
+
+    assert regions == [pytest.approx((5.06, 6.06), abs=0.05)]
+
+
+def test_silence_only_and_empty():
+    assert detect_speech_regions(_audio((5, False)), threshold_db=-40) == []
+    assert detect_speech_regions(np.zeros(0, dtype=np.float32)) == []
+
+
+def test_skip_silent_regions_builds_timeline():
+    audio = _audio((3, False), (2, True), (4, False), (1, True), (3, False))
+    chunk = AudioChunk(audio, 60.0, 60.0 + len(audio) / SAMPLE_RATE)
+
+    (speech,) = skip_silent_regions([chunk])
+
+    # 2つの発話区間（余白込みで2.6秒と1.6秒）を連結する
+    assert len(speech.audio) / SAMPLE_RATE == pytest.approx(4.2, abs=0.1)
+    assert speech.start == pytest.approx(62.7, abs=0.05)
+    assert speech.end == pytest.approx(70.3, abs=0.05)
+    assert speech.timeline[0] == (0.0, speech.start)
+    assert speech.timeline[1][1] == pytest.approx(68.7, abs=0.05)
+
+
+def test_skip_silent_regions_drops_silent_chunks():
+    silent = AudioChunk(_audio((5, False)), 0.0, 5.0)
+    voiced = AudioChunk(_audio((1, False), (2, True), (1, False)), 5.0, 9.0)
+
+    chunks = list(skip_silent_regions([silent, voiced]))
+
+    assert len(chunks) == 1
+    assert chunks[0].timeline is None
+    assert chunks[0].start == pytest.approx(5.7, abs=0.05)
+
+
+def test_chunk_time_to_source_without_timeline():
+    chunk = AudioChunk(None, 30.0, 60.0)
+
+    assert chunk_time_to_source(chunk, 12.5) == 42.5
+
+
+def test_chunk_time_to_source_across_joins():
+    # チャンク内の 0〜2秒は元の 10〜12秒、2秒以降は元の 20秒以降
+    chunk = AudioChunk(None, 10.0, 25.0, [(0.0, 10.0), (2.0, 20.0)])
+
+    assert chunk_time_to_source(chunk, 1.0) == 11.0
+    assert chunk_time_to_source(chunk, 3.5) == 21.5
+    # 連結位置ちょうどは、開始時刻なら後の区間、終了時刻なら前の区間
+    assert chunk_time_to_source(chunk, 2.0) == 20.0
+    assert chunk_time_to_source(chunk, 2.0, is_end=True) == 12.0
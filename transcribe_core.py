@@ -4,27 +4,241 @@ Whisperを使用した音声文字起こし機能を提供
 """
 
 import os
+import math
+import time
+import difflib
+import threading
 from datetime import timedelta
 from audio_processor import (
-    get_audio_duration,
+    SAMPLE_RATE,
+    AudioChunk,
+    probe_audio,
+    decode_audio,
+    decode_audio_head,
+    find_speech_window,
+    split_audio_array,
+    stream_audio_chunks,
     split_audio_file,
+    load_chunk_audio,
+    skip_silent_regions,
+    chunk_time_to_source,
     format_time,
     get_file_size_mb,
     cleanup_temp_files
 )
+from model_registry import get_model_registry
+from result_cache import ResultCache, hash_audio_file, make_cache_key
+from job_journal import JobJournal
+from parallel_transcriber import ParallelChunkTranscriber
+from output_writers import DEFAULT_OUTPUT_FORMATS, TranscriptWriter
+from transcript_search import get_search_index
+from metrics import ProgressReporter, emit_event, stage, peak_rss_mb
+from quantization import QUANTIZED_DEVICE, load_quantized_model, model_label
+from autotune import DEFAULT_CHUNK_LENGTH_MINUTES, load_profile, storable_chunk_minutes
+from model_selection import DeadlineTracker, choose_model, get_speed_store
+from language_detection import (
+    AUTO_LANGUAGE,
+    DEFAULT_LANGUAGE,
+    LANGUAGE_POLICIES,
+    LANGUAGE_SAMPLE_SECONDS,
+    LANGUAGE_SCAN_SECONDS,
+    detect_language,
+    detect_chunk_language,
+    get_language_cache
+)
+
+
+# この長さを超える音声は全体をデコードせず、チャンクごとに逐次読み込む
+STREAMING_THRESHOLD_SECONDS = 2 * 60 * 60
+
+# 重複区間のセグメントを同一とみなすテキストの一致率
+DUPLICATE_TEXT_RATIO = 0.6
+
+# チャンクの端からこの秒数以内に接するセグメントは途中で切れている可能性がある
+CHUNK_EDGE_SECONDS = 0.5
+
+
+def _text_containment(a, b):
+    """短い方のテキストが長い方にどれだけ含まれるか（0.0〜1.0）"""
+    a = a.strip()
+    b = b.strip()
+    if not a or not b:
+        return 0.0
+    matcher = difflib.SequenceMatcher(None, a, b, autojunk=False)
+    matched = sum(block.size for block in matcher.get_matching_blocks())
+    return matched / min(len(a), len(b))
+
+
+def _pick_duplicate(seg, cand, overlap_start, overlap_end, seam):
+    """
+    同一の発話とみなした2つのセグメントのうち残す方を選ぶ
+
+    Args:
+        seg: 前のチャンクのセグメント
+        cand: 新しいチャンクのセグメント
+    """
+    prev_text = seg["text"].strip()
+    cand_text = cand["text"].strip()
+    if len(prev_text) > len(cand_text) * 1.2:
+        return seg
+    if len(cand_text) > len(prev_text) * 1.2:
+        return cand
+
+    # 長さが近くても、一方がもう一方を含んでいれば含んでいる方が途切れていない
+    if prev_text != cand_text:
+        if cand_text in prev_text:
+            return seg
+        if prev_text in cand_text:
+            return cand
+
+    # チャンクの端に接している方は途中で切れている可能性がある
+    prev_cut = seg["end"] >= overlap_end - CHUNK_EDGE_SECONDS
+    cand_cut = cand["start"] <= overlap_start + CHUNK_EDGE_SECONDS
+    if prev_cut != cand_cut:
+        return cand if prev_cut else seg
+
+    return seg if (seg["start"] + seg["end"]) / 2 < seam else cand
+
+
+def merge_overlapping_segments(previous, incoming, overlap_start, overlap_end):
+    """
+    重複区間を共有する2つのチャンクのセグメントを統合
+
+    重複区間で時刻が重なり、テキストもほぼ一致するセグメントは同一の発話とみなし、
+    途切れていない方を残す（テキストが長い方、もう一方のテキストを含む方、
+    チャンクの端に接していない方の順に判断し、決まらなければ重複区間の中央に近い側の
+    チャンクのもの）。一致しないセグメントは重複区間の中央より前なら
+    前のチャンク、後なら新しいチャンクのものを採用する。
+
+    Args:
+        previous: 確定済みのセグメント（時刻順、元の時間軸）
+        incoming: 新しいチャンクのセグメント（時刻順、元の時間軸）
+        overlap_start: 重複区間の開始（新しいチャンクの開始, 秒）
+        overlap_end: 重複区間の終了（前のチャンクの終了, 秒）
+
+    Returns:
+        統合後のセグメントのリスト
+    """
+    if overlap_end <= overlap_start:
+        return previous + incoming
+
+    seam = (overlap_start + overlap_end) / 2
+
+    split = len(previous)
+    while split > 0 and previous[split - 1]["end"] > overlap_start:
+        split -= 1
+    head, tail = previous[:split], previous[split:]
+
+    inc_split = 0
+    while inc_split < len(incoming) and incoming[inc_split]["start"] < overlap_end:
+        inc_split += 1
+    inc_head, inc_rest = incoming[:inc_split], incoming[inc_split:]
+
+    merged = []
+    matched = set()
+    for seg in tail:
+        match = None
+        for j, cand in enumerate(inc_head):
+            if j in matched:
+                continue
+            if min(seg["end"], cand["end"]) <= max(seg["start"], cand["start"]):
+                continue
+            if _text_containment(seg["text"], cand["text"]) >= DUPLICATE_TEXT_RATIO:
+                match = j
+                break
+
+        if match is None:
+            if seg["start"] < seam:
+                merged.append(seg)
+            continue
+
+        matched.add(match)
+        merged.append(_pick_duplicate(seg, inc_head[match], overlap_start, overlap_end, seam))
+
+    for j, cand in enumerate(inc_head):
+        if j not in matched and cand["start"] >= seam:
+            merged.append(cand)
+
+    merged.sort(key=lambda seg: seg["start"])
+    return head + merged + inc_rest
 
 
 class TranscribeEngine:
     """文字起こしエンジンクラス"""
 
-    def __init__(self, model_name="medium"):
+    def __init__(self, model_name="medium", workers=None, torch_threads=None,
+                 result_cache=None, search_index=None, quantize=False, use_profile=True):
         """
         Args:
             model_name: Whisperモデル名 (tiny, base, small, medium, large)
+            workers: チャンクを並列処理するワーカープロセス数
+                     （1=並列化しない、None=自動調整の結果または1）
+            torch_threads: torchのスレッド数（並列時はワーカーごと、
+                           None=自動調整の結果またはtorchの既定）
+            result_cache: 結果キャッシュ（None=既定の保存先を使用）
+            search_index: 結果を登録する検索インデックス（None=既定の保存先を使用）
+            quantize: Linear層をint8に動的量子化したモデルをCPUで使うか
+            use_profile: autotune.py で保存した設定を既定値に使うか
         """
         self.model_name = model_name
+        self.quantize = quantize
+        self.use_profile = use_profile
+        self._requested_workers = workers
+        self._requested_torch_threads = torch_threads
+        self._apply_profile()
         self.model = None
         self.whisper = None
+        self._parallel = None
+        self._ready = threading.Event()
+        self._preload_thread = None
+        self.load_error = None
+        self.result_cache = result_cache
+        self.search_index = search_index
+        self.last_result = None
+        self.last_output_files = []
+        self.last_duration = None
+        self.last_cached = False
+        self.last_transcribe_seconds = None
+
+    def _apply_profile(self):
+        """モデルと精度に合った自動調整の設定を読み込み、指定のない値に使う"""
+        self.profile = (load_profile(self.model_name, self.precision)
+                        if self.use_profile else None)
+        profile = self.profile or {}
+        workers = self._requested_workers
+        if workers is None:
+            workers = profile.get("workers", 1)
+        torch_threads = self._requested_torch_threads
+        if torch_threads is None:
+            torch_threads = profile.get("torch_threads")
+        self.workers = max(1, workers)
+        self.torch_threads = torch_threads
+
+    @property
+    def precision(self):
+        """モデルの重みの精度"""
+        return "int8" if self.quantize else "fp32"
+
+    @property
+    def model_label(self):
+        """出力や検索インデックスに記録するモデル名"""
+        return model_label(self.model_name, self.quantize)
+
+    def default_chunk_length_minutes(self, vad=False, overlap_seconds=0):
+        """
+        チャンク長を指定しない場合の長さ（分）
+
+        自動調整で保存した短いチャンク長は、重複やVADで境界を補うジョブにだけ使う。
+        """
+        chunk_minutes = (self.profile or {}).get("chunk_length_minutes")
+        if chunk_minutes is None or not storable_chunk_minutes(chunk_minutes, vad,
+                                                               overlap_seconds):
+            return DEFAULT_CHUNK_LENGTH_MINUTES
+        return chunk_minutes
+
+    def _model_device(self):
+        """モデルを配置するデバイス（None=自動）"""
+        return QUANTIZED_DEVICE if self.quantize else None
 
     def load_model(self, progress_callback=None):
         """Whisperモデルを読み込み"""
@@ -32,13 +246,28 @@ class TranscribeEngine:
             import whisper
             self.whisper = whisper
 
-            if progress_callback:
-                progress_callback(f"Whisperモデル「{self.model_name}」を読み込んでいます...")
+            if self.torch_threads:
+                import torch
+                torch.set_num_threads(self.torch_threads)
 
-            self.model = whisper.load_model(self.model_name)
+            # 読み込み済みのモデルはプロセス全体で共有する
+            registry = get_model_registry()
+            device = self._model_device()
+            if registry.is_loaded(self.model_name, device, self.precision):
+                self.model = registry.get(self.model_name, device, precision=self.precision)
+                emit_event(progress_callback, "stage_end", stage="model_load",
+                           model=self.model_label, cached=True, wall_seconds=0.0, ok=True)
+                return True, "読み込み済みのモデルを使用"
 
-            if progress_callback:
-                progress_callback("✓ モデルの読み込みが完了しました")
+            with stage(progress_callback, "model_load", model=self.model_label) as info:
+                info["cached"] = False
+                self.model = registry.get(
+                    self.model_name,
+                    device,
+                    loader=load_quantized_model if self.quantize else None,
+                    precision=self.precision
+                )
+            get_speed_store().record_load(self.model_label, info["wall_seconds"])
 
             return True, "モデルの読み込みに成功"
 
@@ -53,8 +282,124 @@ class TranscribeEngine:
                 progress_callback(f"❌ {error_msg}")
             return False, error_msg
 
+    def warm_up(self):
+        """
+        短い無音で一度推論し、初回のカーネル初期化やメモリ確保を済ませる
+
+        同じモデルはプロセス内で一度だけ実行する。並列処理時はチャンクを処理する
+        ワーカープロセスを起動し、それぞれのモデルで実行する。
+        """
+        if self.workers > 1:
+            self._get_parallel().warm_up(self._decode_options())
+            return
+
+        registry = get_model_registry()
+        device = self._model_device()
+        if self.model is None or registry.is_warm(self.model_name, device, self.precision):
+            return
+
+        import numpy as np
+        silence = np.zeros(SAMPLE_RATE, dtype=np.float32)
+        self.model.transcribe(silence, **self._decode_options())
+        registry.mark_warm(self.model_name, device, self.precision)
+
+    def preload(self, progress_callback=None, on_ready=None):
+        """
+        バックグラウンドでモデルの読み込みとウォームアップを行う
+
+        Args:
+            progress_callback: 進捗コールバック関数
+            on_ready: 完了時に (success, message) で呼ばれる関数
+
+        Returns:
+            読み込みを行うスレッド
+        """
+        if self._preload_thread is not None:
+            return self._preload_thread
+
+        def run():
+            if self.workers > 1:
+                # チャンクはワーカーが処理するため、メインプロセスにはモデルを読み込まない
+                try:
+                    self.warm_up()
+                    success, message = True, "ワーカーの準備が完了"
+                except Exception as e:
+                    success, message = False, f"ワーカーの準備に失敗: {e}"
+                    if progress_callback:
+                        progress_callback(f"❌ {message}")
+                if success:
+                    self._ready.set()
+                else:
+                    self.load_error = message
+                if on_ready:
+                    on_ready(success, message)
+                return
+
+            success, message = self.load_model(progress_callback)
+            if success:
+                try:
+                    self.warm_up()
+                except Exception as e:
+                    # ウォームアップの失敗は文字起こしには影響しない
+                    print(f"⚠ ウォームアップに失敗: {e}")
+                self._ready.set()
+            else:
+                self.load_error = message
+            if on_ready:
+                on_ready(success, message)
+
+        self._preload_thread = threading.Thread(target=run, daemon=True)
+        self._preload_thread.start()
+        return self._preload_thread
+
+    def is_ready(self):
+        """モデルの読み込みとウォームアップが完了しているか"""
+        return self._ready.is_set()
+
+    def wait_until_ready(self, timeout=None):
+        """モデルの準備が完了するまで待つ"""
+        return self._ready.wait(timeout)
+
+    def switch_model(self, model_name):
+        """
+        使用するモデルを切り替える（読み込みは次の load_model で行う）
+
+        チャンク長・スレッド数・ワーカー数は切り替え先のモデルの自動調整の設定に合わせる。
+        """
+        if model_name == self.model_name:
+            return
+        self.close()
+        self.model_name = model_name
+        self._apply_profile()
+
+    def close(self):
+        """並列処理用のワーカープロセスを終了し、モデルへの参照を手放す"""
+        # 準備中のモデルやワーカーが閉じた後に読み込まれないよう完了を待つ
+        if self._preload_thread is not None and self._preload_thread.is_alive():
+            self._preload_thread.join()
+        self._preload_thread = None
+        if self._parallel is not None:
+            self._parallel.close()
+            self._parallel = None
+        # 読み込み済みのモデルはモデルレジストリの上限に従って解放される
+        self.model = None
+        self._ready.clear()
+
+    def _decode_options(self, language=DEFAULT_LANGUAGE):
+        """model.transcribe に渡すオプション"""
+        return {
+            "language": language,
+            "verbose": False,
+            "fp16": False,
+            "condition_on_previous_text": True,
+        }
+
     def transcribe(self, audio_file, output_dir=None, use_chunking=None,
-                   chunk_length_minutes=30, progress_callback=None):
+                   chunk_length_minutes=None, progress_callback=None,
+                   streaming=None, spill_to_disk=False, vad=False,
+                   overlap_seconds=0, use_cache=True, segment_callback=None,
+                   output_formats=None, event_callback=None, deadline_seconds=None,
+                   language=DEFAULT_LANGUAGE, language_policy="file"):
         """
         音声ファイルを文字起こし
 
@@ -62,100 +407,416 @@ class TranscribeEngine:
             audio_file: 音声ファイルパス
             output_dir: 出力ディレクトリ（Noneの場合はデスクトップ）
             use_chunking: チャンク処理を使用するか（None=自動判定）
-            chunk_length_minutes: チャンクの長さ（分）
+            chunk_length_minutes: チャンクの長さ（分、None=自動調整の結果または30）
             progress_callback: 進捗コールバック関数
+            streaming: チャンクを逐次読み込むか（None=長さで自動判定）
+            spill_to_disk: チャンクを一時ディレクトリに書き出してから処理するか
+            vad: 分割位置を無音に合わせ、無音区間を文字起こしから除外するか
+            overlap_seconds: 隣り合うチャンクで重複させる長さ（秒）
+            use_cache: 結果キャッシュを使うか（False=再実行して結果を上書き）
+            segment_callback: 確定したセグメントのリストを受け取る関数
+                              （チャンクが完了するたびに時刻順で呼ばれる）
+            output_formats: 出力形式のリスト（None=txtのみ）。
+                            複数指定すると同時に書き出す
+            event_callback: 計測イベント（辞書）を受け取る関数。
+                            イベントは get_metrics() の集計にも記録される
+            deadline_seconds: この秒数以内に終わる最も精度の高いモデルを選ぶ
+                              （None=選択中のモデルを使う）。処理中に遅れた場合は
+                              残りのチャンクを速いモデルに切り替える
+            language: 言語コード（"auto"=音声の一部から一度だけ判定し、
+                      すべてのチャンクで使う。判定結果はファイルごとに保存する）
+            language_policy: "auto" の場合の判定方法
+                             （"chunk"=チャンクごとに判定し直す、複数言語の録音向け）
 
         Returns:
-            (success, message, output_file) のタプル
+            (success, message, output_file) のタプル。
+            output_file は最初の形式のファイル（すべては last_output_files）
         """
+        if language_policy not in LANGUAGE_POLICIES:
+            raise ValueError(f"未対応の言語の判定方法: {language_policy}")
+
+        reporter = ProgressReporter(
+            progress_callback,
+            event_callback,
+            audio_file=audio_file,
+            model=self.model_label
+        )
+        reporter.emit("job_start")
+        started = time.perf_counter()
+
+        # 期限に合わせて選んだモデルはこのジョブだけに使い、終わったら元のモデルに戻す
+        original_model = self.model_name
+        try:
+            tracker = None
+            if deadline_seconds is not None and os.path.exists(audio_file):
+                tracker = self._plan_deadline(audio_file, deadline_seconds, reporter)
+
+            # 期限に合わせてモデルを選んだ場合はそのモデルの設定を使う
+            if chunk_length_minutes is None:
+                chunk_length_minutes = self.default_chunk_length_minutes(vad, overlap_seconds)
+
+            success, message, output_file = self._run_transcribe(
+                audio_file, output_dir, use_chunking, chunk_length_minutes, reporter,
+                streaming, spill_to_disk, vad, overlap_seconds, use_cache,
+                segment_callback, output_formats, tracker, language, language_policy
+            )
+
+            wall = time.perf_counter() - started
+            cached = success and self.last_cached
+            comparable = self.workers == 1 and not vad
+            if success and not cached and comparable and not (tracker and tracker.downgraded):
+                # 期限を指定したモデル選択に使う（読み込み時間は record_load で別に記録する）。
+                # 並列処理やVADで無音を除いた処理は1プロセスの速度と比べられないため記録しない
+                get_speed_store().record(
+                    self.model_label, self.last_duration, self.last_transcribe_seconds
+                )
+            reporter.emit(
+                "job_end",
+                success=success,
+                cached=cached,
+                wall_seconds=wall,
+                audio_seconds=self.last_duration,
+                realtime_factor=(self.last_duration / wall
+                                 if success and not cached and self.last_duration and wall > 0
+                                 else None),
+                peak_rss_mb=peak_rss_mb(),
+                message=message
+            )
+        finally:
+            self.switch_model(original_model)
+        return success, message, output_file
+
+    def _plan_deadline(self, audio_file, deadline_seconds, progress_callback):
+        """
+        期限までに終わる最も精度の高いモデルに切り替える（transcribe の終了時に元に戻す）
+
+        Returns:
+            処理中の遅れを判断する DeadlineTracker（音声の長さが分からない場合は None）
+        """
+        info = probe_audio(audio_file)
+        if not info or not info.duration:
+            progress_callback("⚠ 音声の長さが分からないため、選択中のモデルで処理します")
+            return None
+
+        registry = get_model_registry()
+        device = self._model_device()
+        deadline_at = time.time() + deadline_seconds
+        model_name, estimates, on_time = choose_model(
+            info.duration,
+            deadline_seconds,
+            self.quantize,
+            is_loaded=lambda name: registry.is_loaded(name, device, self.precision)
+        )
+        self.switch_model(model_name)
+        progress_callback.context["model"] = self.model_label
+        emit_event(
+            progress_callback,
+            "model_selected",
+            model=self.model_label,
+            deadline_seconds=deadline_seconds,
+            estimated_seconds=estimates[model_name],
+            estimates=estimates,
+            on_time=on_time
+        )
+        return DeadlineTracker(deadline_at, info.duration, model_name, self.quantize)
+
+    def _run_transcribe(self, audio_file, output_dir, use_chunking, chunk_length_minutes,
+                        progress_callback, streaming, spill_to_disk, vad, overlap_seconds,
+                        use_cache, segment_callback, output_formats, deadline_tracker=None,
+                        language=DEFAULT_LANGUAGE, language_policy="file"):
+        """transcribe の本体（progress_callback は ProgressReporter）"""
+        self.last_result = None
+        self.last_output_files = []
+        self.last_duration = None
+        self.last_cached = False
+        self.last_transcribe_seconds = None
 
         # ファイル存在確認
         if not os.path.exists(audio_file):
             return False, f"ファイルが見つかりません: {audio_file}", None
 
-        # モデルロード
-        if self.model is None:
-            success, message = self.load_model(progress_callback)
-            if not success:
-                return False, message, None
-
         # ファイル情報表示
         file_size = get_file_size_mb(audio_file)
         if progress_callback:
             progress_callback(f"✓ 音声ファイル: {os.path.basename(audio_file)}")
             progress_callback(f"  ファイルサイズ: {file_size:.2f} MB")
 
-        # 音声の長さを取得
-        duration = get_audio_duration(audio_file)
+        # 音声の長さを取得（コンテナのメタ情報のみ読み、デコードはしない）
+        audio_info = probe_audio(audio_file)
+        duration = audio_info.duration if audio_info else None
+        self.last_duration = duration
         if duration:
             duration_str = format_time(duration)
             if progress_callback:
                 progress_callback(f"  音声の長さ: {duration_str}")
-
-            # 自動的にチャンク処理を判定（30分以上）
-            if use_chunking is None:
-                use_chunking = duration > chunk_length_minutes * 60
+                if audio_info.sample_rate:
+                    progress_callback(
+                        f"  形式: {audio_info.codec or '不明'} / "
+                        f"{audio_info.sample_rate} Hz / {audio_info.channels}ch"
+                    )
 
         # 出力先の決定（デスクトップ）
         if output_dir is None:
             output_dir = os.path.join(os.path.expanduser("~"), "Desktop")
 
         base_name = os.path.splitext(os.path.basename(audio_file))[0]
-        output_file = os.path.join(output_dir, f"{base_name}_文字起こし.txt")
+        output_base = os.path.join(output_dir, f"{base_name}_文字起こし")
+        output_formats = list(output_formats or DEFAULT_OUTPUT_FORMATS)
+
+        # 同じ音声・同じ設定の結果があればモデルを使わずに再利用
+        if self.result_cache is None:
+            self.result_cache = ResultCache()
+        decode_options = self._decode_options(language)
+        auto_language = language == AUTO_LANGUAGE
+        cache_params = {
+            "use_chunking": use_chunking,
+            "chunk_length_minutes": chunk_length_minutes,
+            "vad": vad,
+            "overlap_seconds": overlap_seconds,
+        }
+        if auto_language:
+            cache_params["language_policy"] = language_policy
+        cache_key = self._cache_key(audio_file, decode_options, cache_params)
+        if use_cache and cache_key:
+            cached = self.result_cache.get(cache_key)
+            if cached:
+                output_files = self._save_result(
+                    cached,
+                    output_base,
+                    output_formats,
+                    audio_file,
+                    cached.get("duration") or duration,
+                    cached.get("use_chunking"),
+                    chunk_length_minutes,
+                    vad,
+                    cached.get("language")
+                )
+                self.last_result = cached
+                self.last_output_files = output_files
+                self.last_duration = cached.get("duration") or duration
+                self.last_cached = True
+                self._index_result(cached, output_files, audio_file, duration)
+                if segment_callback:
+                    segment_callback(cached["segments"])
+                if progress_callback:
+                    progress_callback("✓ 同じ音声の文字起こし結果をキャッシュから取得しました")
+                    for path in output_files:
+                        progress_callback(f"✓ 文字起こし結果を保存しました: {path}")
+                return True, "文字起こしが完了しました（キャッシュ）", output_files[0]
+
+        # バックグラウンドで準備中のモデルは完了を待つ（同じモデルで同時に推論しない）
+        if self._preload_thread is not None and self._preload_thread.is_alive():
+            if progress_callback:
+                progress_callback("モデルの準備が完了するのを待っています...")
+            self._preload_thread.join()
+
+        # モデルロード（並列処理時は各ワーカーが読み込む）
+        if self.model is None and self.workers == 1:
+            success, message = self.load_model(progress_callback)
+            if not success:
+                return False, message, None
 
         # チャンク処理
         chunks_to_cleanup = None
+        total_chunks = None
+        journal = None
+        writer = None
+
+        # 長時間音声はメモリ使用量を抑えるため逐次読み込み
+        if streaming is None:
+            streaming = bool(duration) and duration > STREAMING_THRESHOLD_SECONDS
+        if streaming or spill_to_disk:
+            use_chunking = True
 
         try:
-            if use_chunking:
+            # 確定したセグメントから順に出力ファイルへ追記する
+            writer_model = self.model_label
+            writer = TranscriptWriter(output_base, output_formats, audio_file, writer_model)
+
+            def on_segments(segments):
+                writer.write_segments(segments)
+                if segment_callback:
+                    segment_callback(segments)
+
+            audio = None
+            if spill_to_disk:
+                # 16kHzモノラルPCMをジョブ専用の一時ディレクトリへ書き出す
                 chunks, temp_dir = split_audio_file(
                     audio_file,
                     chunk_length_minutes,
-                    progress_callback
+                    progress_callback,
+                    cut_at_pauses=vad,
+                    overlap_seconds=overlap_seconds
                 )
-
                 if chunks is None:
-                    if progress_callback:
-                        progress_callback("通常の処理にフォールバックします...")
-                    use_chunking = False
+                    return False, "音声ファイルの分割に失敗しました", None
+                chunks_to_cleanup = temp_dir
+            elif streaming:
+                chunks = stream_audio_chunks(
+                    audio_file,
+                    chunk_length_minutes,
+                    progress_callback,
+                    cut_at_pauses=vad,
+                    overlap_seconds=overlap_seconds
+                )
+                if duration:
+                    total_chunks = math.ceil(duration / (chunk_length_minutes * 60))
+            else:
+                # 一度だけデコードし、長さ・分割・文字起こしで共有する
+                audio = decode_audio(audio_file, progress_callback)
+                if audio is not None:
+                    duration = len(audio) / SAMPLE_RATE
+                    self.last_duration = duration
+
+            # 自動的にチャンク処理を判定（30分以上）
+            if use_chunking is None:
+                use_chunking = bool(duration) and duration > chunk_length_minutes * 60
+
+            if use_chunking and not (streaming or spill_to_disk):
+                if audio is not None:
+                    chunks = split_audio_array(
+                        audio,
+                        chunk_length_minutes,
+                        progress_callback,
+                        cut_at_pauses=vad,
+                        overlap_seconds=overlap_seconds
+                    )
                 else:
-                    chunks_to_cleanup = temp_dir
+                    chunks, temp_dir = split_audio_file(
+                        audio_file,
+                        chunk_length_minutes,
+                        progress_callback,
+                        cut_at_pauses=vad,
+                        overlap_seconds=overlap_seconds
+                    )
 
-            # 文字起こし実行
-            if use_chunking:
-                if progress_callback:
-                    progress_callback(f"文字起こしを開始します（{len(chunks)}個のチャンク）...")
+                    if chunks is None:
+                        if progress_callback:
+                            progress_callback("通常の処理にフォールバックします...")
+                        use_chunking = False
+                    else:
+                        chunks_to_cleanup = temp_dir
 
-                combined_result = self._transcribe_chunks(chunks, progress_callback)
+            # 無音区間の除外は分割しない場合も1チャンクとして行う
+            run_chunked = use_chunking
+            if vad and not use_chunking and audio is not None:
+                chunks = [AudioChunk(audio, 0.0, duration)]
+                total_chunks = 1
+                run_chunked = True
 
-            else:
-                if progress_callback:
-                    progress_callback("文字起こしを開始します...")
+            if not run_chunked and self.model is None:
+                success, message = self.load_model(progress_callback)
+                if not success:
+                    return False, message, None
 
-                combined_result = self.model.transcribe(
-                    audio_file,
-                    language="ja",
-                    verbose=False,
-                    fp16=False
+            # ワーカーの起動とモデルの読み込みは文字起こしの時間に含めない
+            if run_chunked and self.workers > 1:
+                self._get_parallel(progress_callback).warm_up(self._decode_options())
+
+            # 言語は一度だけ判定し、すべてのチャンクで使う
+            if auto_language:
+                decode_options["language"] = self._resolve_language(
+                    audio_file, audio, run_chunked, progress_callback
                 )
 
-                if progress_callback:
-                    progress_callback("✓ 文字起こしが完了しました")
+            # 文字起こし実行
+            with stage(progress_callback, "transcribe", chunked=run_chunked) as info:
+                if run_chunked:
+                    if total_chunks is None and hasattr(chunks, "__len__"):
+                        total_chunks = len(chunks)
+                    if vad:
+                        chunks = skip_silent_regions(
+                            chunks,
+                            progress_callback=progress_callback
+                        )
+                    if progress_callback:
+                        if total_chunks:
+                            progress_callback(f"文字起こしを開始します（{total_chunks}個のチャンク）...")
+                        else:
+                            progress_callback("文字起こしを開始します...")
 
-            # 結果を保存
-            self._save_result(
-                combined_result,
-                output_file,
-                audio_file,
-                duration,
-                use_chunking,
-                chunk_length_minutes
-            )
+                    # チャンクごとの結果を記録し、中断しても続きから再開できるようにする
+                    if cache_key:
+                        journal = JobJournal.for_job(cache_key, audio_file)
+
+                    combined_result = self._transcribe_chunks(
+                        chunks,
+                        progress_callback,
+                        total_chunks,
+                        journal,
+                        on_segments,
+                        overlap_seconds,
+                        deadline_tracker,
+                        decode_options,
+                        auto_language and language_policy == "chunk"
+                    )
+
+                else:
+                    if progress_callback:
+                        progress_callback("文字起こしを開始します...")
+
+                    combined_result = self.model.transcribe(
+                        audio if audio is not None else audio_file,
+                        **decode_options
+                    )
+
+                    on_segments(combined_result["segments"])
+                    if progress_callback:
+                        progress_callback("✓ 文字起こしが完了しました")
+                info["audio_seconds"] = duration
+            self.last_transcribe_seconds = info["wall_seconds"]
+
+            self.last_result = combined_result
+
+            # 自動判定した言語（チャンクごとに判定した場合はすべて）を記録する
+            detected_language = None
+            if auto_language:
+                languages = combined_result.get("languages") or [combined_result.get("language")]
+                detected_language = ", ".join(lang for lang in languages if lang) or None
+
+            # 途中でモデルを切り替えた場合は両方のモデル名を記録する
+            models_used = None
+            if deadline_tracker and deadline_tracker.downgraded:
+                models_used = f"{writer_model} → {self.model_label}"
+
+            # 本文や音声の長さなど完了時に確定する内容を書き出して保存
+            with stage(progress_callback, "save", formats=output_formats):
+                output_files = writer.finish(
+                    combined_result,
+                    duration,
+                    use_chunking,
+                    chunk_length_minutes,
+                    vad,
+                    models_used,
+                    detected_language
+                )
+            self.last_output_files = output_files
+            self._index_result(combined_result, output_files, audio_file, duration)
 
             if progress_callback:
-                progress_callback(f"✓ 文字起こし結果を保存しました: {output_file}")
+                for path in output_files:
+                    progress_callback(f"✓ 文字起こし結果を保存しました: {path}")
 
-            return True, "文字起こしが完了しました", output_file
+            # キャッシュのキーは最初のモデルのものなので、途中で切り替えた結果は保存しない
+            if cache_key and not models_used:
+                try:
+                    self.result_cache.put(
+                        cache_key,
+                        combined_result,
+                        duration=duration,
+                        use_chunking=use_chunking,
+                        model=self.model_label,
+                        source=audio_file,
+                        language=detected_language
+                    )
+                except OSError as e:
+                    print(f"⚠ 結果キャッシュの保存に失敗: {e}")
+
+            # 完了したジョブのジャーナルは不要
+            if journal:
+                journal.discard()
+
+            return True, "文字起こしが完了しました", output_files[0]
 
         except Exception as e:
             import traceback
@@ -163,86 +824,308 @@ class TranscribeEngine:
             return False, f"文字起こし中にエラーが発生: {e}", None
 
         finally:
+            # 途中で終了した場合はそこまでの出力を .part として残す
+            if writer is not None and not writer.finished:
+                writer.abort()
+
             # 一時ファイルのクリーンアップ
             if chunks_to_cleanup:
                 success, message = cleanup_temp_files(chunks_to_cleanup)
                 if progress_callback and message:
                     progress_callback(message)
 
-    def _transcribe_chunks(self, chunks, progress_callback=None):
-        """チャンクを文字起こし"""
+    def _transcribe_chunks(self, chunks, progress_callback=None, total_chunks=None,
+                           journal=None, segment_callback=None, overlap_seconds=0,
+                           deadline_tracker=None, decode_options=None,
+                           redetect_language=False):
+        """
+        チャンクを文字起こし
+
+        Args:
+            chunks: AudioChunk のリストまたはジェネレーター
+            progress_callback: 進捗コールバック関数
+            total_chunks: チャンク総数（ジェネレーターの場合の表示用）
+            journal: チャンクごとの結果を記録する JobJournal（None=記録しない）
+            segment_callback: 確定したセグメントのリストを受け取る関数
+            overlap_seconds: 隣り合うチャンクの重複の長さ（秒）
+            deadline_tracker: 期限に遅れた場合にモデルを切り替える DeadlineTracker
+            decode_options: model.transcribe に渡すオプション（None=既定）
+            redetect_language: チャンクごとに言語を判定し直すか
+        """
         all_segments = []
+        languages = []
         full_text = []
+        prev_end = None
+        overlapped = False
+        emitted = 0
 
-        for idx, (chunk_file, start_time, end_time) in enumerate(chunks):
-            if progress_callback:
-                progress_callback(
-                    f"チャンク {idx+1}/{len(chunks)} を処理中 "
-                    f"({format_time(start_time)} - {format_time(end_time)})"
-                )
+        if total_chunks is None and hasattr(chunks, "__len__"):
+            total_chunks = len(chunks)
 
-            # チャンクを文字起こし
-            result = self.model.transcribe(
-                chunk_file,
-                language="ja",
-                verbose=False,
-                fp16=False,
-                condition_on_previous_text=True
+        # 前回中断したジョブの結果は再利用する
+        known_results = journal.load() if journal else {}
+        if known_results and progress_callback:
+            progress_callback(
+                f"前回中断したジョブを再開します（{len(known_results)}個のチャンクは処理済み）"
             )
 
-            # タイムスタンプを調整
-            for segment in result["segments"]:
-                segment["start"] += start_time
-                segment["end"] += start_time
-                all_segments.append(segment)
+        for idx, chunk, result in self._iter_chunk_results(
+                chunks, progress_callback, total_chunks, known_results, journal,
+                deadline_tracker, decode_options, redetect_language):
+            # タイムスタンプを元の音声の時間軸に合わせる
+            segments = result["segments"]
+            for segment in segments:
+                segment["start"] = chunk_time_to_source(chunk, segment["start"])
+                segment["end"] = chunk_time_to_source(chunk, segment["end"], is_end=True)
+
+            # 前のチャンクと重複している場合は重複を取り除いて統合
+            if prev_end is not None and chunk.start < prev_end:
+                all_segments = merge_overlapping_segments(
+                    all_segments, segments, chunk.start, prev_end
+                )
+                overlapped = True
+            else:
+                all_segments.extend(segments)
 
             full_text.append(result["text"])
+            prev_end = chunk.end
+            if result.get("language") and result["language"] not in languages:
+                languages.append(result["language"])
 
-            if progress_callback:
-                progress_callback(f"✓ チャンク {idx+1} 完了")
+            if segment_callback:
+                # 次のチャンクとの重複区間にかかるセグメントは統合で入れ替わるため保留する
+                settled = len(all_segments)
+                while (settled > emitted and overlap_seconds
+                       and all_segments[settled - 1]["end"] > prev_end - overlap_seconds):
+                    settled -= 1
+                if settled > emitted:
+                    segment_callback(all_segments[emitted:settled])
+                    emitted = settled
+
+            # 逐次読み込み時は次のチャンクを読む前に参照を手放す
+            del chunk, result, segments
+
+        if segment_callback and len(all_segments) > emitted:
+            segment_callback(all_segments[emitted:])
 
         if progress_callback:
             progress_callback("✓ すべてのチャンクの文字起こしが完了しました")
 
+        if overlapped:
+            # 重複を除いたセグメントから本文を組み立て直す
+            for i, segment in enumerate(all_segments):
+                segment["id"] = i
+            text = "".join(segment["text"] for segment in all_segments).strip()
+        else:
+            text = " ".join(full_text)
+
         return {
-            "text": " ".join(full_text),
-            "segments": all_segments
+            "text": text,
+            "segments": all_segments,
+            "languages": languages
         }
 
-    def _save_result(self, result, output_file, audio_file, duration,
-                     use_chunking, chunk_length_minutes):
-        """結果をファイルに保存"""
-        with open(output_file, "w", encoding="utf-8") as f:
-            f.write("=" * 60 + "\n")
-            f.write(" 音声文字起こし結果\n")
-            f.write("=" * 60 + "\n\n")
-            f.write(f"元ファイル: {audio_file}\n")
-            f.write(f"使用モデル: {self.model_name}\n")
-            if duration:
-                f.write(f"音声の長さ: {format_time(duration)}\n")
-            if use_chunking:
-                f.write(f"処理方法: チャンク分割処理（{chunk_length_minutes}分ごと）\n")
-            f.write("\n")
-            f.write("=" * 60 + "\n")
-            f.write(" 文字起こしテキスト\n")
-            f.write("=" * 60 + "\n\n")
-            f.write(result["text"])
-            f.write("\n\n")
-            f.write("=" * 60 + "\n")
-            f.write(" タイムスタンプ付きセグメント\n")
-            f.write("=" * 60 + "\n\n")
-
-            for segment in result["segments"]:
-                start = int(segment["start"])
-                end = int(segment["end"])
-                text = segment["text"].strip()
-
-                start_min = start // 60
-                start_sec = start % 60
-                end_min = end // 60
-                end_sec = end % 60
-
-                f.write(f"[{start_min:02d}:{start_sec:02d} - {end_min:02d}:{end_sec:02d}] {text}\n")
+    def _index_result(self, result, output_files, audio_file, duration):
+        """結果を検索インデックスに登録（テキスト形式の出力があればそのパスで）"""
+        output_file = next((path for path in output_files if path.endswith(".txt")),
+                           output_files[0])
+        try:
+            if self.search_index is None:
+                self.search_index = get_search_index()
+            self.search_index.add_transcript(
+                output_file,
+                audio_file,
+                self.model_label,
+                result["segments"],
+                duration
+            )
+        except Exception as e:
+            # 検索インデックスの失敗は文字起こし結果には影響しない
+            print(f"⚠ 検索インデックスへの登録に失敗: {e}")
+
+    def _cache_key(self, audio_file, decode_options, params):
+        """結果キャッシュのキー（ファイルを読めない場合は None）"""
+        try:
+            content_hash = hash_audio_file(audio_file)
+        except OSError as e:
+            print(f"⚠ 音声ファイルのハッシュ計算に失敗: {e}")
+            return None
+
+        params = dict(params)
+        params["decode"] = decode_options
+        if self.quantize:
+            params["precision"] = self.precision
+        return make_cache_key(
+            content_hash,
+            self.model_name,
+            decode_options.get("language"),
+            params
+        )
+
+    def _iter_chunk_results(self, chunks, progress_callback, total_chunks,
+                            known_results=None, journal=None, deadline_tracker=None,
+                            decode_options=None, redetect_language=False):
+        """
+        チャンクを文字起こしし、時系列順に (idx, chunk, result) を返す
+
+        workers が2以上の場合はワーカープロセスで並列に処理する。
+        known_results にあるチャンクは文字起こしせずにその結果を返し、
+        新たに完了したチャンクは journal に記録する。
+        deadline_tracker を指定すると、期限に遅れた場合に残りのチャンクを
+        速いモデルで処理する（並列処理時はワーカーのモデルを切り替えない）。
+        """
+        known_results = known_results or {}
+        decode_options = decode_options or self._decode_options()
+        started = {}
+
+        def on_start(idx, chunk):
+            started[idx] = time.perf_counter()
+            emit_event(progress_callback, "chunk_start", index=idx, total=total_chunks,
+                       start=chunk.start, end=chunk.end)
+
+        def on_done(idx, chunk, result):
+            # ジャーナルは最初のモデルのキーで開くため、切り替え後のチャンクは記録しない
+            if journal and not (deadline_tracker and deadline_tracker.downgraded):
+                try:
+                    journal.record_chunk(idx, result)
+                except OSError as e:
+                    print(f"⚠ ジャーナルの記録に失敗: {e}")
+            # 並列処理時は処理待ちの時間も含む
+            wall = time.perf_counter() - started.pop(idx, time.perf_counter())
+            audio_seconds = chunk.end - chunk.start
+            emit_event(progress_callback, "chunk_end", index=idx,
+                       audio_seconds=audio_seconds, wall_seconds=wall,
+                       realtime_factor=audio_seconds / wall if wall > 0 else None,
+                       language=result.get("language"),
+                       peak_rss_mb=peak_rss_mb())
+
+        if self.workers > 1:
+            yield from self._get_parallel(progress_callback).transcribe_chunks(
+                chunks,
+                decode_options,
+                on_start,
+                on_done,
+                known_results,
+                redetect_language
+            )
+            return
+
+        for idx, chunk in enumerate(chunks):
+            if idx in known_results:
+                if deadline_tracker:
+                    deadline_tracker.done_audio_seconds += chunk.end - chunk.start
+                yield idx, chunk, known_results[idx]
+                continue
+            on_start(idx, chunk)
+            chunk_started = time.perf_counter()
+            chunk_audio = load_chunk_audio(chunk.audio)
+            options = decode_options
+            if redetect_language:
+                options = dict(decode_options, language=detect_chunk_language(
+                    self.model, chunk_audio, decode_options["language"]
+                ))
+            result = self.model.transcribe(chunk_audio, **options)
+            del chunk_audio
+            chunk_wall = time.perf_counter() - chunk_started
+            on_done(idx, chunk, result)
+            if deadline_tracker:
+                self._check_deadline(deadline_tracker, chunk, chunk_wall, progress_callback)
+            yield idx, chunk, result
+
+    def _get_parallel(self, progress_callback=None):
+        """並列処理用のワーカープロセスのプール（初回に作成）"""
+        if self._parallel is None:
+            self._parallel = ParallelChunkTranscriber(
+                self.model_name,
+                self.workers,
+                self.torch_threads,
+                quantize=self.quantize
+            )
+            if progress_callback:
+                progress_callback(
+                    f"{self.workers}個のワーカーで並列処理します"
+                    f"（各{self._parallel.torch_threads}スレッド）"
+                )
+        return self._parallel
+
+    def _resolve_language(self, audio_file, audio, run_chunked, progress_callback):
+        """
+        音声の言語を判定（同じ内容のファイルは前回の判定結果を使う）
+
+        発話が最も多い30秒だけを判定に使う。全体をデコードしていない場合は
+        先頭の数分だけをデコードしてその中から選ぶ。
+
+        Returns:
+            言語コード（判定できない場合は None=Whisperが判定する）
+        """
+        language_cache = get_language_cache()
+        try:
+            content_hash = hash_audio_file(audio_file)
+        except OSError:
+            content_hash = None
+
+        known = language_cache.get(content_hash) if content_hash else None
+        if known:
+            emit_event(progress_callback, "stage_end", stage="language_detect",
+                       language=known[0], probability=known[1], cached=True,
+                       wall_seconds=0.0, ok=True)
+            return known[0]
+
+        try:
+            with stage(progress_callback, "language_detect") as info:
+                info["cached"] = False
+                if audio is None:
+                    audio = decode_audio_head(audio_file, LANGUAGE_SCAN_SECONDS)
+                sample = find_speech_window(audio, LANGUAGE_SAMPLE_SECONDS)
+                if run_chunked and self.workers > 1:
+                    # メインプロセスにはモデルを読み込まずワーカーで判定する
+                    language, probability = self._get_parallel(
+                        progress_callback
+                    ).detect_language(sample)
+                else:
+                    language, probability = detect_language(self.model, sample)
+                info.update(language=language, probability=probability)
+        except Exception as e:
+            if progress_callback:
+                progress_callback(f"⚠ 言語を判定できないため、Whisperの自動判定を使用します: {e}")
+            return None
+
+        if content_hash:
+            language_cache.put(content_hash, language, probability)
+        return language
+
+    def _check_deadline(self, tracker, chunk, wall_seconds, progress_callback):
+        """期限に間に合わない見込みなら残りのチャンクを速いモデルに切り替える"""
+        faster = tracker.chunk_done(chunk.end - chunk.start, wall_seconds)
+        if faster is None:
+            return
+
+        previous = self.model_name
+        emit_event(progress_callback, "model_downgrade",
+                   model=model_label(faster, self.quantize), previous=self.model_label)
+        self.switch_model(faster)
+        success, message = self.load_model(progress_callback)
+        if not success:
+            # 切り替え先を読み込めない場合は元のモデルで続ける
+            self.switch_model(previous)
+            self.load_model(progress_callback)
+            return
+
+        tracker.switch(faster)
+        if hasattr(progress_callback, "context"):
+            progress_callback.context["model"] = self.model_label
+
+    def _save_result(self, result, output_base, output_formats, audio_file, duration,
+                     use_chunking, chunk_length_minutes, vad=False, language=None):
+        """結果全体をまとめてファイルに保存し、出力ファイルのパスを返す"""
+        writer = TranscriptWriter(output_base, output_formats, audio_file, self.model_label)
+        try:
+            writer.write_segments(result["segments"])
+            return writer.finish(result, duration, use_chunking, chunk_length_minutes, vad,
+                                 language=language)
+        finally:
+            if not writer.finished:
+                writer.abort()
 
     def get_transcribed_text(self, output_file, max_chars=10000):
         """保存した文字起こし結果を読み込み"""
@@ -0,0 +1,350 @@
+"""
+文字起こし結果の検索モジュール
+完了した文字起こしのセグメントをSQLiteの全文検索インデックスに登録し、検索する
+"""
+
+import os
+import re
+import time
+import sqlite3
+import threading
+from collections import namedtuple
+
+from app_paths import get_app_data_dir
+
+
+# 検索結果の1件（時刻はミリ秒）
+SearchHit = namedtuple(
+    "SearchHit",
+    ["output_file", "audio_file", "model", "start_ms", "end_ms", "text"],
+)
+
+# trigram トークナイザーで検索できる最短の文字数（これより短い語は2文字索引で探す）
+TRIGRAM_MIN_CHARS = 3
+
+# 2文字索引で各文字を先頭に持つ組を作るため末尾に付ける文字（セグメントのテキストには含まれない）
+_BIGRAM_END = "\n"
+
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+DEFAULT_SEARCH_LIMIT = 100
+
+_SEGMENT_LINE = re.compile(r"^\[(\d+):(\d{2}) - (\d+):(\d{2})\] ?(.*)$")
+
+
+def format_ms(ms):
+    """ミリ秒を h:mm:ss.mmm 形式に変換"""
+    seconds, millis = divmod(int(ms), 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}.{millis:03d}"
+
+
+def _escape_like(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _bigrams(text):
+    """
+    2文字索引に登録する文字の組
+
+    LIKE と同じく英字の大文字・小文字を区別しない。末尾に _BIGRAM_END を付けるため、
+    すべての文字がいずれかの組の先頭になり、1文字の検索にも使える。
+    """
+    text = text.translate(_ASCII_LOWER) + _BIGRAM_END
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def _fts_phrase(text):
+    """入力をそのまま1つのフレーズとして検索する FTS5 のクエリ"""
+    return '"' + text.replace('"', '""') + '"'
+
+
+class TranscriptSearchIndex:
+    """文字起こし結果の全文検索インデックス"""
+
+    def __init__(self, db_path=None):
+        """
+        Args:
+            db_path: データベースファイル（None=アプリのデータディレクトリ）
+        """
+        self.db_path = db_path or os.path.join(get_app_data_dir(), "transcripts.db")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self.fts_enabled = self._create_schema()
+
+    def _create_schema(self):
+        """テーブルを作成し、全文検索が使えるかを返す"""
+        with self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS transcripts (
+                    id INTEGER PRIMARY KEY,
+                    output_file TEXT NOT NULL UNIQUE,
+                    audio_file TEXT,
+                    model TEXT,
+                    duration REAL,
+                    indexed_at REAL,
+                    file_size INTEGER,
+                    file_mtime REAL
+                );
+                CREATE TABLE IF NOT EXISTS segments (
+                    id INTEGER PRIMARY KEY,
+                    transcript_id INTEGER NOT NULL
+                        REFERENCES transcripts(id) ON DELETE CASCADE,
+                    start_ms INTEGER NOT NULL,
+                    end_ms INTEGER NOT NULL,
+                    text TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS segments_transcript
+                    ON segments(transcript_id, start_ms);
+            """)
+        self._create_bigram_index()
+
+        # 日本語は空白で区切られないため trigram トークナイザー（SQLite 3.34以降）を使う
+        try:
+            with self._conn:
+                self._conn.executescript("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+                        text, content='segments', content_rowid='id', tokenize='trigram'
+                    );
+                    CREATE TRIGGER IF NOT EXISTS segments_ai AFTER INSERT ON segments BEGIN
+                        INSERT INTO segments_fts(rowid, text) VALUES (new.id, new.text);
+                    END;
+                    CREATE TRIGGER IF NOT EXISTS segments_ad AFTER DELETE ON segments BEGIN
+                        INSERT INTO segments_fts(segments_fts, rowid, text)
+                            VALUES ('delete', old.id, old.text);
+                    END;
+                """)
+            return True
+        except sqlite3.OperationalError as e:
+            print(f"⚠ 全文検索が使えないため部分一致で検索します: {e}")
+            return False
+
+    def _create_bigram_index(self):
+        """
+        2文字以下の語を全件走査せずに探すための2文字索引を作成
+
+        trigram トークナイザーは3文字未満の語を検索できないため、日本語で多い2文字の語
+        （「会議」など）用にセグメントに含まれる文字の組を別のテーブルに登録する。
+        索引がない既存のデータベースは作成時に登録済みのセグメントから作る。
+        """
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'segment_bigrams'"
+        ).fetchone()
+        if exists:
+            return
+        with self._conn:
+            self._conn.executescript("""
+                CREATE TABLE segment_bigrams (
+                    bigram TEXT NOT NULL,
+                    segment_id INTEGER NOT NULL
+                        REFERENCES segments(id) ON DELETE CASCADE,
+                    PRIMARY KEY (bigram, segment_id)
+                ) WITHOUT ROWID;
+                CREATE INDEX segment_bigrams_segment ON segment_bigrams(segment_id);
+            """)
+            rows = self._conn.execute("SELECT id, text FROM segments").fetchall()
+            for segment_id, text in rows:
+                self._add_bigrams(segment_id, text)
+
+    def _add_bigrams(self, segment_id, text):
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO segment_bigrams (bigram, segment_id) VALUES (?, ?)",
+            [(bigram, segment_id) for bigram in _bigrams(text)],
+        )
+
+    def add_transcript(self, output_file, audio_file, model, segments, duration=None):
+        """
+        文字起こし結果を登録（同じ出力ファイルの登録済みの内容は置き換える）
+
+        Args:
+            output_file: 出力ファイルのパス（結果を識別するキー）
+            audio_file: 元の音声ファイル
+            model: 使用したモデル名
+            segments: start/end（秒）と text を持つセグメントのリスト
+            duration: 音声の長さ（秒）
+
+        Returns:
+            登録したセグメント数
+        """
+        output_file = os.path.abspath(output_file)
+        try:
+            stat = os.stat(output_file)
+            file_size, file_mtime = stat.st_size, stat.st_mtime
+        except OSError:
+            file_size, file_mtime = None, None
+
+        rows = [
+            (int(round(seg["start"] * 1000)), int(round(seg["end"] * 1000)), seg["text"].strip())
+            for seg in segments
+            if seg["text"].strip()
+        ]
+
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM transcripts WHERE output_file = ?", (output_file,))
+            cursor = self._conn.execute(
+                "INSERT INTO transcripts"
+                " (output_file, audio_file, model, duration, indexed_at, file_size, file_mtime)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (output_file, audio_file, model, duration, time.time(), file_size, file_mtime),
+            )
+            transcript_id = cursor.lastrowid
+            for row in rows:
+                cursor = self._conn.execute(
+                    "INSERT INTO segments (transcript_id, start_ms, end_ms, text)"
+                    " VALUES (?, ?, ?, ?)",
+                    (transcript_id,) + row,
+                )
+                self._add_bigrams(cursor.lastrowid, row[2])
+        return len(rows)
+
+    def remove(self, output_file):
+        """登録を削除"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM transcripts WHERE output_file = ?", (os.path.abspath(output_file),)
+            )
+
+    def search(self, query, limit=DEFAULT_SEARCH_LIMIT, offset=0):
+        """
+        セグメントを検索
+
+        3文字以上は全文検索インデックス（関連度順）、それより短い語（または全文検索が
+        使えない場合）は2文字索引で絞り込んだ部分一致（ファイル・時刻順）で探す。
+
+        Returns:
+            SearchHit のリスト
+        """
+        query = query.strip()
+        if not query:
+            return []
+
+        columns = "t.output_file, t.audio_file, t.model, s.start_ms, s.end_ms, s.text"
+        if self.fts_enabled and len(query) >= TRIGRAM_MIN_CHARS:
+            sql = (
+                f"SELECT {columns} FROM segments_fts f"
+                " JOIN segments s ON s.id = f.rowid"
+                " JOIN transcripts t ON t.id = s.transcript_id"
+                " WHERE segments_fts MATCH ?"
+                " ORDER BY f.rank LIMIT ? OFFSET ?"
+            )
+            params = (_fts_phrase(query), limit, offset)
+        else:
+            folded = query.translate(_ASCII_LOWER)
+            if len(folded) == 1:
+                # 1文字の語はその文字で始まる組の範囲で探す
+                bigram_filter = "bigram >= ? AND bigram < ?"
+                bigram_params = (folded, chr(ord(folded) + 1))
+            else:
+                # 長い語は先頭の2文字で絞り込み、部分一致で確かめる
+                bigram_filter = "bigram = ?"
+                bigram_params = (folded[:2],)
+            sql = (
+                f"SELECT {columns} FROM segments s"
+                " JOIN transcripts t ON t.id = s.transcript_id"
+                f" WHERE s.id IN (SELECT segment_id FROM segment_bigrams WHERE {bigram_filter})"
+                " AND s.text LIKE ? ESCAPE '\\'"
+                " ORDER BY t.output_file, s.start_ms LIMIT ? OFFSET ?"
+            )
+            params = bigram_params + (f"%{_escape_like(query)}%", limit, offset)
+
+        with self._lock:
+            return [SearchHit(*row) for row in self._conn.execute(sql, params)]
+
+    def import_text_file(self, path, force=False):
+        """
+        既存の文字起こし結果（テキスト形式）を登録
+
+        見出しの「元ファイル」「使用モデル」とタイムスタンプ付きセグメントを読み取る。
+        内容が変わっていないファイルは読み直さない。
+
+        Returns:
+            登録したセグメント数（登録しなかった場合は None）
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        if not force:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT file_size, file_mtime FROM transcripts WHERE output_file = ?",
+                    (path,),
+                ).fetchone()
+            if row and row[0] == stat.st_size and row[1] == stat.st_mtime:
+                return None
+
+        audio_file = None
+        model = None
+        segments = []
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                # 本文は1行が非常に長いことがあるため、見出しとセグメント行だけを見る
+                if line.startswith("元ファイル: ") and audio_file is None:
+                    audio_file = line[len("元ファイル: "):].strip()
+                elif line.startswith("使用モデル: ") and model is None:
+                    model = line[len("使用モデル: "):].strip()
+                else:
+                    match = _SEGMENT_LINE.match(line.rstrip("\r\n"))
+                    if match:
+                        sm, ss, em, es, text = match.groups()
+                        segments.append({
+                            "start": int(sm) * 60 + int(ss),
+                            "end": int(em) * 60 + int(es),
+                            "text": text,
+                        })
+
+        if audio_file is None and not segments:
+            return None
+        return self.add_transcript(path, audio_file, model, segments)
+
+    def import_folder(self, folder, recursive=False, progress_callback=None):
+        """
+        フォルダ内の「*_文字起こし.txt」をまとめて登録
+
+        Returns:
+            登録したファイル数
+        """
+        paths = []
+        for root, dirs, names in os.walk(folder):
+            paths.extend(
+                os.path.join(root, name) for name in names if name.endswith("_文字起こし.txt")
+            )
+            if not recursive:
+                break
+
+        imported = 0
+        for path in sorted(paths):
+            try:
+                if self.import_text_file(path) is not None:
+                    imported += 1
+            except (OSError, sqlite3.Error) as e:
+                if progress_callback:
+                    progress_callback(f"⚠ 取り込めませんでした: {os.path.basename(path)} ({e})")
+        if progress_callback:
+            progress_callback(f"✓ {imported}個の文字起こし結果を検索対象に追加しました")
+        return imported
+
+    def stats(self):
+        """登録済みの件数"""
+        with self._lock:
+            transcripts = self._conn.execute("SELECT COUNT(*) FROM transcripts").fetchone()[0]
+            segments = self._conn.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+        return {"transcripts": transcripts, "segments": segments, "fts": self.fts_enabled}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_search_index = None
+_search_index_lock = threading.Lock()
+
+
+def get_search_index():
+    """プロセス全体で共有する検索インデックスを取得"""
+    global _search_index
+    with _search_index_lock:
+        if _search_index is None:
+            _search_index = TranscriptSearchIndex()
+        return _search_index
@@ -0,0 +1,158 @@
+"""
+文字起こし結果ビューアーモジュール
+出力ファイルの行の位置だけを保持し、表示するページの行をmmapで読み込む
+"""
+
+import os
+import re
+import mmap
+import bisect
+from array import array
+
+
+# 1ページに表示するセグメント数
+PAGE_SIZE = 100
+
+# テキスト形式の出力でセグメント一覧が始まる見出し
+SEGMENTS_HEADER = " タイムスタンプ付きセグメント".encode("utf-8")
+
+_SEGMENT_TIME = re.compile(r"^\[(\d+):(\d{2}) - ")
+
+_NEWLINE = re.compile(b"\n")
+
+
+def parse_segment_start(line):
+    """セグメント行の開始時刻（秒）。形式が違う場合は None"""
+    match = _SEGMENT_TIME.match(line)
+    if not match:
+        return None
+    return int(match.group(1)) * 60 + int(match.group(2))
+
+
+class TranscriptIndex:
+    """
+    出力ファイルの各行の開始位置を保持するクラス
+
+    ファイルの内容はメモリに読み込まず、必要な行だけをmmapから取り出す。
+    保持するのは1行あたり8バイトの位置情報のみ。
+
+    Windowsではmmap中のファイルを置き換えられないため、同じファイルへ
+    書き出す前に close() する。
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: 文字起こし結果のテキストファイル
+        """
+        self.path = path
+        self._file = None
+        self._mmap = None
+        self._size = 0
+        self._offsets = array("Q")
+        self._first_row = 0
+        self._signature = None
+        self.refresh()
+
+    def refresh(self):
+        """ファイルが更新されていれば索引を作り直す"""
+        stat = os.stat(self.path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+        if signature == self._signature:
+            return
+        self.close()
+
+        self._file = open(self.path, "rb")
+        self._size = stat.st_size
+        self._signature = signature
+        self._offsets = array("Q")
+        if self._size == 0:
+            # 空のファイルはmmapできない
+            self._first_row = 0
+            return
+
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        # 各行の開始位置は先頭と改行の直後（最後の改行の直後は除く）
+        self._offsets.append(0)
+        self._offsets.extend(match.end() for match in _NEWLINE.finditer(self._mmap))
+        if self._offsets[-1] == self._size:
+            self._offsets.pop()
+
+        self._first_row = self._find_segments_start()
+
+    def _find_segments_start(self):
+        """セグメント一覧の最初の行番号（見出しがなければ先頭行）"""
+        header = self._mmap.find(SEGMENTS_HEADER)
+        while header >= 0:
+            line = bisect.bisect_right(self._offsets, header) - 1
+            if self._line(line) == SEGMENTS_HEADER.decode("utf-8"):
+                break
+            header = self._mmap.find(SEGMENTS_HEADER, header + 1)
+        else:
+            return 0
+
+        # 見出しの下の区切り線と空行を飛ばす
+        line += 2
+        while line < len(self._offsets) and not self._line(line).strip():
+            line += 1
+        return line
+
+    def _line(self, line):
+        start = self._offsets[line]
+        end = self._offsets[line + 1] if line + 1 < len(self._offsets) else self._size
+        return self._mmap[start:end].decode("utf-8", errors="replace").rstrip("\r\n")
+
+    def __len__(self):
+        """セグメント（行）の数"""
+        return max(0, len(self._offsets) - self._first_row)
+
+    def rows(self, start, count):
+        """start 番目から最大 count 行を取得"""
+        end = min(start + count, len(self))
+        return [self._line(self._first_row + i) for i in range(max(start, 0), end)]
+
+    def page_count(self, page_size=PAGE_SIZE):
+        """ページ数（空でも1）"""
+        return max(1, -(-len(self) // page_size))
+
+    def page(self, number, page_size=PAGE_SIZE):
+        """
+        ページの行を取得
+
+        Args:
+            number: ページ番号（0から。範囲外は最初または最後のページ）
+            page_size: 1ページの行数
+
+        Returns:
+            (ページ番号, 行のリスト) のタプル
+        """
+        number = max(0, min(number, self.page_count(page_size) - 1))
+        return number, self.rows(number * page_size, page_size)
+
+    def find_time(self, seconds):
+        """指定時刻を含む（またはその直後の）セグメントの行番号を二分探索で求める"""
+        low, high = 0, len(self)
+        while low < high:
+            mid = (low + high) // 2
+            start = parse_segment_start(self._line(self._first_row + mid))
+            if start is not None and start < seconds:
+                low = mid + 1
+            else:
+                high = mid
+        return min(low, max(len(self) - 1, 0))
+
+    def close(self):
+        """mmapとファイルを閉じる"""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._signature = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()